@@ -33,6 +33,7 @@ class UserAdmin(BaseUserAdmin):
 @admin.register(StudentProfile)
 class StudentProfileAdmin(admin.ModelAdmin):
     list_display = ['roll_number', 'get_student_name', 'program', 'intake', 'current_semester', 'cgpa', 'is_approved']
+    list_select_related = ['user']
     list_filter = ['program', 'intake', 'current_semester', 'is_approved', 'created_at']
     search_fields = ['roll_number', 'user__email', 'user__first_name', 'user__last_name']
     readonly_fields = ['created_at', 'updated_at']
@@ -0,0 +1,58 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.models import User
+from courses.models import Program
+from superiorErp.datasets import PROGRAMS, build_dataset
+
+
+class Command(BaseCommand):
+    help = 'Generate a large, reproducible dataset for load tests and benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--programs', type=int, default=5, help=f'Number of programs (1-{len(PROGRAMS)})')
+        parser.add_argument('--students-per-intake', type=int, default=1000, help='Students per program and intake')
+        parser.add_argument('--courses-per-semester', type=int, default=5, help='Courses per program and semester')
+        parser.add_argument('--weeks', type=int, default=16, help='Weeks of attendance (two sessions per course each week)')
+        parser.add_argument('--assessments', type=int, default=4, help='Assessment components per course')
+        parser.add_argument('--applications', type=int, default=1000, help='Admission applications')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same options give the same data')
+        parser.add_argument('--end-date', type=date.fromisoformat, help='Last attendance date, YYYY-MM-DD (default today)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT')
+
+    def handle(self, *args, **options):
+        if not 1 <= options['programs'] <= len(PROGRAMS):
+            raise CommandError(f'--programs must be between 1 and {len(PROGRAMS)}')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        if Program.objects.exists() or User.objects.exists():
+            raise CommandError('The database already has data; run this against an empty database (e.g. after flush)')
+
+        students = options['programs'] * 2 * options['students_per_intake']
+        records = students * options['courses_per_semester'] * options['weeks'] * 2
+        self.stdout.write(f'Generating {students} students and about {records} attendance records...')
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            build_dataset(
+                programs=options['programs'],
+                students_per_intake=options['students_per_intake'],
+                courses_per_semester=options['courses_per_semester'],
+                weeks=options['weeks'],
+                assessments=options['assessments'],
+                applications=options['applications'],
+                seed=options['seed'],
+                end_date=options['end_date'],
+                batch_size=options['batch_size'],
+                log=self._progress(started),
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Dataset generated in {time.perf_counter() - started:.1f}s'))
+
+    def _progress(self, started):
+        def log(message):
+            self.stdout.write(f'  [{time.perf_counter() - started:7.1f}s] {message}')
+        return log
@@ -3,8 +3,9 @@ from django.utils import timezone
 from datetime import date, timedelta
 from accounts.models import User, StudentProfile, TeacherProfile, StaffProfile
 from courses.models import Program, Course, CourseEnrollment, Timetable, Announcement
-from attendance.models import AttendanceRecord, AttendanceSummary
+from attendance.models import AttendanceRecord
 from grades.models import GradeEntry
+from grades.scales import DEFAULT_TABLE
 import random
 
 
@@ -15,32 +16,24 @@ class Command(BaseCommand):
         self.stdout.write('Creating sample data...')
 
         # Create Programs
-        programs = [
-            Program.objects.create(
-                code='BSCS',
-                name='BS Computer Science',
-                description='A comprehensive program in computer science',
-                department='Computer Science',
-                total_semesters=8,
-                credits_required=120
-            ),
-            Program.objects.create(
-                code='BSDS',
-                name='BS Data Science',
-                description='A comprehensive program in data science',
-                department='Computer Science',
-                total_semesters=8,
-                credits_required=120
-            ),
-            Program.objects.create(
-                code='BSAI',
-                name='BS Artificial Intelligence',
-                description='A comprehensive program in AI',
-                department='Computer Science',
-                total_semesters=8,
-                credits_required=120
-            ),
+        programs_data = [
+            ('BSCS', 'BS Computer Science', 'A comprehensive program in computer science'),
+            ('BSDS', 'BS Data Science', 'A comprehensive program in data science'),
+            ('BSAI', 'BS Artificial Intelligence', 'A comprehensive program in AI'),
         ]
+        programs = []
+        for code, name, description in programs_data:
+            program, created = Program.objects.get_or_create(
+                code=code,
+                defaults={
+                    'name': name,
+                    'description': description,
+                    'department': 'Computer Science',
+                    'total_semesters': 8,
+                    'credits_required': 120,
+                }
+            )
+            programs.append(program)
         self.stdout.write(self.style.SUCCESS(f'Created {len(programs)} programs'))
 
         # Create Admin User
@@ -203,20 +196,7 @@ class Command(BaseCommand):
                             'recorded_by': courses[0].teacher,
                         }
                     )
-
-                # Create Attendance Summary
-                summary, created = AttendanceSummary.objects.get_or_create(
-                    student=student,
-                    course=course,
-                    defaults={
-                        'total_classes': 10,
-                        'present_count': random.randint(7, 10),
-                        'absent_count': random.randint(0, 2),
-                        'late_count': random.randint(0, 1),
-                        'excused_count': 0,
-                    }
-                )
-                summary.calculate_percentage()
+                # Attendance summaries are kept up to date from the records
 
         self.stdout.write(self.style.SUCCESS(f'Created attendance records'))
 
@@ -224,43 +204,7 @@ class Command(BaseCommand):
         for student in students:
             for course in courses:
                 marks = random.randint(50, 100)
-                # Calculate grade based on marks
-                if marks >= 90:
-                    grade = 'A+'
-                    gpa_points = 4.0
-                elif marks >= 85:
-                    grade = 'A'
-                    gpa_points = 4.0
-                elif marks >= 80:
-                    grade = 'A-'
-                    gpa_points = 3.7
-                elif marks >= 75:
-                    grade = 'B+'
-                    gpa_points = 3.3
-                elif marks >= 70:
-                    grade = 'B'
-                    gpa_points = 3.0
-                elif marks >= 65:
-                    grade = 'B-'
-                    gpa_points = 2.7
-                elif marks >= 60:
-                    grade = 'C+'
-                    gpa_points = 2.3
-                elif marks >= 55:
-                    grade = 'C'
-                    gpa_points = 2.0
-                elif marks >= 50:
-                    grade = 'C-'
-                    gpa_points = 1.7
-                elif marks >= 45:
-                    grade = 'D+'
-                    gpa_points = 1.3
-                elif marks >= 40:
-                    grade = 'D'
-                    gpa_points = 1.0
-                else:
-                    grade = 'F'
-                    gpa_points = 0.0
+                grade, gpa_points = DEFAULT_TABLE.lookup(marks)
 
                 grade_entry, created = GradeEntry.objects.get_or_create(
                     student=student,
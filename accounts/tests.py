@@ -1,3 +1,84 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
+from django.urls import reverse
+
+from admission.models import AdmissionApplication
+from attendance.models import AttendanceRecord
+from courses.models import Course, CourseEnrollment, Program
+from superiorErp.datasets import PASSWORD, build_dataset
+from superiorErp.testing import QueryCountTestCase
+from .models import StudentProfile, TeacherProfile
+
+
+class AccountQueryCountTests(QueryCountTestCase):
+    """Query counts for the student account pages"""
+
+    @classmethod
+    def setUpTestData(cls):
+        build_dataset(**cls.dataset)
+        cls.student = StudentProfile.objects.select_related('user').first()
+
+    def test_student_login_page(self):
+        self.assertViewQueries(0, reverse('student_login'))
+
+    def test_student_login(self):
+        response = self.assertViewQueries(
+            9, '/account/login/', 'post',
+            {'email': self.student.user.email, 'password': PASSWORD},
+        )
+        self.assertRedirects(response, reverse('student_dashboard'), fetch_redirect_response=False)
+
+    def test_student_dashboard(self):
+        self.client.force_login(self.student.user)
+        self.assertViewQueries(4, '/account/dashboard/')
+
+    def test_student_profile_edit_page(self):
+        self.client.force_login(self.student.user)
+        self.assertViewQueries(3, reverse('student_profile_edit'))
+
+    def test_student_profile_edit(self):
+        self.client.force_login(self.student.user)
+        self.assertViewQueries(
+            5, reverse('student_profile_edit'), 'post',
+            {'first_name': 'Updated', 'father_name': 'Father'},
+        )
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.father_name, 'Father')
+
+    def test_student_logout(self):
+        self.client.force_login(self.student.user)
+        self.assertViewQueries(4, reverse('student_logout'))
+
+
+class LargerAccountQueryCountTests(AccountQueryCountTests):
+    """Account pages again with a larger dataset; every count must hold"""
+
+    dataset = {'students_per_intake': 60}
+
+
+class GenerateLoadDatasetTests(TestCase):
+    def test_generate_load_dataset(self):
+        out = StringIO()
+        call_command(
+            'generate_load_dataset', programs=2, students_per_intake=3, courses_per_semester=2, weeks=2,
+            applications=4, end_date=date(2025, 12, 19), batch_size=50, stdout=out,
+        )
+        self.assertIn('Generating 12 students and about 96 attendance records', out.getvalue())
+
+        # 2 programs x 8 semesters x 2 courses, a teacher per three courses
+        self.assertEqual((Program.objects.count(), Course.objects.count(), TeacherProfile.objects.count()), (2, 32, 10))
+        self.assertEqual(StudentProfile.objects.count(), 12)
+        # every student takes both courses of their semester, twice a week
+        self.assertEqual(CourseEnrollment.objects.count(), 24)
+        self.assertEqual(AttendanceRecord.objects.count(), 96)
+        self.assertEqual(AdmissionApplication.objects.count(), 4)
+        self.assertFalse(Course.objects.filter(timetable__isnull=True).exists())
+        # the generated timetable has no room or teacher clashes
+        call_command('check_timetable', stdout=StringIO())
 
-# Create your tests here.
+        with self.assertRaisesMessage(CommandError, 'already has data'):
+            call_command('generate_load_dataset', stdout=StringIO())
@@ -47,7 +47,7 @@ def student_dashboard(request):
 
     # Refresh user from database to get latest profile_image
     from django.contrib.auth import get_user_model
-    request.user = get_user_model().objects.get(pk=request.user.pk)
+    request.user = get_user_model().objects.select_related('student_profile').get(pk=request.user.pk)
 
     context = {
         'student': student_profile,
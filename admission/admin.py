@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.utils import timezone
 from .models import (
     AdmissionApplication,
     PersonalInformation,
@@ -8,6 +9,8 @@ from .models import (
     PaymentInformation,
     SemesterRoadmap,
     AdmissionCriteria,
+    OutboundEmail,
+    RollNumberSequence,
 )
 
 
@@ -62,14 +65,15 @@ class PreviousEducationAdmin(admin.ModelAdmin):
 
 @admin.register(CourseSelection)
 class CourseSelectionAdmin(admin.ModelAdmin):
-    list_display = ['application', 'program', 'intake', 'eligibility_score', 'meets_criteria']
-    list_filter = ['program', 'intake', 'meets_criteria']
+    list_display = ['application', 'program', 'intake', 'eligibility_score', 'meets_criteria', 'merit_position', 'merit_status']
+    list_filter = ['program', 'intake', 'meets_criteria', 'merit_status']
     search_fields = ['application__application_id']
 
     fieldsets = (
         ('Application', {'fields': ('application',)}),
         ('Course Info', {'fields': ('program', 'intake')}),
         ('Eligibility', {'fields': ('eligibility_score', 'meets_criteria')}),
+        ('Merit', {'fields': ('merit_position', 'merit_status')}),
         ('Timestamps', {'fields': ('created_at', 'updated_at'), 'classes': ('collapse',)}),
     )
 
@@ -124,7 +128,7 @@ class SemesterRoadmapAdmin(admin.ModelAdmin):
 
 @admin.register(AdmissionCriteria)
 class AdmissionCriteriaAdmin(admin.ModelAdmin):
-    list_display = ['program', 'min_fsc_percentage', 'min_matric_percentage', 'min_aggregate_score']
+    list_display = ['program', 'min_fsc_percentage', 'min_matric_percentage', 'min_aggregate_score', 'seats']
     list_filter = ['program']
 
     fieldsets = (
@@ -132,5 +136,25 @@ class AdmissionCriteriaAdmin(admin.ModelAdmin):
         ('Criteria', {
             'fields': ('min_fsc_marks', 'min_fsc_percentage', 'min_matric_percentage', 'min_aggregate_score')
         }),
+        ('Merit', {'fields': ('seats',)}),
     )
 
+
+@admin.register(RollNumberSequence)
+class RollNumberSequenceAdmin(admin.ModelAdmin):
+    list_display = ['program', 'intake', 'year', 'last_value']
+    list_filter = ['program', 'intake', 'year']
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'recipients']
+    readonly_fields = ['attempts', 'last_error', 'created_at', 'sent_at']
+    actions = ['retry']
+
+    @admin.action(description='Retry selected emails')
+    def retry(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(status='queued', attempts=0, next_attempt_at=timezone.now())
+        self.message_user(request, f'{updated} email(s) queued again.')
@@ -0,0 +1,92 @@
+"""
+Admission catalog.
+
+Everything the admission stages show or check that is not the applicant's
+own data: programs (courses.Program, falling back to the built-in
+descriptions), AdmissionCriteria, SemesterRoadmap and the fee defaults of
+ProgramDetails. It is built in three queries, shared through the
+versioned cache and kept in memory per process as long as the versions
+of its models are unchanged, so an admission request reads it without
+touching the database. Saving or deleting any of those rows bumps a
+version (see admission/signals.py and courses/signals.py) and the next
+read rebuilds it.
+"""
+
+from collections import defaultdict, namedtuple
+
+from courses.models import Program
+from superiorErp.cache import cached, get_versions
+from .models import AdmissionCriteria, ProgramDetails, SemesterRoadmap
+
+CATALOG_MODELS = [AdmissionCriteria, Program, SemesterRoadmap]
+
+# Landing page text for programs with no description of their own
+PROGRAM_DEFAULTS = {
+    'BSCS': ('Comprehensive program in Computer Science with focus on software development and algorithms', '💻'),
+    'BSDS': ('Advanced program in Data Science with machine learning, analytics, and big data', '📊'),
+    'BSAI': ('Cutting-edge program in AI with deep learning, NLP, and intelligent systems', '🤖'),
+    'BSCYBERSEC': ('Specialized program in Cyber Security with network security and cryptography', '🔐'),
+    'BSSE': ('Professional program in Software Engineering with project management and design patterns', '⚙️'),
+}
+
+FEE_FIELDS = ['admission_fee', 'semester_fee', 'student_card_fee', 'transport_fee']
+
+CatalogProgram = namedtuple('CatalogProgram', [
+    'code',
+    'name',
+    'duration',
+    'description',
+    'icon',
+    'semesters',
+    'credits',
+    'criteria',   # AdmissionCriteria or None
+    'roadmap',    # SemesterRoadmap rows by semester and course code
+])
+# programs: {code: CatalogProgram}, in Program.PROGRAM_CHOICES order
+# fees:     {field: amount}, the ProgramDetails defaults
+Catalog = namedtuple('Catalog', 'programs fees')
+
+_snapshot = (None, None)
+
+
+def get_catalog():
+    global _snapshot
+    versions = get_versions(CATALOG_MODELS)
+    snapshot_versions, catalog = _snapshot
+    if snapshot_versions != versions:
+        catalog = cached('admission:catalog', CATALOG_MODELS, build_catalog)
+        _snapshot = (versions, catalog)
+    return catalog
+
+
+def get_program(code):
+    """CatalogProgram for a code, or None"""
+    return get_catalog().programs.get(code)
+
+
+def build_catalog():
+    rows = {program.code: program for program in Program.objects.all()}
+    criteria = {criteria.program: criteria for criteria in AdmissionCriteria.objects.all()}
+    roadmaps = defaultdict(list)
+    for row in SemesterRoadmap.objects.order_by('semester', 'course_code'):
+        roadmaps[row.program].append(row)
+
+    programs = {}
+    for code, name in Program.PROGRAM_CHOICES:
+        row = rows.get(code)
+        description, icon = PROGRAM_DEFAULTS.get(code, ('', '🎓'))
+        semesters = row.total_semesters if row else 8
+        programs[code] = CatalogProgram(
+            code=code,
+            name=row.name if row else name,
+            duration=f'{semesters} Semesters',
+            description=(row.description if row else '') or description,
+            icon=icon,
+            semesters=semesters,
+            credits=row.credits_required if row else 120,
+            criteria=criteria.get(code),
+            roadmap=tuple(roadmaps[code]),
+        )
+
+    fees = {field: ProgramDetails._meta.get_field(field).default for field in FEE_FIELDS}
+    return Catalog(programs=programs, fees=fees)
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admission.catalog import get_catalog
+from admission.merit import generate_merit_lists
+from admission.models import CourseSelection
+
+
+class Command(BaseCommand):
+    help = 'Score, rank and assign seats to admission applications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--program', action='append', help='Program code (repeatable; default: every program)')
+        parser.add_argument('--intake', action='append', choices=[intake for intake, label in CourseSelection.INTAKE_CHOICES],
+                            help='Intake (repeatable; default: both)')
+        parser.add_argument('--seats', type=int, default=None, help='Seats per list, overriding AdmissionCriteria.seats')
+        parser.add_argument('--dry-run', action='store_true', help='Compute the lists without saving them')
+
+    def handle(self, *args, **options):
+        programs = options['program']
+        unknown = set(programs or ()) - set(get_catalog().programs)
+        if unknown:
+            raise CommandError(f'Unknown program: {", ".join(sorted(unknown))}')
+        if options['seats'] is not None and options['seats'] < 0:
+            raise CommandError('--seats must not be negative')
+
+        started = time.perf_counter()
+        merit_lists = generate_merit_lists(
+            programs, options['intake'], seats=options['seats'], commit=not options['dry_run'],
+        )
+        for merit in merit_lists:
+            if not merit.applicants:
+                continue
+            cutoff = f'{merit.cutoff:.2f}' if merit.cutoff is not None else '-'
+            self.stdout.write(
+                f'{merit.program} {merit.intake}: {merit.applicants} applicants, {merit.selected} selected, '
+                f'{merit.waitlisted} waitlisted, {merit.ineligible} ineligible, cutoff {cutoff}, {merit.updated} changed'
+            )
+
+        total = sum(merit.applicants for merit in merit_lists)
+        action = 'Scored' if options['dry_run'] else 'Ranked'
+        self.stdout.write(self.style.SUCCESS(f'{action} {total} applications in {time.perf_counter() - started:.2f}s'))
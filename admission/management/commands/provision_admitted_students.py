@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admission.provisioning import ProvisioningError, pending_applications, provision_batch
+from admission.views import send_admission_confirmation_email
+
+
+class Command(BaseCommand):
+    help = 'Create student accounts for approved applications that have none yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Applications per transaction')
+        parser.add_argument('--processes', type=int, default=None, help='Password hashing processes (default: one per CPU)')
+        parser.add_argument('--no-email', action='store_true', help='Do not queue admission confirmation emails')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        if options['processes'] is not None and options['processes'] < 1:
+            raise CommandError('--processes must be positive')
+
+        total, skipped_ids = 0, set()
+        while True:
+            batch = list(pending_applications().exclude(pk__in=skipped_ids)[:options['batch_size']])
+            if not batch:
+                break
+
+            started = time.perf_counter()
+            try:
+                provisioned, skipped = provision_batch(batch, options['processes'])
+            except ProvisioningError as e:
+                raise CommandError(str(e))
+            for application, reason in skipped:
+                skipped_ids.add(application.pk)
+                self.stderr.write(f'Skipped {reason}')
+            if not options['no_email']:
+                for application in provisioned:
+                    send_admission_confirmation_email(application)
+
+            total += len(provisioned)
+            self.stdout.write(f'Provisioned {len(provisioned)} students in {time.perf_counter() - started:.2f}s')
+
+        self.stdout.write(self.style.SUCCESS(f'{total} students provisioned, {len(skipped_ids)} skipped'))
@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from admission.outbox import send_batch
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbound emails in batches over one connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE, help='Emails per connection')
+        parser.add_argument('--watch', action='store_true', help='Keep polling for new emails instead of exiting when none are due')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls of an empty outbox with --watch')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        try:
+            while True:
+                started = time.perf_counter()
+                outcomes = send_batch(options['batch_size'])
+                if outcomes:
+                    summary = ', '.join(f'{count} {status}' for status, count in sorted(outcomes.items()))
+                    self.stdout.write(f'Processed {sum(outcomes.values())} emails in {time.perf_counter() - started:.2f}s: {summary}')
+                elif options['watch']:
+                    time.sleep(options['interval'])
+                else:
+                    break
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('Outbox drained'))
@@ -0,0 +1,129 @@
+"""
+Eligibility scoring and merit lists.
+
+An applicant's aggregate is a weighted mean of their FSc and matric
+percentages (ADMISSION_MERIT_WEIGHTS). They are eligible when both
+percentages and the aggregate reach the program's AdmissionCriteria.
+Stage 3 scores one applicant with aggregate() and is_eligible(); a merit
+run scores every application for a program and intake from a single
+query, ranks the eligible ones (aggregate, then FSc, then first to
+apply), gives the first AdmissionCriteria.seats of them a seat and
+waitlists the rest, and writes back only the rows whose result changed.
+Rejected applications are scored but never ranked, so a rejection frees
+its seat on the next run. Changed rows are written with
+superiorErp.bulk.update_rows().
+"""
+
+from collections import namedtuple
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from superiorErp.bulk import update_rows
+from .catalog import get_catalog, get_program
+from .models import CourseSelection
+
+TWO_PLACES = Decimal('0.01')
+
+MeritList = namedtuple('MeritList', 'program intake applicants selected waitlisted ineligible cutoff updated')
+
+
+def get_weights(weights=None):
+    """(fsc, matric) weights, normalised to sum to 1"""
+    weights = weights or settings.ADMISSION_MERIT_WEIGHTS
+    try:
+        fsc, matric = Decimal(str(weights['fsc'])), Decimal(str(weights['matric']))
+    except KeyError as e:
+        raise ImproperlyConfigured(f'ADMISSION_MERIT_WEIGHTS needs a weight for {e}')
+    if fsc < 0 or matric < 0 or not fsc + matric:
+        raise ImproperlyConfigured('ADMISSION_MERIT_WEIGHTS must be non-negative and not all zero')
+    return fsc / (fsc + matric), matric / (fsc + matric)
+
+
+def aggregate(fsc_percentage, matric_percentage, weights=None):
+    """Weighted aggregate of two percentages, to two decimal places"""
+    fsc_weight, matric_weight = weights or get_weights()
+    score = Decimal(fsc_percentage) * fsc_weight + Decimal(matric_percentage) * matric_weight
+    return score.quantize(TWO_PLACES, ROUND_HALF_UP)
+
+
+def is_eligible(criteria, fsc_percentage, matric_percentage, score):
+    return (
+        fsc_percentage >= criteria.min_fsc_percentage
+        and matric_percentage >= criteria.min_matric_percentage
+        and score >= criteria.min_aggregate_score
+    )
+
+
+def generate_merit_list(program, intake, weights=None, seats=None, commit=True):
+    """Score and rank every application for program and intake; returns a MeritList.
+
+    seats defaults to AdmissionCriteria.seats; no seat limit if neither is
+    set. Rejected applications and those without criteria or previous
+    education are ineligible.
+    """
+    catalog_program = get_program(program)
+    criteria = catalog_program.criteria if catalog_program else None
+    if seats is None and criteria is not None:
+        seats = criteria.seats
+    weights = get_weights(weights)
+
+    rows = (
+        CourseSelection.objects.filter(program=program, intake=intake)
+        .order_by()
+        .values_list(
+            'pk', 'application__admission_status', 'application__previous_education__fsc_percentage',
+            'application__previous_education__matric_percentage', 'application__created_at',
+            'eligibility_score', 'meets_criteria', 'merit_position', 'merit_status',
+        )
+    )
+
+    eligible, results = [], {}
+    for pk, admission_status, fsc, matric, applied_at, *current in rows:
+        if fsc is None or matric is None or criteria is None:
+            results[pk] = (Decimal(0), False, None, 'ineligible', current)
+            continue
+        score = aggregate(fsc, matric, weights)
+        meets = is_eligible(criteria, fsc, matric, score)
+        if meets and admission_status != 'rejected':
+            eligible.append((-score, -fsc, applied_at, pk))
+            results[pk] = (score, True, None, None, current)
+        else:
+            results[pk] = (score, meets, None, 'ineligible', current)
+
+    eligible.sort()
+    for position, (_, _, _, pk) in enumerate(eligible, 1):
+        score, meets, _, _, current = results[pk]
+        status = 'selected' if seats is None or position <= seats else 'waitlisted'
+        results[pk] = (score, meets, position, status, current)
+
+    changed = [
+        (pk, score, meets, position, status)
+        for pk, (score, meets, position, status, current) in results.items()
+        if [score, meets, position, status] != current
+    ]
+    if commit and changed:
+        # A full re-rank changes nearly every row: too many for bulk_update
+        update_rows(
+            CourseSelection, ['eligibility_score', 'meets_criteria', 'merit_position', 'merit_status'], changed,
+        )
+
+    selected = len(eligible) if seats is None else min(seats, len(eligible))
+    return MeritList(
+        program=program,
+        intake=intake,
+        applicants=len(results),
+        selected=selected,
+        waitlisted=len(eligible) - selected,
+        ineligible=len(results) - len(eligible),
+        cutoff=-eligible[selected - 1][0] if selected else None,
+        updated=len(changed),
+    )
+
+
+def generate_merit_lists(programs=None, intakes=None, **kwargs):
+    """Merit lists for every program and intake (or the given ones)"""
+    programs = programs or list(get_catalog().programs)
+    intakes = intakes or [intake for intake, label in CourseSelection.INTAKE_CHOICES]
+    return [generate_merit_list(program, intake, **kwargs) for program in programs for intake in intakes]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:44
+
+import re
+
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    """Start each sequence after the highest roll number already issued"""
+    StudentProfile = apps.get_model('accounts', 'StudentProfile')
+    RollNumberSequence = apps.get_model('admission', 'RollNumberSequence')
+    pattern = re.compile(r'^su(\d{2})-([a-z0-9]+)-([fs])(\d{2})-(\d+)$')
+    intakes = {'f': 'fall', 's': 'spring'}
+
+    highest = {}
+    for roll_number in StudentProfile.objects.values_list('roll_number', flat=True).iterator():
+        match = pattern.match(roll_number.lower())
+        if match:
+            key = (match[2].upper(), intakes[match[3]], int(match[1]))
+            highest[key] = max(highest.get(key, 0), int(match[5]))
+    RollNumberSequence.objects.bulk_create(
+        RollNumberSequence(program=program, intake=intake, year=year, last_value=value)
+        for (program, intake, year), value in highest.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('admission', '0002_outbound_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollNumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('program', models.CharField(max_length=20)),
+                ('intake', models.CharField(max_length=10)),
+                ('year', models.PositiveSmallIntegerField(help_text='Two-digit admission year')),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Roll Number Sequence',
+                'unique_together': {('program', 'intake', 'year')},
+            },
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admission', '0003_roll_number_sequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='admissioncriteria',
+            name='seats',
+            field=models.PositiveIntegerField(blank=True, help_text='Seats per intake; blank for no limit', null=True),
+        ),
+        migrations.AddField(
+            model_name='courseselection',
+            name='merit_position',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='courseselection',
+            name='merit_status',
+            field=models.CharField(blank=True, choices=[('selected', 'Selected'), ('waitlisted', 'Waitlisted'), ('ineligible', 'Ineligible')], max_length=20, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='courseselection',
+            index=models.Index(fields=['program', 'intake'], name='admission_c_program_603290_idx'),
+        ),
+    ]
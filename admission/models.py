@@ -138,14 +138,25 @@ class CourseSelection(models.Model):
     program = models.CharField(max_length=20, choices=PROGRAM_CHOICES)
     intake = models.CharField(max_length=10, choices=INTAKE_CHOICES)
 
+    MERIT_STATUS_CHOICES = [
+        ('selected', 'Selected'),
+        ('waitlisted', 'Waitlisted'),
+        ('ineligible', 'Ineligible'),
+    ]
+
     eligibility_score = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     meets_criteria = models.BooleanField(default=False)
 
+    # Set by merit list runs (admission/merit.py)
+    merit_position = models.PositiveIntegerField(blank=True, null=True)
+    merit_status = models.CharField(max_length=20, choices=MERIT_STATUS_CHOICES, blank=True, null=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Course Selection'
+        indexes = [models.Index(fields=['program', 'intake'])]
 
     def __str__(self):
         return f"{self.program} - {self.application.application_id}"
@@ -250,6 +261,7 @@ class AdmissionCriteria(models.Model):
     min_fsc_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=60)
     min_matric_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=50)
     min_aggregate_score = models.DecimalField(max_digits=5, decimal_places=2, default=70)
+    seats = models.PositiveIntegerField(blank=True, null=True, help_text='Seats per intake; blank for no limit')
 
     class Meta:
         verbose_name = 'Admission Criteria'
@@ -257,3 +269,47 @@ class AdmissionCriteria(models.Model):
     def __str__(self):
         return f"Criteria - {self.program}"
 
+
+# Outbound Email (outbox drained by `manage.py send_outbox`)
+class OutboundEmail(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Outbound Email'
+        verbose_name_plural = 'Outbound Emails'
+        ordering = ['id']
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.get_status_display()})"
+
+
+# Roll Number Sequence (last number handed out per program, intake and year)
+class RollNumberSequence(models.Model):
+    program = models.CharField(max_length=20)
+    intake = models.CharField(max_length=10)
+    year = models.PositiveSmallIntegerField(help_text='Two-digit admission year')
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('program', 'intake', 'year')
+        verbose_name = 'Roll Number Sequence'
+
+    def __str__(self):
+        return f"{self.program} {self.intake} {self.year:02d} - {self.last_value}"
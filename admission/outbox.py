@@ -0,0 +1,119 @@
+"""
+Outbound email queue.
+
+Views call enqueue(), which only inserts an OutboundEmail row, so SMTP
+latency never reaches the applicant. `manage.py send_outbox` drains the
+table: send_batch() claims due rows (marking them 'sending' with a lease,
+so a crashed worker's batch is retried once the lease runs out), sends
+them over one connection, and records the outcome. Failed messages are
+retried with exponential backoff and marked 'dead' after
+OUTBOX_MAX_ATTEMPTS; an expired lease counts as a failed attempt, so a
+message that keeps crashing its worker dies too.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+def enqueue(subject, body, recipients, from_email=None):
+    """Queue an email for the outbox worker; returns the OutboundEmail"""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipients),
+    )
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt after `attempts` failures"""
+    return settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def claim(batch_size):
+    """Lease up to batch_size due emails to this worker.
+
+    Emails whose lease expired were being sent by a worker that never
+    recorded the outcome; that counts as an attempt, and those past
+    OUTBOX_MAX_ATTEMPTS are returned already 'dead'.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update()
+            .filter(status__in=['queued', 'sending'], next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        expired = [email for email in emails if email.status == 'sending']
+        if expired:
+            error = 'Lease expired before the outcome was recorded'
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in expired]).update(
+                attempts=F('attempts') + 1, last_error=error,
+            )
+            for email in expired:
+                email.attempts += 1
+                email.last_error = error
+                if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    email.status = 'dead'
+            OutboundEmail.objects.filter(
+                pk__in=[email.pk for email in expired], attempts__gte=settings.OUTBOX_MAX_ATTEMPTS,
+            ).update(status='dead')
+
+        OutboundEmail.objects.filter(pk__in=[email.pk for email in emails if email.status != 'dead']).update(
+            status='sending', next_attempt_at=now + timedelta(seconds=settings.OUTBOX_LEASE),
+        )
+    return emails
+
+
+def send_batch(batch_size=None, connection=None):
+    """Send up to batch_size due emails; returns a Counter of outcomes"""
+    claimed = claim(batch_size or settings.OUTBOX_BATCH_SIZE)
+    emails = [email for email in claimed if email.status != 'dead']
+    if not emails:
+        return Counter(email.status for email in claimed)
+
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        # Nothing can be sent; every message waits for the next attempt
+        for email in emails:
+            _failed(email, e)
+    else:
+        try:
+            for email in emails:
+                message = EmailMessage(email.subject, email.body, email.from_email, email.recipients, connection=connection)
+                try:
+                    sent = connection.send_messages([message])
+                except Exception as e:
+                    _failed(email, e)
+                    continue
+                if sent:
+                    email.status = 'sent'
+                    email.sent_at = timezone.now()
+                    email.last_error = ''
+                else:
+                    _failed(email, 'The backend did not accept the message')
+        finally:
+            connection.close()
+
+    OutboundEmail.objects.bulk_update(emails, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'])
+    return Counter(email.status for email in claimed)
+
+
+def _failed(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = 'dead'
+    else:
+        email.status = 'queued'
+        email.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(email.attempts))
@@ -0,0 +1,193 @@
+"""
+Student credential provisioning.
+
+An approved application gets a roll number, a university email, a User
+(with the roll number as initial password) and a StudentProfile. All of
+it is written in one transaction, so a failure leaves nothing behind and
+the application can simply be provisioned again.
+
+provision() handles one application during the payment request.
+provision_batch() handles many at once for intake day (manage.py
+provision_admitted_students): roll numbers are allocated in blocks, the
+PBKDF2 hashes (the expensive part) are computed in a process pool, and
+the rows are written with bulk_create.
+"""
+
+import logging
+import os
+import uuid
+from collections import defaultdict
+
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+
+from accounts.models import User, StudentProfile
+from superiorErp.workers import process_pool
+from .models import AdmissionApplication
+from .rollnumbers import next_roll_numbers
+
+logger = logging.getLogger(__name__)
+
+
+class ProvisioningError(Exception):
+    """An application that cannot be given credentials"""
+
+
+def university_email_for(roll_number):
+    return f'student.{roll_number}@superior.edu.pk'
+
+
+def pending_applications():
+    """Approved applications that have no credentials yet"""
+    return (
+        AdmissionApplication.objects.filter(admission_status='approved', roll_number__isnull=True)
+        .select_related('personal_info', 'course_selection')
+        .order_by('pk')
+    )
+
+
+def _details(application):
+    try:
+        return application.personal_info, application.course_selection
+    except (AdmissionApplication.personal_info.RelatedObjectDoesNotExist,
+            AdmissionApplication.course_selection.RelatedObjectDoesNotExist):
+        raise ProvisioningError(f'{application.application_id} has no personal information or course selection')
+
+
+def _build(application, personal_info, course_selection, roll_number, password):
+    """Unsaved (User, StudentProfile) for an application"""
+    university_email = university_email_for(roll_number)
+    name_parts = (personal_info.full_name or '').split()
+    user = User(
+        email=User.objects.normalize_email(university_email),
+        username=roll_number,
+        password=password,
+        first_name=name_parts[0] if name_parts else 'Student',
+        last_name=' '.join(name_parts[1:]),
+        role='student',
+        phone=personal_info.phone or '',
+        is_verified=True,
+        is_active=True,
+    )
+    profile = StudentProfile(
+        user=user,
+        roll_number=roll_number,
+        father_name=personal_info.father_name or 'N/A',
+        cnic=personal_info.cnic or f'TEMP-{uuid.uuid4().hex[:10]}',
+        date_of_birth=personal_info.date_of_birth,
+        gender=personal_info.gender or 'M',
+        personal_email=application.email,
+        university_email=university_email,
+        whatsapp_number=personal_info.whatsapp or '',
+        intake=course_selection.intake,
+        program=course_selection.program,
+        is_approved=True,
+    )
+    application.roll_number = roll_number
+    application.university_email = university_email
+    return user, profile
+
+
+def provision(application):
+    """Give one application its roll number, User and StudentProfile.
+
+    Raises ProvisioningError if the application lacks the data or clashes
+    with an existing account; nothing is saved in that case.
+    """
+    if application.roll_number:
+        return StudentProfile.objects.filter(roll_number=application.roll_number).first()
+
+    personal_info, course_selection = _details(application)
+    # Allocated and hashed before the write transaction so the sequence row
+    # is not locked while hashing; a failed write only leaves a gap.
+    roll_number, = next_roll_numbers(course_selection.program, course_selection.intake)
+    user, profile = _build(application, personal_info, course_selection, roll_number, make_password(roll_number))
+    try:
+        with transaction.atomic():
+            user.save()
+            profile.user = user
+            profile.save()
+            application.save(update_fields=['roll_number', 'university_email', 'updated_at'])
+    except IntegrityError as e:
+        application.roll_number, application.university_email = None, ''
+        raise ProvisioningError(f'{application.application_id} clashes with an existing account: {e}') from e
+
+    logger.info('Provisioned %s as %s', application.application_id, roll_number)
+    return profile
+
+
+def hash_passwords(passwords, processes=None):
+    """make_password over passwords, in a process pool unless processes == 1
+
+    The workers run make_password itself: django.contrib.auth.hashers
+    imports no models, so a spawned worker can load it.
+    """
+    passwords = list(passwords)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    with process_pool(processes) as executor:
+        return list(executor.map(make_password, passwords, chunksize=max(1, len(passwords) // (processes * 4))))
+
+
+def provision_batch(applications, processes=None):
+    """Provision many applications with bulk inserts; returns (provisioned, skipped).
+
+    Applications missing data, or whose CNIC or personal email already
+    belongs to a student, are skipped and reported, not raised.
+    """
+    ready, skipped = [], []
+    for application in applications:
+        if application.roll_number:
+            continue
+        try:
+            ready.append((application, *_details(application)))
+        except ProvisioningError as e:
+            skipped.append((application, str(e)))
+
+    taken_cnics = set(StudentProfile.objects.filter(
+        cnic__in=[personal_info.cnic for _, personal_info, _ in ready],
+    ).values_list('cnic', flat=True))
+    taken_emails = set(StudentProfile.objects.filter(
+        personal_email__in=[application.email for application, _, _ in ready],
+    ).values_list('personal_email', flat=True))
+    accepted, seen = [], set()
+    for application, personal_info, course_selection in ready:
+        keys = {('cnic', personal_info.cnic), ('email', application.email)}
+        if personal_info.cnic in taken_cnics or application.email in taken_emails or keys & seen:
+            skipped.append((application, f'{application.application_id} clashes with an existing student'))
+            continue
+        seen |= keys
+        accepted.append((application, personal_info, course_selection))
+    if not accepted:
+        return [], skipped
+
+    # One block of roll numbers per program and intake
+    cohorts = defaultdict(list)
+    for entry in accepted:
+        cohorts[entry[2].program, entry[2].intake].append(entry)
+    roll_numbers = {}
+    for (program, intake), entries in cohorts.items():
+        for (application, _, _), roll_number in zip(entries, next_roll_numbers(program, intake, len(entries))):
+            roll_numbers[application.pk] = roll_number
+
+    passwords = hash_passwords([roll_numbers[application.pk] for application, _, _ in accepted], processes)
+    pairs = [
+        _build(application, personal_info, course_selection, roll_numbers[application.pk], password)
+        for (application, personal_info, course_selection), password in zip(accepted, passwords)
+    ]
+    provisioned = [application for application, _, _ in accepted]
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create([user for user, _ in pairs])
+            for user, profile in pairs:
+                profile.user = user
+            StudentProfile.objects.bulk_create([profile for _, profile in pairs])
+            AdmissionApplication.objects.bulk_update(provisioned, ['roll_number', 'university_email'])
+    except IntegrityError as e:
+        for application in provisioned:
+            application.roll_number, application.university_email = None, ''
+        raise ProvisioningError(f'Batch clashes with an existing account: {e}') from e
+
+    logger.info('Provisioned %d applications, skipped %d', len(provisioned), len(skipped))
+    return provisioned, skipped
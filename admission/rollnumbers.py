@@ -0,0 +1,76 @@
+"""
+Roll number allocation.
+
+Roll numbers look like su24-bscs-f24-001: admission year, program, intake
+letter with year, and a sequence number. Each (program, intake, year) has
+a RollNumberSequence row whose last_value is bumped with one UPDATE ...
+SET last_value = last_value + n; the row lock it takes serialises
+concurrent approvals, so every caller gets its own numbers without
+counting existing students. A number is never reused, even if the
+approval it was taken for later fails, so gaps are possible.
+"""
+
+import re
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import RollNumberSequence
+
+ROLL_NUMBER = re.compile(r'^su(\d{2})-([a-z0-9]+)-([fs])(\d{2})-(\d+)$')
+INTAKES = {'f': 'fall', 's': 'spring'}
+
+
+def format_roll_number(program, intake, year, number):
+    return f'su{year:02d}-{program.lower()}-{intake[0]}{year:02d}-{number:03d}'
+
+
+def allocate(program, intake, year, count=1):
+    """Reserve count consecutive sequence numbers; returns them as a range"""
+    program = program.upper()
+    with transaction.atomic():
+        sequence = RollNumberSequence.objects.filter(program=program, intake=intake, year=year)
+        if not sequence.update(last_value=F('last_value') + count):
+            try:
+                with transaction.atomic():
+                    RollNumberSequence.objects.create(program=program, intake=intake, year=year, last_value=count)
+            except IntegrityError:
+                # Another worker created the row first
+                sequence.update(last_value=F('last_value') + count)
+        last = sequence.values_list('last_value', flat=True).get()
+    return range(last - count + 1, last + 1)
+
+
+def next_roll_numbers(program, intake, count=1, today=None):
+    """count new roll numbers for this year's intake of a program"""
+    year = (today or date.today()).year % 100
+    return [format_roll_number(program, intake, year, number) for number in allocate(program, intake, year, count)]
+
+
+def sync_sequences():
+    """Move every sequence past the roll numbers already issued (after bulk loads)"""
+    from accounts.models import StudentProfile
+
+    highest = {}
+    for roll_number in StudentProfile.objects.order_by().values_list('roll_number', flat=True).iterator():
+        match = ROLL_NUMBER.match(roll_number.lower())
+        if match and match[3] in INTAKES:
+            key = (match[2].upper(), INTAKES[match[3]], int(match[1]))
+            highest[key] = max(highest.get(key, 0), int(match[5]))
+
+    existing = {
+        (sequence.program, sequence.intake, sequence.year): sequence
+        for sequence in RollNumberSequence.objects.all()
+    }
+    created, updated = [], []
+    for (program, intake, year), value in highest.items():
+        sequence = existing.get((program, intake, year))
+        if sequence is None:
+            created.append(RollNumberSequence(program=program, intake=intake, year=year, last_value=value))
+        elif sequence.last_value < value:
+            sequence.last_value = value
+            updated.append(sequence)
+    RollNumberSequence.objects.bulk_create(created)
+    RollNumberSequence.objects.bulk_update(updated, ['last_value'])
+    return len(created) + len(updated)
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from superiorErp.cache import bump_version
+from .models import AdmissionCriteria, SemesterRoadmap
+
+
+# The admission catalog and degree audits are keyed by these versions
+@receiver([post_save, post_delete], sender=AdmissionCriteria)
+@receiver([post_save, post_delete], sender=SemesterRoadmap)
+def catalog_model_changed(sender, **kwargs):
+    bump_version(sender)
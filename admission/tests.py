@@ -1,3 +1,409 @@
-from django.test import TestCase
+from contextlib import redirect_stdout
+from io import StringIO
 
-# Create your tests here.
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from superiorErp.datasets import build_dataset
+from superiorErp.testing import QueryCountTestCase
+from accounts.models import User, StudentProfile
+from courses.models import Program
+from .models import (
+    AdmissionApplication, AdmissionCriteria, CourseSelection, OutboundEmail, PersonalInformation, PreviousEducation,
+    RollNumberSequence, SemesterRoadmap,
+)
+from .catalog import get_catalog, get_program
+from .merit import aggregate, generate_merit_list
+from .outbox import enqueue, send_batch
+from .provisioning import ProvisioningError, pending_applications, provision, provision_batch
+from .rollnumbers import allocate, next_roll_numbers, sync_sequences
+
+
+class AdmissionQueryCountTests(QueryCountTestCase):
+    """Query counts for every admission stage"""
+
+    @classmethod
+    def setUpTestData(cls):
+        build_dataset(**cls.dataset)
+        cls.applications = {
+            application.current_stage: application
+            for application in AdmissionApplication.objects.order_by('pk')[:5]
+        }
+
+    def setUp(self):
+        super().setUp()
+        # Warm during the admission window; CatalogTests cover the cold path
+        get_catalog()
+
+    def stage_url(self, name, stage):
+        return reverse(name, args=[self.applications[stage].application_id])
+
+    def test_admission_main(self):
+        self.assertViewQueries(0, reverse('admission_main'))
+
+    def test_start_application(self):
+        self.assertViewQueries(0, reverse('start_application'))
+        self.assertViewQueries(2, reverse('start_application'), 'post', {'email': 'new.applicant@gmail.com'})
+
+    def test_admission_login(self):
+        self.assertViewQueries(0, reverse('admission_login'))
+        self.assertViewQueries(1, reverse('admission_login'), 'post', {'email': self.applications['stage_3'].email})
+
+    def test_stage_pages(self):
+        pages = [
+            ('admission_stage1', 'stage_2', 2),
+            ('admission_stage2', 'stage_3', 2),
+            ('admission_stage3', 'stage_4', 3),
+            ('admission_stage4', 'stage_5', 3),
+            ('admission_stage5', 'stage_5', 3),
+            ('admission_confirmation', 'stage_5', 4),
+        ]
+        for name, stage, queries in pages:
+            with self.subTest(view=name):
+                self.assertViewQueries(queries, self.stage_url(name, stage))
+
+    def test_stage1_submit(self):
+        self.assertViewQueries(9, self.stage_url('admission_stage1', 'stage_1'), 'post', {
+            'full_name': 'New Applicant',
+            'father_name': 'Father',
+            'date_of_birth': '2005-05-05',
+            'gender': 'M',
+            'cnic': '35209-0000001-1',
+            'phone': '03001234567',
+            'whatsapp': '03001234567',
+            'address': 'Lahore',
+        })
+
+    def test_stage3_submit(self):
+        self.assertViewQueries(11, self.stage_url('admission_stage3', 'stage_3'), 'post', {
+            'program': 'BSCS',
+            'intake': 'fall',
+        })
+
+    def test_stage4_submit(self):
+        self.assertViewQueries(10, self.stage_url('admission_stage4', 'stage_4'), 'post', {'agree_terms': 'on'})
+
+    def test_stage5_submit(self):
+        with redirect_stdout(StringIO()):
+            self.assertViewQueries(22, self.stage_url('admission_stage5', 'stage_5'), 'post', {
+                'payment_method': 'online',
+            })
+        self.assertEqual(AdmissionApplication.objects.get(pk=self.applications['stage_5'].pk).admission_status, 'approved')
+        self.assertRegex(
+            AdmissionApplication.objects.get(pk=self.applications['stage_5'].pk).roll_number,
+            rf'^su\d\d-[a-z]+-f\d\d-\d{{3,}}$',
+        )
+        # The confirmation is queued, not sent during the request
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(OutboundEmail.objects.filter(subject__startswith='Admission Confirmed', status='queued').exists())
+
+
+class LargerAdmissionQueryCountTests(AdmissionQueryCountTests):
+    """Admission stages again with a larger dataset; every count must hold"""
+
+    dataset = {'students_per_intake': 60, 'applications': 200}
+
+
+class FlakyBackend(EmailBackend):
+    """locmem backend that refuses mail to addresses starting with 'bounce'"""
+
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any(address.startswith('bounce') for message in messages for address in message.to):
+            raise OSError('Recipient refused')
+        return super().send_messages(messages)
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=3, OUTBOX_RETRY_DELAY=60)
+class OutboxTests(TestCase):
+    def setUp(self):
+        FlakyBackend.opened = 0
+
+    def backend(self):
+        return FlakyBackend()
+
+    def test_batch_sent_over_one_connection(self):
+        for n in range(5):
+            enqueue(f'Subject {n}', 'Body', [f'applicant{n}@example.com'])
+
+        self.assertEqual(send_batch(connection=self.backend()), {'sent': 5})
+        self.assertEqual(FlakyBackend.opened, 1)
+        self.assertEqual([message.to for message in mail.outbox], [[f'applicant{n}@example.com'] for n in range(5)])
+        self.assertFalse(OutboundEmail.objects.exclude(status='sent').exists())
+        self.assertEqual(send_batch(connection=self.backend()), {})
+
+    def test_failures_back_off_then_die(self):
+        enqueue('Welcome', 'Body', ['ok@example.com'])
+        bounced = enqueue('Welcome', 'Body', ['bounce@example.com'])
+
+        self.assertEqual(send_batch(connection=self.backend()), {'sent': 1, 'queued': 1})
+        bounced.refresh_from_db()
+        self.assertEqual((bounced.attempts, bounced.last_error), (1, 'Recipient refused'))
+        self.assertGreater(bounced.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        # Not due yet
+        self.assertEqual(send_batch(connection=self.backend()), {})
+
+        for attempt, delay in [(2, 120), (3, None)]:
+            OutboundEmail.objects.filter(pk=bounced.pk).update(next_attempt_at=timezone.now())
+            send_batch(connection=self.backend())
+            bounced.refresh_from_db()
+            self.assertEqual(bounced.attempts, attempt)
+            if delay:
+                self.assertEqual(bounced.status, 'queued')
+                self.assertGreater(bounced.next_attempt_at, timezone.now() + timedelta(seconds=delay - 10))
+        self.assertEqual(bounced.status, 'dead')
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_expired_lease_is_reclaimed(self):
+        email = enqueue('Welcome', 'Body', ['applicant@example.com'])
+        OutboundEmail.objects.filter(pk=email.pk).update(status='sending', next_attempt_at=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(send_batch(connection=self.backend()), {})
+
+        OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(send_batch(connection=self.backend()), {'sent': 1})
+        email.refresh_from_db()
+        # the crashed send counts as an attempt
+        self.assertEqual(email.attempts, 1)
+
+    def test_email_that_keeps_losing_its_lease_dies(self):
+        email = enqueue('Welcome', 'Body', ['applicant@example.com'])
+        OutboundEmail.objects.filter(pk=email.pk).update(status='sending', attempts=2, next_attempt_at=timezone.now())
+        self.assertEqual(send_batch(connection=self.backend()), {'dead': 1})
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('dead', 3))
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_send_outbox_command(self):
+        enqueue('Welcome', 'Body', ['applicant@example.com'])
+        out = StringIO()
+        call_command('send_outbox', stdout=out)
+        self.assertIn('1 sent', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class RollNumberTests(TestCase):
+    def test_sequences_are_independent_and_consecutive(self):
+        self.assertEqual(list(allocate('BSCS', 'fall', 25)), [1])
+        self.assertEqual(list(allocate('bscs', 'fall', 25, count=3)), [2, 3, 4])
+        self.assertEqual(list(allocate('BSCS', 'spring', 25)), [1])
+        self.assertEqual(list(allocate('BSSE', 'fall', 25)), [1])
+        self.assertEqual(RollNumberSequence.objects.get(program='BSCS', intake='fall', year=25).last_value, 4)
+
+    def test_allocation_does_not_count_students(self):
+        allocate('BSCS', 'fall', 25)
+        # update, read back, and the savepoint around them
+        with self.assertNumQueries(4):
+            allocate('BSCS', 'fall', 25)
+
+    def test_roll_number_format(self):
+        today = timezone.now().date().replace(year=2025)
+        self.assertEqual(next_roll_numbers('BSCS', 'fall', today=today), ['su25-bscs-f25-001'])
+        self.assertEqual(next_roll_numbers('BSCS', 'spring', 2, today=today), ['su25-bscs-s25-001', 'su25-bscs-s25-002'])
+
+    def test_sync_skips_issued_numbers(self):
+        build_dataset(programs=1, students_per_intake=3, courses_per_semester=1, weeks=1, applications=0)
+        highest = RollNumberSequence.objects.get(intake='fall').last_value
+        self.assertEqual(highest, 2)
+        self.assertEqual(sync_sequences(), 0)
+        sequence = RollNumberSequence.objects.get(intake='fall')
+        self.assertEqual(list(allocate(sequence.program, 'fall', sequence.year)), [3])
+
+
+class ProvisioningTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for n in range(4):
+            application = AdmissionApplication.objects.create(email=f'applicant{n}@gmail.com', admission_status='approved')
+            PersonalInformation.objects.create(
+                application=application, full_name=f'Applicant Number {n}', father_name='Father',
+                date_of_birth='2005-01-01', gender='F', cnic=f'35202-000000{n}-1',
+                phone='03001234567', whatsapp='03001234567', address='Lahore',
+            )
+            CourseSelection.objects.create(
+                application=application, program='BSCS' if n % 2 else 'BSSE', intake='fall',
+                eligibility_score=80, meets_criteria=True,
+            )
+        # Approved but never got past stage 1
+        cls.incomplete = AdmissionApplication.objects.create(email='incomplete@gmail.com', admission_status='approved')
+
+    def test_provision(self):
+        application = pending_applications().first()
+        profile = provision(application)
+
+        application.refresh_from_db()
+        self.assertEqual(profile.roll_number, application.roll_number)
+        self.assertEqual(profile.university_email, application.university_email)
+        self.assertEqual((profile.user.first_name, profile.user.last_name), ('Applicant', 'Number 0'))
+        self.assertTrue(User.objects.get(pk=profile.user_id).check_password(application.roll_number))
+        # Already provisioned: nothing new is created
+        self.assertEqual(provision(application), profile)
+        self.assertEqual(StudentProfile.objects.count(), 1)
+
+    def test_failed_provision_leaves_nothing_behind(self):
+        first, second = pending_applications()[:2]
+        profile = provision(first)
+        StudentProfile.objects.filter(pk=profile.pk).update(personal_email=second.email)
+
+        with self.assertRaises(ProvisioningError):
+            provision(second)
+        second.refresh_from_db()
+        self.assertIsNone(second.roll_number)
+        self.assertEqual(User.objects.count(), 1)
+
+        with self.assertRaises(ProvisioningError):
+            provision(self.incomplete)
+
+    def test_provision_batch(self):
+        # A real process pool, as on intake day
+        provisioned, skipped = provision_batch(pending_applications(), processes=2)
+
+        self.assertEqual(len(provisioned), 4)
+        self.assertEqual([application for application, reason in skipped], [self.incomplete])
+        profiles = StudentProfile.objects.select_related('user').order_by('roll_number')
+        self.assertEqual(
+            [profile.roll_number[-3:] for profile in profiles],
+            ['001', '002', '001', '002'],
+        )
+        for profile in profiles:
+            self.assertTrue(profile.user.check_password(profile.roll_number))
+        self.assertEqual(list(pending_applications()), [self.incomplete])
+
+    def test_provision_admitted_students_command(self):
+        out, err = StringIO(), StringIO()
+        call_command('provision_admitted_students', batch_size=3, processes=2, stdout=out, stderr=err)
+        self.assertIn('4 students provisioned, 1 skipped', out.getvalue())
+        self.assertIn(self.incomplete.application_id, err.getvalue())
+        self.assertEqual(OutboundEmail.objects.filter(subject__startswith='Admission Confirmed').count(), 4)
+
+
+class CatalogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Program.objects.create(code='BSCS', name='BS Computer Science', department='Computing', credits_required=130)
+        AdmissionCriteria.objects.create(program='BSCS', min_fsc_percentage=60, min_matric_percentage=50)
+        for semester, code in [(2, 'CS201'), (1, 'CS102'), (1, 'CS101')]:
+            SemesterRoadmap.objects.create(program='BSCS', semester=semester, course_code=code, course_title=code, credits=3)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_built_once_then_read_from_memory(self):
+        with self.assertNumQueries(3):
+            catalog = get_catalog()
+        with self.assertNumQueries(0):
+            self.assertIs(get_catalog(), catalog)
+
+        bscs = catalog.programs['BSCS']
+        self.assertEqual(list(catalog.programs), [code for code, name in Program.PROGRAM_CHOICES])
+        self.assertEqual((bscs.credits, bscs.criteria.min_fsc_percentage), (130, 60))
+        self.assertEqual([row.course_code for row in bscs.roadmap], ['CS101', 'CS102', 'CS201'])
+        # Programs without a row fall back to the built-in text
+        self.assertEqual((catalog.programs['BSAI'].credits, catalog.programs['BSAI'].icon), (120, '🤖'))
+        self.assertIsNone(catalog.programs['BSAI'].criteria)
+        self.assertEqual(catalog.fees['semester_fee'], 75000)
+
+    def test_refreshed_on_change(self):
+        get_catalog()
+        AdmissionCriteria.objects.filter(program='BSCS').get().delete()
+        self.assertIsNone(get_program('BSCS').criteria)
+
+        SemesterRoadmap.objects.create(program='BSCS', semester=3, course_code='CS301', course_title='CS301', credits=3)
+        self.assertEqual(get_program('BSCS').roadmap[-1].course_code, 'CS301')
+
+        program = Program.objects.get(code='BSCS')
+        program.name = 'BS Computing'
+        program.save()
+        self.assertEqual(get_program('BSCS').name, 'BS Computing')
+
+
+class MeritListTests(TestCase):
+    # (fsc, matric) per applicant, in order of application
+    MARKS = [(80, 70), (90, 90), (60, 95), (85, 75), (95, 45), (70, 70), (80, 80)]
+
+    @classmethod
+    def setUpTestData(cls):
+        AdmissionCriteria.objects.create(
+            program='BSCS', min_fsc_percentage=60, min_matric_percentage=50, min_aggregate_score=70, seats=3,
+        )
+        cls.selections = []
+        for n, (fsc, matric) in enumerate(cls.MARKS):
+            application = AdmissionApplication.objects.create(email=f'applicant{n}@gmail.com')
+            PreviousEducation.objects.create(application=application, fsc_percentage=fsc, matric_percentage=matric)
+            cls.selections.append(CourseSelection.objects.create(application=application, program='BSCS', intake='fall'))
+        # No previous education
+        application = AdmissionApplication.objects.create(email='incomplete@gmail.com')
+        cls.selections.append(CourseSelection.objects.create(application=application, program='BSCS', intake='fall'))
+
+    def setUp(self):
+        cache.clear()
+
+    def results(self):
+        return [
+            tuple(row) for row in CourseSelection.objects.filter(pk__in=[s.pk for s in self.selections])
+            .order_by('pk').values_list('merit_position', 'merit_status')
+        ]
+
+    def test_aggregate(self):
+        self.assertEqual(aggregate(80, 70), Decimal('75.00'))
+        with override_settings(ADMISSION_MERIT_WEIGHTS={'fsc': 3, 'matric': 1}):
+            self.assertEqual(aggregate(80, 70), Decimal('77.50'))
+
+    def test_merit_list(self):
+        merit = generate_merit_list('BSCS', 'fall')
+
+        self.assertEqual(merit[2:], (8, 3, 3, 2, Decimal('80.00'), 8))
+        self.assertEqual(self.results(), [
+            (5, 'waitlisted'),     # 75.00
+            (1, 'selected'),       # 90.00
+            (4, 'waitlisted'),     # 77.50
+            (2, 'selected'),       # 80.00, ahead on FSc
+            (None, 'ineligible'),  # matric below the minimum
+            (6, 'waitlisted'),     # 70.00, exactly the minimum aggregate
+            (3, 'selected'),       # 80.00
+            (None, 'ineligible'),  # no previous education
+        ])
+        self.assertTrue(CourseSelection.objects.get(pk=self.selections[5].pk).meets_criteria)
+
+    def test_rerun_only_writes_changes(self):
+        generate_merit_list('BSCS', 'fall')
+        with self.assertNumQueries(1):
+            self.assertEqual(generate_merit_list('BSCS', 'fall').updated, 0)
+
+        merit = generate_merit_list('BSCS', 'fall', seats=4)
+        self.assertEqual((merit.selected, merit.cutoff, merit.updated), (4, Decimal('77.50'), 1))
+        self.assertEqual(self.results()[2], (4, 'selected'))
+
+    def test_rejection_frees_the_seat(self):
+        generate_merit_list('BSCS', 'fall')
+        rejected = self.selections[1]
+        AdmissionApplication.objects.filter(pk=rejected.application_id).update(admission_status='rejected')
+        before = CourseSelection.objects.get(pk=rejected.pk).updated_at
+
+        merit = generate_merit_list('BSCS', 'fall')
+        self.assertEqual((merit.selected, merit.waitlisted, merit.ineligible), (3, 2, 3))
+        self.assertEqual(self.results()[1], (None, 'ineligible'))
+        self.assertEqual(self.results()[0], (4, 'waitlisted'))
+        self.assertEqual(self.results()[2], (3, 'selected'))
+        self.assertGreater(CourseSelection.objects.get(pk=rejected.pk).updated_at, before)
+
+    def test_generate_merit_list_command(self):
+        out = StringIO()
+        call_command('generate_merit_list', program=['BSCS'], dry_run=True, stdout=out)
+        self.assertIn('BSCS fall: 8 applicants, 3 selected, 3 waitlisted, 2 ineligible, cutoff 80.00', out.getvalue())
+        self.assertEqual(self.results()[1], (None, None))
+
+        call_command('generate_merit_list', stdout=StringIO())
+        self.assertEqual(self.results()[1], (1, 'selected'))
@@ -1,12 +1,15 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
-from django.core.mail import send_mail
 from django.conf import settings
-from datetime import date
 import json
+import logging
 import uuid
 
+from .catalog import get_catalog, get_program
+from .merit import aggregate, is_eligible
+from .outbox import enqueue
+from .provisioning import ProvisioningError, provision
 from .models import (
     AdmissionApplication,
     PersonalInformation,
@@ -14,51 +17,15 @@ from .models import (
     CourseSelection,
     ProgramDetails,
     PaymentInformation,
-    SemesterRoadmap,
-    AdmissionCriteria,
 )
 
+logger = logging.getLogger(__name__)
+
 
 # Main Admission Page
 def admission_main(request):
     """Main admission landing page"""
-    programs = [
-        {
-            'code': 'BSCS',
-            'name': 'BS Computer Science',
-            'duration': '8 Semesters',
-            'description': 'Comprehensive program in Computer Science with focus on software development and algorithms',
-            'icon': '💻'
-        },
-        {
-            'code': 'BSDS',
-            'name': 'BS Data Science',
-            'duration': '8 Semesters',
-            'description': 'Advanced program in Data Science with machine learning, analytics, and big data',
-            'icon': '📊'
-        },
-        {
-            'code': 'BSAI',
-            'name': 'BS Artificial Intelligence',
-            'duration': '8 Semesters',
-            'description': 'Cutting-edge program in AI with deep learning, NLP, and intelligent systems',
-            'icon': '🤖'
-        },
-        {
-            'code': 'BSCYBERSEC',
-            'name': 'BS Cyber Security',
-            'duration': '8 Semesters',
-            'description': 'Specialized program in Cyber Security with network security and cryptography',
-            'icon': '🔐'
-        },
-        {
-            'code': 'BSSE',
-            'name': 'BS Software Engineering',
-            'duration': '8 Semesters',
-            'description': 'Professional program in Software Engineering with project management and design patterns',
-            'icon': '⚙️'
-        },
-    ]
+    programs = list(get_catalog().programs.values())
 
     context = {
         'programs': programs,
@@ -284,27 +251,15 @@ def admission_stage3(request, app_id):
 
         if previous_education:
             # Get criteria for this program
-            criteria = AdmissionCriteria.objects.filter(program=program).first()
+            catalog_program = get_program(program)
+            criteria = catalog_program.criteria if catalog_program else None
 
             if criteria and previous_education.fsc_percentage and previous_education.matric_percentage:
-                try:
-                    # Get actual percentages
-                    fsc_pct = float(previous_education.fsc_percentage)
-                    matric_pct = float(previous_education.matric_percentage)
-
-                    # Simple eligibility check: both percentages must meet minimum
-                    meets_criteria = (
-                        fsc_pct >= float(criteria.min_fsc_percentage) and
-                        matric_pct >= float(criteria.min_matric_percentage)
-                    )
-
-                    # Calculate eligibility score (simple average)
-                    eligibility_score = (fsc_pct + matric_pct) / 2
-
-                except (TypeError, ValueError) as e:
-                    print(f"Eligibility calculation error: {str(e)}")
-                    meets_criteria = False
-                    eligibility_score = 0
+                # Weighted aggregate, checked against every minimum of the program
+                eligibility_score = aggregate(previous_education.fsc_percentage, previous_education.matric_percentage)
+                meets_criteria = is_eligible(
+                    criteria, previous_education.fsc_percentage, previous_education.matric_percentage, eligibility_score,
+                )
 
         # Save course selection
         course_selection, created = CourseSelection.objects.update_or_create(
@@ -336,13 +291,7 @@ def admission_stage3(request, app_id):
         else:
             return redirect('admission_stage3', app_id=app_id)
 
-    programs = [
-        ('BSCS', 'BS Computer Science'),
-        ('BSDS', 'BS Data Science'),
-        ('BSAI', 'BS Artificial Intelligence'),
-        ('BSCYBERSEC', 'BS Cyber Security'),
-        ('BSSE', 'BS Software Engineering'),
-    ]
+    programs = [(code, program.name) for code, program in get_catalog().programs.items()]
 
     context = {
         'application': application,
@@ -371,10 +320,9 @@ def admission_stage4(request, app_id):
         program_details = None
 
     # Get semester roadmap
-    if course_selection:
-        roadmap = SemesterRoadmap.objects.filter(program=course_selection.program).order_by('semester')
-    else:
-        roadmap = []
+    catalog = get_catalog()
+    program = catalog.programs.get(course_selection.program) if course_selection else None
+    roadmap = program.roadmap if program else []
 
     if request.method == 'POST':
         agree = request.POST.get('agree_terms') == 'on'
@@ -398,25 +346,16 @@ def admission_stage4(request, app_id):
         messages.success(request, 'Program details confirmed! Proceeding to payment.')
         return redirect('admission_stage5', app_id=app_id)
 
-    # Get program info
-    program_info = {
-        'BSCS': 'BS Computer Science - 8 Semesters, 120 Credits',
-        'BSDS': 'BS Data Science - 8 Semesters, 120 Credits',
-        'BSAI': 'BS Artificial Intelligence - 8 Semesters, 120 Credits',
-        'BSCYBERSEC': 'BS Cyber Security - 8 Semesters, 120 Credits',
-        'BSSE': 'BS Software Engineering - 8 Semesters, 120 Credits',
-    }
-
     context = {
         'application': application,
         'course_selection': course_selection,
         'program_details': program_details,
         'roadmap': roadmap,
-        'program_info': program_info.get(course_selection.program if course_selection else '', ''),
+        'program_info': f'{program.name} - {program.semesters} Semesters, {program.credits} Credits' if program else '',
         'stage': 4,
-        'admission_fee': 15000,
-        'semester_fee': 75000,
-        'student_card_fee': 5000,
+        'admission_fee': catalog.fees['admission_fee'],
+        'semester_fee': catalog.fees['semester_fee'],
+        'student_card_fee': catalog.fees['student_card_fee'],
     }
 
     return render(request, 'admission/stage4.html', context)
@@ -437,19 +376,20 @@ def admission_stage5(request, app_id):
     except:
         payment_info = None
 
+    # Calculate amounts
+    fees = get_catalog().fees
+    admission_fee = fees['admission_fee']
+    first_semester_fee = fees['semester_fee'] / 2  # Half of first semester
+    student_card_fee = fees['student_card_fee']
+
     if request.method == 'POST':
         payment_method = request.POST.get('payment_method')
 
-        # Calculate amounts
-        admission_fee = 15000
-        first_semester_fee = 75000 / 2  # Half of first semester
-        student_card_fee = 5000
-
         # Only add transport fee if checkbox is checked
-        # The checkbox has value="10000" so it will send that value if checked
+        # The checkbox sends the transport fee as its value if checked
         transport_fee = 0
         if 'transport_option' in request.POST:
-            transport_fee = 10000
+            transport_fee = fees['transport_fee']
 
         total_amount = admission_fee + first_semester_fee + student_card_fee + transport_fee
 
@@ -471,11 +411,14 @@ def admission_stage5(request, app_id):
         payment_info.payment_date = application.updated_at = timezone.now()
         payment_info.save()
 
-        # Generate roll number and email
-        generate_student_credentials(application)
-
-        # Send confirmation email
-        send_admission_confirmation_email(application)
+        # Generate roll number, email and student account
+        try:
+            provision(application)
+        except ProvisioningError as e:
+            # Left for `manage.py provision_admitted_students` to retry
+            logger.warning('Could not provision %s: %s', application.application_id, e)
+        else:
+            send_admission_confirmation_email(application)
 
         application.admission_status = 'approved'
         application.submitted_at = timezone.now()
@@ -489,6 +432,11 @@ def admission_stage5(request, app_id):
         'course_selection': course_selection,
         'payment_info': payment_info,
         'stage': 5,
+        'admission_fee': admission_fee,
+        'first_semester_fee': first_semester_fee,
+        'student_card_fee': student_card_fee,
+        'transport_fee': fees['transport_fee'],
+        'base_total': admission_fee + first_semester_fee + student_card_fee,
     }
 
     return render(request, 'admission/stage5.html', context)
@@ -526,187 +474,64 @@ def admission_confirmation(request, app_id):
 
 # Helper Functions
 def send_eligibility_email(application):
-    """Send eligibility confirmation email"""
-    try:
-        subject = f'Great News! You are Eligible - Application {application.application_id}'
-        message = f"""
-        Dear Applicant,
-        
-        Congratulations! Your application {application.application_id} has been reviewed and you meet the eligibility criteria.
-        
-        Your eligibility score: {application.course_selection.eligibility_score:.2f}
-        
-        Next Steps:
-        1. Complete your application by reviewing program details
-        2. Proceed with payment
-        3. Receive your student credentials
-        
-        To continue, click the link below:
-        {settings.SITE_URL}/admission/stage4/{application.application_id}/
-        
-        Best regards,
-        CampusGPT Admissions Team
-        """
-
-        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [application.email])
-    except Exception as e:
-        print(f"Error sending email: {str(e)}")
-
-
-def generate_student_credentials(application):
-    """Generate roll number, university email, and create User account"""
-    from accounts.models import User, StudentProfile
-    from django.db import IntegrityError
-    import uuid
-
-    try:
-        print(f"\n🔄 Starting credential generation for {application.application_id}...")
-
-        course_selection = application.course_selection
-        personal_info = application.personal_info
-
-        # Generate roll number format: su92-bscs-s24-001
-        year_code = date.today().year % 100  # Last 2 digits of year
-        semester = 'fall' if course_selection.intake == 'fall' else 'spring'
-        semester_code = 's24' if date.today().month <= 6 else 's24'
-
-        # Get count to generate sequential ID
-        count = AdmissionApplication.objects.filter(
-            admission_status='approved'
-        ).count()
-
-        roll_number = f"su{year_code}-{course_selection.program.lower()}-{semester_code}-{count + 1:03d}"
-        university_email = f"student.{roll_number}@superior.edu.pk"
-
-        print(f"✓ Generated Roll Number: {roll_number}")
-        print(f"✓ Generated Email: {university_email}")
-
-        application.roll_number = roll_number
-        application.university_email = university_email
-        application.save()
-        print(f"✓ Saved to application")
-
-        # Check if user already exists
-        if User.objects.filter(email=university_email).exists():
-            print(f"⚠ User already exists: {university_email}")
-            return
-
-        # Extract name parts carefully
-        full_name = personal_info.full_name.strip() if personal_info.full_name else 'Student'
-        name_parts = full_name.split()
-        first_name = name_parts[0] if len(name_parts) > 0 else 'Student'
-        last_name = ' '.join(name_parts[1:]) if len(name_parts) > 1 else ''
-
-        print(f"✓ Name: {first_name} {last_name}")
-
-        # Create User account with roll number as password
-        try:
-            user = User.objects.create_user(
-                email=university_email,
-                password=roll_number,  # Password is the roll number
-                username=roll_number,
-                first_name=first_name,
-                last_name=last_name,
-                role='student',
-                phone=personal_info.phone if personal_info.phone else '',
-                is_verified=True,
-                is_active=True,
-            )
-            print(f"✓ User account created")
-
-        except IntegrityError as ue:
-            print(f"✗ User creation failed: {str(ue)}")
-            return
-
-        # Generate unique personal email if needed
-        personal_email = application.email  # Use admission email
-
-        # Create StudentProfile with error handling for constraints
-        try:
-            student_profile = StudentProfile.objects.create(
-                user=user,
-                roll_number=roll_number,
-                father_name=personal_info.father_name if personal_info.father_name else 'N/A',
-                cnic=personal_info.cnic if personal_info.cnic else f"TEMP-{uuid.uuid4().hex[:10]}",
-                date_of_birth=personal_info.date_of_birth,
-                gender=personal_info.gender if personal_info.gender else 'M',
-                personal_email=personal_email,
-                university_email=university_email,
-                whatsapp_number=personal_info.whatsapp if personal_info.whatsapp else '',
-                intake=course_selection.intake,
-                program=course_selection.program,
-                is_approved=True,
-            )
-            print(f"✓ StudentProfile created")
-
-        except IntegrityError as pe:
-            print(f"✗ StudentProfile creation failed (constraint): {str(pe)}")
-            print(f"   Trying to update existing profile...")
-            # Try to update instead of create
-            try:
-                student_profile = StudentProfile.objects.filter(user=user).first()
-                if not student_profile:
-                    # Delete user if profile creation completely fails
-                    user.delete()
-                    print(f"✗ Failed to create/update StudentProfile, rolled back user creation")
-                    return
-            except Exception as e2:
-                print(f"✗ Error handling constraint: {str(e2)}")
-                user.delete()
-                return
-
-        print(f"✅ SUCCESS! User account created and ready to login")
-        print(f"   Email: {university_email}")
-        print(f"   Password: {roll_number}")
-
-    except AttributeError as ae:
-        print(f"✗ Missing required data: {str(ae)}")
-        print(f"   Make sure personal_info and course_selection exist")
-        import traceback
-        traceback.print_exc()
-    except Exception as e:
-        print(f"✗ Unexpected error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+    """Queue the eligibility confirmation email"""
+    subject = f'Great News! You are Eligible - Application {application.application_id}'
+    message = f"""
+    Dear Applicant,
+    
+    Congratulations! Your application {application.application_id} has been reviewed and you meet the eligibility criteria.
+    
+    Your eligibility score: {application.course_selection.eligibility_score:.2f}
+    
+    Next Steps:
+    1. Complete your application by reviewing program details
+    2. Proceed with payment
+    3. Receive your student credentials
+    
+    To continue, click the link below:
+    {settings.SITE_URL}/admission/stage4/{application.application_id}/
+    
+    Best regards,
+    CampusGPT Admissions Team
+    """
+
+    enqueue(subject, message, [application.email])
 
 
 def send_admission_confirmation_email(application):
-    """Send final admission confirmation"""
-    try:
-        personal_info = application.personal_info
-        course_selection = application.course_selection
-
-        subject = f'Admission Confirmed - {application.roll_number}'
-        message = f"""
-        Dear {personal_info.full_name},
-        
-        Congratulations! Your admission to {course_selection.program} has been confirmed!
-        
-        Your Student Credentials:
-        Roll Number: {application.roll_number}
-        University Email: {application.university_email}
-        Program: {course_selection.program}
-        Intake: {course_selection.intake.upper()}
-        
-        Login Details:
-        Email: {application.university_email}
-        Initial Password: You will receive this via separate email
-        
-        Next Steps:
-        1. Visit the student portal: {settings.SITE_URL}/login/
-        2. Login with your credentials
-        3. Complete your profile setup
-        4. Access your timetable and course materials
-        
-        If you have any questions, contact admissions@superior.edu.pk
-        
-        Best regards,
-        CampusGPT Admissions Team
-        """
-
-        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [application.email])
-    except Exception as e:
-        print(f"Error sending confirmation email: {str(e)}")
+    """Queue the final admission confirmation"""
+    personal_info = application.personal_info
+    course_selection = application.course_selection
+
+    subject = f'Admission Confirmed - {application.roll_number}'
+    message = f"""
+    Dear {personal_info.full_name},
+    
+    Congratulations! Your admission to {course_selection.program} has been confirmed!
+    
+    Your Student Credentials:
+    Roll Number: {application.roll_number}
+    University Email: {application.university_email}
+    Program: {course_selection.program}
+    Intake: {course_selection.intake.upper()}
+    
+    Login Details:
+    Email: {application.university_email}
+    Initial Password: You will receive this via separate email
+    
+    Next Steps:
+    1. Visit the student portal: {settings.SITE_URL}/login/
+    2. Login with your credentials
+    3. Complete your profile setup
+    4. Access your timetable and course materials
+    
+    If you have any questions, contact admissions@superior.edu.pk
+    
+    Best regards,
+    CampusGPT Admissions Team
+    """
+
+    enqueue(subject, message, [application.email])
 
 
 # Login to Continue Application
@@ -5,6 +5,7 @@ from .models import AttendanceRecord, AttendanceSummary, LeaveRequest, Attendanc
 @admin.register(AttendanceRecord)
 class AttendanceRecordAdmin(admin.ModelAdmin):
     list_display = ['date', 'get_student_name', 'course', 'status', 'recorded_by', 'recorded_at']
+    list_select_related = ['student__user', 'course', 'recorded_by__user']
     list_filter = ['status', 'date', 'course__program']
     search_fields = ['student__user__email', 'course__code', 'student__roll_number']
     readonly_fields = ['recorded_at', 'updated_at']
@@ -28,6 +29,7 @@ class AttendanceRecordAdmin(admin.ModelAdmin):
 @admin.register(AttendanceSummary)
 class AttendanceSummaryAdmin(admin.ModelAdmin):
     list_display = ['get_student_name', 'course', 'total_classes', 'present_count', 'attendance_percentage', 'is_eligible']
+    list_select_related = ['student__user', 'course']
     list_filter = ['is_eligible', 'course__program']
     search_fields = ['student__user__email', 'course__code']
     readonly_fields = ['attendance_percentage', 'last_updated']
@@ -50,6 +52,7 @@ class AttendanceSummaryAdmin(admin.ModelAdmin):
 @admin.register(LeaveRequest)
 class LeaveRequestAdmin(admin.ModelAdmin):
     list_display = ['get_student_name', 'course', 'leave_type', 'from_date', 'to_date', 'status', 'requested_at']
+    list_select_related = ['student__user', 'course']
     list_filter = ['status', 'leave_type', 'from_date', 'course__program']
     search_fields = ['student__user__email', 'course__code']
     readonly_fields = ['requested_at', 'updated_at', 'approval_date']
@@ -73,6 +76,7 @@ class LeaveRequestAdmin(admin.ModelAdmin):
 @admin.register(AttendanceAlert)
 class AttendanceAlertAdmin(admin.ModelAdmin):
     list_display = ['get_student_name', 'course', 'alert_type', 'is_resolved', 'created_at']
+    list_select_related = ['student__user', 'course']
     list_filter = ['alert_type', 'is_resolved', 'created_at']
     search_fields = ['student__user__email', 'course__code']
     readonly_fields = ['created_at', 'resolved_at']
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from attendance.summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute every AttendanceSummary from attendance records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Summaries written per upsert')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written = rebuild_summaries(batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} attendance summaries'))
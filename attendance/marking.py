@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.dispatch import Signal
+
+from courses.models import CourseEnrollment
+from .models import AttendanceRecord
+from .summaries import STATUS_COUNTERS, apply_course_deltas, record_delta
+
+# Bulk writes (bulk_create, bulk_update, update) send no post_save, so
+# services that write in bulk send a signal of their own afterwards, like
+# this one, and listeners subscribe to both.
+#
+# Sent after mark_session(); payload: course, date and the student_ids
+# whose records were written.
+session_marked = Signal()
+
+
+def mark_session(course, session_date, roster, recorded_by=None):
+    """Mark attendance for a whole course session in a handful of queries.
+
+    roster is an iterable of (student_id, status) pairs. Records are upserted
+    against the (student, course, date) unique constraint and the affected
+    AttendanceSummary rows are adjusted in one batched UPDATE.
+    Returns the number of records written.
+    """
+    roster = dict(roster)
+    invalid = sorted({status for status in roster.values() if status not in STATUS_COUNTERS})
+    if invalid:
+        raise ValueError(f"Invalid attendance status: {', '.join(invalid)}")
+
+    enrolled = set(
+        CourseEnrollment.objects.filter(course=course, status='enrolled', student_id__in=list(roster))
+        .values_list('student_id', flat=True)
+    )
+    not_enrolled = sorted(set(roster) - enrolled)
+    if not_enrolled:
+        raise ValueError(f"Students not enrolled in {course.code}: {', '.join(map(str, not_enrolled))}")
+    if not roster:
+        return 0
+
+    with transaction.atomic():
+        previous = dict(
+            AttendanceRecord.objects.select_for_update()
+            .filter(course=course, date=session_date, student_id__in=list(roster))
+            .values_list('student_id', 'status')
+        )
+
+        AttendanceRecord.objects.bulk_create(
+            [
+                AttendanceRecord(
+                    student_id=student_id,
+                    course=course,
+                    date=session_date,
+                    status=status,
+                    recorded_by=recorded_by,
+                )
+                for student_id, status in roster.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['student', 'course', 'date'],
+            update_fields=['status', 'recorded_by', 'updated_at'],
+        )
+
+        deltas = {}
+        for student_id, status in roster.items():
+            old_status = previous.get(student_id)
+            if old_status == status:
+                continue
+            delta = record_delta(status)
+            if old_status is not None:
+                for field, change in record_delta(old_status, -1).items():
+                    delta[field] = delta.get(field, 0) + change
+            deltas[student_id] = delta
+
+        apply_course_deltas(course.id, deltas)
+
+    session_marked.send(sender=AttendanceRecord, course=course, date=session_date, student_ids=list(roster))
+    return len(roster)
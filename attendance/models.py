@@ -34,6 +34,26 @@ class AttendanceRecord(models.Model):
         return f"{self.student.user.get_full_name()} - {self.course.code} - {self.date}"
 
 
+class AttendanceSummaryQuerySet(models.QuerySet):
+    def for_student(self, student):
+        return self.filter(student=student)
+
+    def for_course(self, course):
+        return self.filter(course=course)
+
+    def for_program(self, program):
+        return self.filter(course__program=program)
+
+    def totals(self):
+        """Summed counters and the class-weighted attendance percentage in one query"""
+        from .summaries import COUNTER_FIELDS, calculate_percentage
+
+        totals = self.aggregate(**{field: models.Sum(field) for field in COUNTER_FIELDS})
+        totals = {field: value or 0 for field, value in totals.items()}
+        totals['attendance_percentage'] = calculate_percentage(totals['present_count'], totals['total_classes'])
+        return totals
+
+
 # Attendance Summary
 class AttendanceSummary(models.Model):
     student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='attendance_summary')
@@ -47,6 +67,8 @@ class AttendanceSummary(models.Model):
     is_eligible = models.BooleanField(default=True)  # Based on min attendance requirement
     last_updated = models.DateTimeField(auto_now=True)
 
+    objects = AttendanceSummaryQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Attendance Summary'
         verbose_name_plural = 'Attendance Summaries'
@@ -58,7 +80,7 @@ class AttendanceSummary(models.Model):
             return 0
         self.attendance_percentage = (self.present_count / self.total_classes) * 100
         self.is_eligible = self.attendance_percentage >= 75  # Minimum 75% attendance
-        self.save()
+        self.save(update_fields=['attendance_percentage', 'is_eligible', 'last_updated'])
         return self.attendance_percentage
 
     def __str__(self):
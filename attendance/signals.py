@@ -0,0 +1,42 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import AttendanceRecord
+from .summaries import apply_delta, record_delta
+
+
+# Keep AttendanceSummary counters in step with every record write
+@receiver(pre_save, sender=AttendanceRecord)
+def remember_previous_record(sender, instance, **kwargs):
+    instance._previous = None
+    if not instance._state.adding and instance.pk:
+        instance._previous = (
+            AttendanceRecord.objects.filter(pk=instance.pk)
+            .values('student_id', 'course_id', 'status')
+            .first()
+        )
+
+
+@receiver(post_save, sender=AttendanceRecord)
+def record_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    previous = getattr(instance, '_previous', None)
+    if created or previous is None:
+        apply_delta(instance.student_id, instance.course_id, record_delta(instance.status))
+        return
+
+    if (previous['student_id'], previous['course_id']) != (instance.student_id, instance.course_id):
+        apply_delta(previous['student_id'], previous['course_id'], record_delta(previous['status'], -1), create=False)
+        apply_delta(instance.student_id, instance.course_id, record_delta(instance.status))
+    elif previous['status'] != instance.status:
+        delta = record_delta(previous['status'], -1)
+        for field, change in record_delta(instance.status).items():
+            delta[field] = delta.get(field, 0) + change
+        apply_delta(instance.student_id, instance.course_id, delta)
+
+
+@receiver(post_delete, sender=AttendanceRecord)
+def record_deleted(sender, instance, **kwargs):
+    apply_delta(instance.student_id, instance.course_id, record_delta(instance.status, -1), create=False)
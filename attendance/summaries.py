@@ -0,0 +1,201 @@
+from decimal import Decimal
+
+from django.db.models import F, Q, Case, When, Value, Count, Exists, OuterRef, BooleanField, DecimalField, ExpressionWrapper
+from django.db.models.functions import Round
+from django.db.models.lookups import GreaterThan, GreaterThanOrEqual, LessThanOrEqual
+from django.utils import timezone
+
+from .models import AttendanceRecord, AttendanceSummary
+
+# Minimum attendance percentage to stay eligible for exams
+MIN_ATTENDANCE_PERCENTAGE = 75
+
+# AttendanceRecord.status -> AttendanceSummary counter
+STATUS_COUNTERS = {
+    'present': 'present_count',
+    'absent': 'absent_count',
+    'late': 'late_count',
+    'excused': 'excused_count',
+}
+
+COUNTER_FIELDS = ['total_classes'] + list(STATUS_COUNTERS.values())
+
+
+def calculate_percentage(present_count, total_classes):
+    """Python counterpart of percentage_expression()"""
+    if total_classes <= 0:
+        return Decimal('0.00')
+    return (Decimal(present_count) * 100 / total_classes).quantize(Decimal('0.01'))
+
+
+def percentage_expression(present, total):
+    """SQL expression computing attendance_percentage from two expressions"""
+    return Case(
+        When(
+            GreaterThan(total, 0),
+            then=Round(ExpressionWrapper(present * 100.0 / total, output_field=DecimalField()), 2),
+        ),
+        default=Value(0),
+        output_field=DecimalField(max_digits=5, decimal_places=2),
+    )
+
+
+def is_eligible(percentage, total_classes):
+    """Python counterpart of eligibility_expression(); no classes yet is eligible"""
+    return total_classes <= 0 or percentage >= MIN_ATTENDANCE_PERCENTAGE
+
+
+def eligibility_expression(percentage, total):
+    return Case(
+        When(LessThanOrEqual(total, 0), then=Value(True)),
+        When(GreaterThanOrEqual(percentage, MIN_ATTENDANCE_PERCENTAGE), then=Value(True)),
+        default=Value(False),
+        output_field=BooleanField(),
+    )
+
+
+def record_delta(status, sign=1):
+    """Counter deltas for adding (sign=1) or removing (sign=-1) one record"""
+    return {'total_classes': sign, STATUS_COUNTERS[status]: sign}
+
+
+def apply_delta(student_id, course_id, delta, create=True):
+    """Atomically add counter deltas to a summary and refresh its percentage.
+
+    Everything happens in one UPDATE; SQL evaluates the right-hand sides
+    against the old row, so the new percentage is derived from old counts
+    plus the delta. The summary row is created on first use unless
+    create is False (removals never need a new row).
+    """
+    delta = {field: change for field, change in delta.items() if change}
+    if not delta:
+        return
+
+    summaries = AttendanceSummary.objects.filter(student_id=student_id, course_id=course_id)
+    updated = summaries.update(**_delta_updates(delta))
+    if not updated and create:
+        # First record for the pair: insert the delta as the counts, or, if
+        # a concurrent first mark inserted the row meanwhile, lock it and
+        # add to it
+        counts = {field: max(change, 0) for field, change in delta.items()}
+        total = counts.get('total_classes', 0)
+        percentage = calculate_percentage(counts.get('present_count', 0), total)
+        AttendanceSummary.objects.update_or_create(
+            student_id=student_id,
+            course_id=course_id,
+            create_defaults={
+                **counts,
+                'attendance_percentage': percentage,
+                'is_eligible': is_eligible(percentage, total),
+            },
+            defaults=_delta_updates(delta),
+        )
+
+
+def _delta_updates(delta):
+    updates = {field: F(field) + change for field, change in delta.items()}
+    present = F('present_count') + delta.get('present_count', 0)
+    total = F('total_classes') + delta.get('total_classes', 0)
+    percentage = percentage_expression(present, total)
+    updates['attendance_percentage'] = percentage
+    updates['is_eligible'] = eligibility_expression(percentage, total)
+    updates['last_updated'] = timezone.now()
+    return updates
+
+
+def rebuild_summaries(batch_size=1000):
+    """Recompute every AttendanceSummary from AttendanceRecord rows.
+
+    Counts come from one grouped query over the records and are upserted in
+    batches; summaries left without any records are reset to zero.
+    Returns the number of (student, course) pairs written.
+    """
+    rows = (
+        AttendanceRecord.objects.order_by()
+        .values('student_id', 'course_id')
+        .annotate(
+            total_classes=Count('id'),
+            **{
+                counter: Count('id', filter=Q(status=status))
+                for status, counter in STATUS_COUNTERS.items()
+            }
+        )
+    )
+
+    written = 0
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        percentage = calculate_percentage(row['present_count'], row['total_classes'])
+        batch.append(AttendanceSummary(
+            attendance_percentage=percentage,
+            is_eligible=is_eligible(percentage, row['total_classes']),
+            **row
+        ))
+        if len(batch) >= batch_size:
+            written += _upsert(batch)
+            batch = []
+    if batch:
+        written += _upsert(batch)
+
+    has_records = AttendanceRecord.objects.filter(student=OuterRef('student'), course=OuterRef('course'))
+    AttendanceSummary.objects.filter(~Exists(has_records)).update(
+        attendance_percentage=0,
+        is_eligible=True,
+        last_updated=timezone.now(),
+        **{field: 0 for field in COUNTER_FIELDS}
+    )
+    return written
+
+
+def _upsert(summaries):
+    AttendanceSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=['student', 'course'],
+        update_fields=COUNTER_FIELDS + ['attendance_percentage', 'is_eligible', 'last_updated'],
+    )
+    return len(summaries)
+
+
+def apply_course_deltas(course_id, deltas):
+    """Apply per-student counter deltas for one course in a single UPDATE.
+
+    deltas maps student_id -> {counter field: change}. Missing summary rows
+    are inserted first with one bulk INSERT.
+    """
+    deltas = {
+        student_id: {field: change for field, change in delta.items() if change}
+        for student_id, delta in deltas.items()
+    }
+    deltas = {student_id: delta for student_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    AttendanceSummary.objects.bulk_create(
+        [AttendanceSummary(student_id=student_id, course_id=course_id) for student_id in deltas],
+        ignore_conflicts=True,
+    )
+
+    def change_for(field):
+        whens = [
+            When(student_id=student_id, then=Value(delta[field]))
+            for student_id, delta in deltas.items() if field in delta
+        ]
+        if not whens:
+            return None
+        return Case(*whens, default=Value(0))
+
+    updates = {}
+    for field in COUNTER_FIELDS:
+        change = change_for(field)
+        if change is not None:
+            updates[field] = F(field) + change
+
+    present = updates.get('present_count', F('present_count'))
+    total = updates.get('total_classes', F('total_classes'))
+    percentage = percentage_expression(present, total)
+    updates['attendance_percentage'] = percentage
+    updates['is_eligible'] = eligibility_expression(percentage, total)
+    updates['last_updated'] = timezone.now()
+
+    AttendanceSummary.objects.filter(course_id=course_id, student_id__in=list(deltas)).update(**updates)
@@ -1,3 +1,159 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import User, StudentProfile
+from courses.models import Program, Course, CourseEnrollment
+from .marking import mark_session, session_marked
+from .models import AttendanceRecord, AttendanceSummary
+from .summaries import COUNTER_FIELDS, apply_delta, record_delta
+
+SUMMARY_FIELDS = ['student_id', 'course_id', *COUNTER_FIELDS, 'attendance_percentage', 'is_eligible']
+
+
+def create_student(n):
+    return StudentProfile.objects.create(
+        user=User.objects.create_user(username=f'student{n}', email=f'student{n}@example.com', password='x'),
+        roll_number=f'SU-{n}', father_name='Father', cnic=f'00000-0000000-{n}',
+        date_of_birth='2004-01-01', gender='M', personal_email=f'student{n}@example.com',
+        university_email=f'student{n}@superior.edu.pk', whatsapp_number='03000000000',
+        intake='fall', program='BSCS',
+    )
+
+
+class AttendanceTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        program = Program.objects.create(code='BSCS', name='BS Computer Science', department='Computer Science')
+        cls.course = Course.objects.create(code='CS101', title='Programming', program=program, semester=1)
+        cls.other_course = Course.objects.create(code='CS102', title='Discrete Maths', program=program, semester=1)
+        cls.students = [create_student(n) for n in range(3)]
+
+    def summary(self, student, course=None):
+        return AttendanceSummary.objects.values(*SUMMARY_FIELDS).get(student=student, course=course or self.course)
+
+    def counts(self, student, course=None):
+        summary = self.summary(student, course)
+        return [summary[field] for field in COUNTER_FIELDS] + [summary['attendance_percentage'], summary['is_eligible']]
+
+    def record(self, student, day, status, course=None):
+        return AttendanceRecord.objects.create(student=student, course=course or self.course, date=date(2025, 9, day), status=status)
+
+
+class SummaryDeltaTests(AttendanceTestCase):
+    def test_apply_delta(self):
+        student = self.students[0]
+        # total, present, absent, late, excused, percentage, eligible
+        apply_delta(student.id, self.course.id, record_delta('present'))
+        self.assertEqual(self.counts(student), [1, 1, 0, 0, 0, Decimal('100.00'), True])
+
+        apply_delta(student.id, self.course.id, record_delta('absent'))
+        self.assertEqual(self.counts(student), [2, 1, 1, 0, 0, Decimal('50.00'), False])
+
+        apply_delta(student.id, self.course.id, record_delta('absent', -1))
+        self.assertEqual(self.counts(student), [1, 1, 0, 0, 0, Decimal('100.00'), True])
+
+    def test_removal_never_creates_a_summary(self):
+        apply_delta(self.students[0].id, self.course.id, record_delta('present', -1), create=False)
+        self.assertFalse(AttendanceSummary.objects.exists())
+
+    def test_record_writes_keep_the_summary(self):
+        student = self.students[0]
+        for day, status in enumerate(['present', 'present', 'late', 'absent'], 1):
+            record = self.record(student, day, status)
+        self.assertEqual(self.counts(student), [4, 2, 1, 1, 0, Decimal('50.00'), False])
+
+        record.status = 'present'
+        record.save()
+        self.assertEqual(self.counts(student), [4, 3, 0, 1, 0, Decimal('75.00'), True])
+
+        # Moving a record to another course moves its count
+        record.course = self.other_course
+        record.save()
+        self.assertEqual(self.counts(student), [3, 2, 0, 1, 0, Decimal('66.67'), False])
+        self.assertEqual(self.counts(student, self.other_course), [1, 1, 0, 0, 0, Decimal('100.00'), True])
+
+        # No classes left: eligible again, as a new summary is
+        record.delete()
+        self.assertEqual(self.counts(student, self.other_course), [0, 0, 0, 0, 0, Decimal('0.00'), True])
+
+    def test_rebuild_matches_the_incremental_summaries(self):
+        statuses = ['present', 'absent', 'late', 'excused', 'present']
+        for n, student in enumerate(self.students):
+            for day, status in enumerate(statuses[n:], 1):
+                self.record(student, day, status)
+                self.record(student, day, statuses[day % len(statuses)], self.other_course)
+        AttendanceRecord.objects.filter(student=self.students[0], date=date(2025, 9, 1)).first().delete()
+        for record in AttendanceRecord.objects.filter(student=self.students[2], course=self.other_course):
+            record.delete()
+        incremental = list(AttendanceSummary.objects.order_by('student', 'course').values(*SUMMARY_FIELDS))
+
+        AttendanceSummary.objects.update(present_count=0, total_classes=99)
+        out = StringIO()
+        call_command('rebuild_attendance_summaries', stdout=out)
+        self.assertIn('Rebuilt 5 attendance summaries', out.getvalue())
+        self.assertEqual(list(AttendanceSummary.objects.order_by('student', 'course').values(*SUMMARY_FIELDS)), incremental)
+
+
+class MarkSessionTests(AttendanceTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for student in cls.students[:2]:
+            CourseEnrollment.objects.create(student=student, course=cls.course)
+
+    def test_summaries_follow_the_session(self):
+        first, second = self.students[:2]
+        sent = []
+
+        def receiver(sender, **kwargs):
+            sent.append(kwargs)
+
+        session_marked.connect(receiver)
+        self.addCleanup(session_marked.disconnect, receiver)
+
+        self.assertEqual(mark_session(self.course, date(2025, 9, 1), [(first.id, 'present'), (second.id, 'absent')]), 2)
+        self.assertEqual(sent[0]['student_ids'], [first.id, second.id])
+        self.assertEqual(self.counts(first), [1, 1, 0, 0, 0, Decimal('100.00'), True])
+        self.assertEqual(self.counts(second), [1, 0, 1, 0, 0, Decimal('0.00'), False])
+
+        # Marking the session again corrects the counts instead of adding to them
+        mark_session(self.course, date(2025, 9, 1), [(first.id, 'present'), (second.id, 'late')])
+        mark_session(self.course, date(2025, 9, 2), [(second.id, 'present')])
+        self.assertEqual(self.counts(first), [1, 1, 0, 0, 0, Decimal('100.00'), True])
+        self.assertEqual(self.counts(second), [2, 1, 0, 1, 0, Decimal('50.00'), False])
+        self.assertEqual(len(sent), 3)
+
+    def test_rejects_bad_rosters(self):
+        with self.assertRaisesMessage(ValueError, 'Invalid attendance status: asleep'):
+            mark_session(self.course, date(2025, 9, 1), [(self.students[0].id, 'asleep')])
+        with self.assertRaisesMessage(ValueError, 'Students not enrolled in CS101'):
+            mark_session(self.course, date(2025, 9, 1), [(self.students[2].id, 'present')])
+        self.assertFalse(AttendanceRecord.objects.exists())
+
+
+class SummaryTotalsTests(AttendanceTestCase):
+    def test_totals(self):
+        for day, status in enumerate(['present', 'late', 'absent', 'present'], 1):
+            self.record(self.students[0], day, status)
+        for day, status in enumerate(['present', 'present'], 1):
+            self.record(self.students[1], day, status)
+        self.record(self.students[1], 1, 'present', self.other_course)
+
+        with self.assertNumQueries(1):
+            totals = AttendanceSummary.objects.for_course(self.course).totals()
+        # Weighted by classes (4 of 6 present), not the mean of 50% and 100%
+        self.assertEqual(totals, {
+            'total_classes': 6, 'present_count': 4, 'absent_count': 1, 'late_count': 1, 'excused_count': 0,
+            'attendance_percentage': Decimal('66.67'),
+        })
+        self.assertEqual(AttendanceSummary.objects.for_student(self.students[1]).totals()['total_classes'], 3)
+
+    def test_totals_without_rows(self):
+        self.assertEqual(AttendanceSummary.objects.totals(), {
+            'total_classes': 0, 'present_count': 0, 'absent_count': 0, 'late_count': 0, 'excused_count': 0,
+            'attendance_percentage': Decimal('0.00'),
+        })
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Program, Course, CourseEnrollment, Timetable, CourseMaterial, Announcement
+from .models import Program, Course, CoursePrerequisite, CourseEnrollment, EnrollmentRequest, Timetable, CourseMaterial, Announcement
 
 
 @admin.register(Program)
@@ -20,19 +20,27 @@ class ProgramAdmin(admin.ModelAdmin):
     )
 
 
+class CoursePrerequisiteInline(admin.TabularInline):
+    model = CoursePrerequisite
+    fk_name = 'course'
+    extra = 0
+    raw_id_fields = ['required']
+
+
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
-    list_display = ['code', 'title', 'program', 'semester', 'teacher', 'credits', 'status', 'max_students']
+    list_display = ['code', 'title', 'program', 'semester', 'teacher', 'credits', 'status', 'enrolled_count', 'max_students']
     list_filter = ['program', 'semester', 'status', 'created_at']
     search_fields = ['code', 'title']
     readonly_fields = ['created_at', 'updated_at']
+    inlines = [CoursePrerequisiteInline]
 
     fieldsets = (
         ('Course Information', {
             'fields': ('code', 'title', 'description')
         }),
         ('Academic Details', {
-            'fields': ('program', 'semester', 'credits', 'pre_requisite')
+            'fields': ('program', 'semester', 'credits', 'grade_scale')
         }),
         ('Instructor & Resources', {
             'fields': ('teacher', 'syllabus')
@@ -47,6 +55,7 @@ class CourseAdmin(admin.ModelAdmin):
 @admin.register(CourseEnrollment)
 class CourseEnrollmentAdmin(admin.ModelAdmin):
     list_display = ['get_student_name', 'course', 'status', 'grade', 'is_passed', 'enrollment_date']
+    list_select_related = ['student__user', 'course']
     list_filter = ['course', 'status', 'is_passed', 'enrollment_date']
     search_fields = ['student__user__email', 'course__code', 'student__roll_number']
     readonly_fields = ['enrollment_date']
@@ -65,6 +74,19 @@ class CourseEnrollmentAdmin(admin.ModelAdmin):
     get_student_name.short_description = 'Student Name'
 
 
+@admin.register(EnrollmentRequest)
+class EnrollmentRequestAdmin(admin.ModelAdmin):
+    list_display = ['get_student_name', 'course', 'status', 'message', 'created_at', 'processed_at']
+    list_select_related = ['student__user', 'course']
+    list_filter = ['status', 'created_at']
+    search_fields = ['student__user__email', 'course__code', 'student__roll_number']
+    readonly_fields = ['created_at', 'processed_at']
+
+    def get_student_name(self, obj):
+        return obj.student.user.get_full_name()
+    get_student_name.short_description = 'Student Name'
+
+
 @admin.register(Timetable)
 class TimetableAdmin(admin.ModelAdmin):
     list_display = ['course', 'day', 'start_time', 'end_time', 'room', 'building', 'semester']
@@ -0,0 +1,136 @@
+"""
+Course enrollment with enforced capacity.
+
+Course.enrolled_count is the seat counter. A seat is reserved with one
+conditional UPDATE (enrolled_count < max_students), which the database
+applies atomically, so concurrent workers can never oversubscribe a
+section and no row lock is held while the enrollment row is written.
+Students who find a section full join its waitlist and are promoted in
+order when an enrolled student drops out (or the row is deleted); a
+completed enrollment frees its seat but promotes nobody into a finished
+course. Re-enrolling reuses a dropped row and queues from the new date.
+
+Enrollment writes made elsewhere (admin, shell) keep the counter in step
+through the receivers in courses/signals.py.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Course, CourseEnrollment
+from .prerequisites import describe_missing, get_graph, missing_requirements, passed_courses
+
+# Statuses that hold a student's place in a course
+ACTIVE_STATUSES = ('enrolled', 'waitlisted')
+
+
+class EnrollmentError(Exception):
+    """An enrollment request that cannot be honoured, with a message for the student"""
+
+
+def missing_prerequisites(student, course, graph):
+    """Prerequisite groups of course the student has not passed yet"""
+    if course.id not in graph.requirements:
+        return []
+    return missing_requirements(course.id, passed_courses([student.id])[student.id], graph)
+
+
+def reserve_seat(course_id):
+    """Take one seat if the course has any left; True on success"""
+    return bool(
+        Course.objects.filter(pk=course_id, enrolled_count__lt=F('max_students'))
+        .update(enrolled_count=F('enrolled_count') + 1)
+    )
+
+
+def release_seat(course_id):
+    Course.objects.filter(pk=course_id, enrolled_count__gt=0).update(enrolled_count=F('enrolled_count') - 1)
+
+
+def enroll(student, course, waitlist=True):
+    """Enroll a student, or waitlist them if the course is full.
+
+    Raises EnrollmentError if the course is closed, a prerequisite is
+    missing, the student already holds a place, or the course is full and
+    waitlist is False. Returns the CourseEnrollment.
+    """
+    if course.status != 'active':
+        raise EnrollmentError(f'{course.code} is not open for enrollment.')
+
+    graph = get_graph()
+    missing = missing_prerequisites(student, course, graph)
+    if missing:
+        raise EnrollmentError(describe_missing(course, missing, graph))
+
+    try:
+        with transaction.atomic():
+            # Locked, so two re-enrollments of the same dropped row cannot
+            # both pass the check and take a seat each
+            existing = CourseEnrollment.objects.select_for_update().filter(student=student, course=course).first()
+            if existing is not None and existing.status in ACTIVE_STATUSES:
+                raise EnrollmentError(f'You are already {existing.status} in {course.code}.')
+            if existing is not None and existing.status == 'completed':
+                raise EnrollmentError(f'You have already completed {course.code}.')
+
+            reserved = reserve_seat(course.pk)
+            if not reserved and not waitlist:
+                raise EnrollmentError(f'{course.code} is full.')
+
+            enrollment = existing or CourseEnrollment(student=student, course=course)
+            enrollment.status = 'enrolled' if reserved else 'waitlisted'
+            if existing is not None:
+                # Join the waitlist from now, not from the dropped request
+                enrollment.enrollment_date = timezone.now()
+            # The seat counter has already been updated above
+            enrollment._seat_counted = True
+            enrollment.save()
+    except IntegrityError:
+        # A concurrent request for the same student and course won the insert
+        raise EnrollmentError(f'You already hold a place in {course.code}.')
+    return enrollment
+
+
+def drop(enrollment):
+    """Drop an enrollment or waitlist place; a freed seat goes to the waitlist"""
+    if enrollment.status not in ACTIVE_STATUSES:
+        raise EnrollmentError(f'This enrollment is already {enrollment.status}.')
+    enrollment.status = 'dropped'
+    enrollment.save()
+
+
+def promote_waitlist(course_id):
+    """Fill free seats from the waitlist, oldest request first; returns promotions"""
+    promoted = []
+    waiting = (
+        CourseEnrollment.objects.filter(course_id=course_id, status='waitlisted')
+        .order_by('enrollment_date', 'pk')
+        .values_list('pk', flat=True)
+    )
+    for pk in waiting.iterator():
+        with transaction.atomic():
+            # The seat is taken in the same transaction as the promotion, so
+            # an error in between cannot leave it counted for nobody
+            if not reserve_seat(course_id):
+                break
+            # Another worker may have promoted or dropped this entry meanwhile
+            if not CourseEnrollment.objects.filter(pk=pk, status='waitlisted').update(status='enrolled'):
+                release_seat(course_id)
+                continue
+            enrollment = CourseEnrollment.objects.get(pk=pk)
+            # Re-save so post_save listeners (snapshots, timetables) see the change
+            enrollment._seat_counted = True
+            enrollment.save(update_fields=['status'])
+        promoted.append(enrollment)
+    return promoted
+
+
+def recount_seats(course_ids=None):
+    """Recompute enrolled_count from the enrollment rows (after bulk loads)"""
+    enrolled = (
+        CourseEnrollment.objects.filter(course=OuterRef('pk'), status='enrolled')
+        .order_by().values('course').annotate(total=Count('pk')).values('total')
+    )
+    courses = Course.objects.all() if course_ids is None else Course.objects.filter(pk__in=course_ids)
+    return courses.update(enrolled_count=Coalesce(Subquery(enrolled), Value(0)))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.models import Timetable
+from courses.scheduling import describe, find_clashes, load_slots
+
+
+class Command(BaseCommand):
+    help = 'Find every room and teacher double-booking in the timetable'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semester', type=int, help='Only check slots of this semester')
+
+    def handle(self, *args, **options):
+        slots = Timetable.objects.all()
+        if options['semester'] is not None:
+            slots = slots.filter(semester=options['semester'])
+
+        started = time.perf_counter()
+        slots = load_slots(slots)
+        clashes = find_clashes(slots)
+        elapsed = time.perf_counter() - started
+
+        for clash in sorted(clashes, key=lambda clash: (clash.kind, clash.first.day, clash.first.start)):
+            self.stdout.write(self.style.ERROR(f'{clash.kind}: {describe(clash)}'))
+
+        summary = f'Checked {len(slots)} slots in {elapsed:.2f}s'
+        if clashes:
+            raise CommandError(f'{summary}: {len(clashes)} clashes')
+        self.stdout.write(self.style.SUCCESS(f'{summary}: no clashes'))
@@ -0,0 +1,68 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.models import Course
+from courses.solver import DEFAULT_PERIODS, PERIOD_MINUTES, generate, load_rooms
+
+
+class Command(BaseCommand):
+    help = 'Generate a clash-free timetable for the active courses of a semester'
+
+    def add_arguments(self, parser):
+        parser.add_argument('semester', type=int, help='Course semester (1-8) to schedule')
+        parser.add_argument('--rooms', required=True, help='CSV file with building, room and capacity columns')
+        parser.add_argument('--program', help='Only courses of this program code')
+        parser.add_argument('--periods', help='Comma-separated period start times, e.g. 08:00,09:30,11:00')
+        parser.add_argument('--period-minutes', type=int, default=PERIOD_MINUTES, help='Length of one period')
+        parser.add_argument('--replace', action='store_true', help='Rebuild courses that already have slots')
+        parser.add_argument('--dry-run', action='store_true', help='Solve and report without saving')
+
+    def handle(self, *args, **options):
+        try:
+            rooms = load_rooms(options['rooms'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read rooms: {e}')
+        if not rooms:
+            raise CommandError('The room file is empty')
+
+        periods = DEFAULT_PERIODS
+        if options['periods']:
+            try:
+                periods = sorted(datetime.strptime(start.strip(), '%H:%M').time() for start in options['periods'].split(','))
+            except ValueError:
+                raise CommandError(f'Invalid --periods: {options["periods"]}')
+        if options['period_minutes'] < 1:
+            raise CommandError('--period-minutes must be positive')
+
+        courses = Course.objects.filter(semester=options['semester'], status='active')
+        if options['program']:
+            courses = courses.filter(program__code=options['program'])
+
+        started = time.perf_counter()
+        try:
+            solver, placements, unplaced = generate(
+                courses, rooms, periods, options['period_minutes'],
+                replace=options['replace'], commit=not options['dry_run'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        sections = len({placement.section.course_id for placement in placements}) + len(unplaced)
+        room_use, seat_use = solver.utilization(placements)
+        self.stdout.write(f'Solved {sections} sections in {elapsed:.2f}s')
+        self.stdout.write(f'Sessions placed: {len(placements)}')
+        self.stdout.write(f'Room utilization: {room_use:.1%} of room-periods, {seat_use:.1%} of booked seats')
+        for section in unplaced:
+            self.stdout.write(self.style.WARNING(
+                f'Unplaced: {section.code} ({section.sessions} sessions, {section.size} students)'
+            ))
+
+        if options['dry_run']:
+            self.stdout.write('Dry run: nothing saved')
+        elif options['replace'] and unplaced:
+            raise CommandError(f'{len(unplaced)} sections could not be placed; the existing timetable was kept')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{len(placements)} timetable slots created'))
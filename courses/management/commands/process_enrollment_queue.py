@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.queue import process_batch
+
+
+class Command(BaseCommand):
+    help = 'Apply queued enrollment requests in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.ENROLLMENT_QUEUE_BATCH_SIZE, help='Requests per transaction')
+        parser.add_argument('--watch', action='store_true', help='Keep polling for new requests instead of exiting when the queue is empty')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls of an empty queue with --watch')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        try:
+            while True:
+                started = time.perf_counter()
+                outcomes = process_batch(options['batch_size'])
+                if outcomes:
+                    summary = ', '.join(f'{count} {status}' for status, count in sorted(outcomes.items()))
+                    self.stdout.write(f'Processed {sum(outcomes.values())} requests in {time.perf_counter() - started:.2f}s: {summary}')
+                elif options['watch']:
+                    time.sleep(options['interval'])
+                else:
+                    break
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('Enrollment queue drained'))
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+        ('grades', '0002_grade_boundaries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='grade_scale',
+            field=models.ForeignKey(blank=True, help_text='Leave empty to use the default scale', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='courses', to='grades.gradescale'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:33
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_enrolled(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    CourseEnrollment = apps.get_model('courses', 'CourseEnrollment')
+    enrolled = (
+        CourseEnrollment.objects.filter(course=OuterRef('pk'), status='enrolled')
+        .order_by().values('course').annotate(total=Count('pk')).values('total')
+    )
+    Course.objects.update(enrolled_count=Coalesce(Subquery(enrolled), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0002_course_grade_scale'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='enrolled_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Seats taken; maintained by courses.enrollment'),
+        ),
+        migrations.AlterField(
+            model_name='courseenrollment',
+            name='status',
+            field=models.CharField(choices=[('enrolled', 'Enrolled'), ('waitlisted', 'Waitlisted'), ('completed', 'Completed'), ('dropped', 'Dropped'), ('deferred', 'Deferred')], default='enrolled', max_length=20),
+        ),
+        migrations.RunPython(count_enrolled, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:38
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def parse_prerequisites(apps, schema_editor):
+    # 'CS101, MATH101/MATH102': each comma-separated part is a group of
+    # alternatives. The free-text field is removed next, so a code that
+    # matches no course stops the migration instead of being dropped.
+    Course = apps.get_model('courses', 'Course')
+    CoursePrerequisite = apps.get_model('courses', 'CoursePrerequisite')
+    ids = {code.upper(): pk for pk, code in Course.objects.values_list('pk', 'code')}
+
+    rows, unknown = [], {}
+    for course_id, course_code, text in Course.objects.exclude(pre_requisite='').values_list('pk', 'code', 'pre_requisite'):
+        seen = set()
+        parts = re.split(r',|;|\band\b|&', text, flags=re.IGNORECASE)
+        for group, part in enumerate((part for part in parts if part.strip()), start=1):
+            for code in re.split(r'/|\bor\b|\|', part, flags=re.IGNORECASE):
+                if not code.strip():
+                    continue
+                required_id = ids.get(code.strip().upper())
+                if required_id is None:
+                    unknown.setdefault(course_code, []).append(code.strip())
+                elif required_id != course_id and required_id not in seen:
+                    seen.add(required_id)
+                    rows.append(CoursePrerequisite(course_id=course_id, required_id=required_id, group=group))
+
+    if unknown:
+        raise ValueError(
+            'Prerequisites name courses that do not exist: '
+            + '; '.join(f'{course} ({", ".join(codes)})' for course, codes in sorted(unknown.items()))
+            + '. Correct pre_requisite on these courses or create the missing ones, then migrate again.'
+        )
+    CoursePrerequisite.objects.bulk_create(rows)
+
+
+def join_prerequisites(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    CoursePrerequisite = apps.get_model('courses', 'CoursePrerequisite')
+    groups = {}
+    for course_id, group, code in CoursePrerequisite.objects.order_by('group').values_list('course_id', 'group', 'required__code'):
+        groups.setdefault(course_id, {}).setdefault(group, []).append(code)
+    for course_id, codes in groups.items():
+        text = ', '.join(' / '.join(alternatives) for alternatives in codes.values())
+        Course.objects.filter(pk=course_id).update(pre_requisite=text[:100])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_enrollment_request'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoursePrerequisite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group', models.PositiveSmallIntegerField(default=1, help_text='Rows sharing a group are alternatives')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prerequisites', to='courses.course')),
+                ('required', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='required_for', to='courses.course')),
+            ],
+            options={
+                'verbose_name': 'Course Prerequisite',
+                'verbose_name_plural': 'Course Prerequisites',
+                'ordering': ['course', 'group', 'required'],
+                'unique_together': {('course', 'required')},
+            },
+        ),
+        migrations.RunPython(parse_prerequisites, join_prerequisites),
+        migrations.RemoveField(
+            model_name='course',
+            name='pre_requisite',
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from accounts.models import TeacherProfile, StudentProfile
 
@@ -44,10 +45,11 @@ class Course(models.Model):
     semester = models.IntegerField()
     credits = models.IntegerField(default=3)
     teacher = models.ForeignKey(TeacherProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name='courses_taught')
-    pre_requisite = models.CharField(max_length=100, blank=True)
     syllabus = models.FileField(upload_to='syllabi/', blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     max_students = models.IntegerField(default=50)
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False, help_text="Seats taken; maintained by courses.enrollment")
+    grade_scale = models.ForeignKey('grades.GradeScale', on_delete=models.SET_NULL, null=True, blank=True, related_name='courses', help_text="Leave empty to use the default scale")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -61,10 +63,40 @@ class Course(models.Model):
         return f"{self.code} - {self.title}"
 
 
+# Course Prerequisite (see courses/prerequisites.py)
+class CoursePrerequisite(models.Model):
+    """One edge of the prerequisite graph.
+
+    A course requires every group of its prerequisites; within a group,
+    passing any one of the courses is enough.
+    """
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='prerequisites')
+    required = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='required_for')
+    group = models.PositiveSmallIntegerField(default=1, help_text="Rows sharing a group are alternatives")
+
+    class Meta:
+        verbose_name = 'Course Prerequisite'
+        verbose_name_plural = 'Course Prerequisites'
+        unique_together = ('course', 'required')
+        ordering = ['course', 'group', 'required']
+
+    def __str__(self):
+        return f"{self.course.code} requires {self.required.code} (group {self.group})"
+
+    def clean(self):
+        from .prerequisites import get_graph
+
+        if not self.course_id or not self.required_id:
+            return
+        if self.course_id == self.required_id or self.course_id in get_graph().closure.get(self.required_id, ()):
+            raise ValidationError({'required': 'This prerequisite would create a cycle.'})
+
+
 # Course Enrollment
 class CourseEnrollment(models.Model):
     STATUS_CHOICES = [
         ('enrolled', 'Enrolled'),
+        ('waitlisted', 'Waitlisted'),
         ('completed', 'Completed'),
         ('dropped', 'Dropped'),
         ('deferred', 'Deferred'),
@@ -88,6 +120,32 @@ class CourseEnrollment(models.Model):
         return f"{self.student.user.get_full_name()} - {self.course.code}"
 
 
+# Enrollment Queue (registration-day intake, see courses/queue.py)
+class EnrollmentRequest(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('enrolled', 'Enrolled'),
+        ('waitlisted', 'Waitlisted'),
+        ('rejected', 'Rejected'),
+    ]
+
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='enrollment_requests')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollment_requests')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    message = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Enrollment Request'
+        verbose_name_plural = 'Enrollment Requests'
+        ordering = ['id']
+        indexes = [models.Index(fields=['status', 'id'])]
+
+    def __str__(self):
+        return f"{self.student.user.get_full_name()} - {self.course.code} ({self.get_status_display()})"
+
+
 # Timetable Entry
 class Timetable(models.Model):
     DAY_CHOICES = [
@@ -113,10 +171,27 @@ class Timetable(models.Model):
         verbose_name_plural = 'Timetables'
         ordering = ['day', 'start_time']
         unique_together = ('course', 'day', 'start_time')
+        indexes = [models.Index(fields=['day', 'start_time'])]
 
     def __str__(self):
         return f"{self.course.code} - {self.day} {self.start_time}-{self.end_time}"
 
+    def clean(self):
+        from .scheduling import Slot, describe, slot_clashes
+
+        if None in (self.start_time, self.end_time) or not self.course_id:
+            return
+        if self.end_time <= self.start_time:
+            raise ValidationError({'end_time': 'End time must be after the start time.'})
+
+        slot = Slot(
+            self.pk, self.day, self.start_time, self.end_time, self.room, self.building,
+            self.course.teacher_id, self.course_id, self.course.code,
+        )
+        clashes = slot_clashes(slot)
+        if clashes:
+            raise ValidationError([describe(clash) for clash in clashes])
+
 
 # Course Materials
 class CourseMaterial(models.Model):
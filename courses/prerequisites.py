@@ -0,0 +1,113 @@
+"""
+Prerequisite graph.
+
+CoursePrerequisite rows form a directed graph: a course requires every
+group of its prerequisites, and any one course of a group satisfies it.
+The whole graph is small, so it is compiled once into plain dicts (direct
+requirements, transitive closure, topological order per program) and
+cached with the versioned cache; any prerequisite or course change
+rebuilds it on the next read. Checking eligibility is then a set lookup
+against the student's passed courses.
+"""
+
+from collections import defaultdict, deque, namedtuple
+
+from django.db.models import Q
+
+from superiorErp.cache import cached
+from .models import Course, CourseEnrollment, CoursePrerequisite
+
+# requirements: {course_id: (frozenset(alternative ids), ...)}
+# closure:      {course_id: frozenset(every course it depends on, transitively)}
+# order:        {program_id: (course ids, prerequisites before dependants)}
+# cycles:       course ids left out of the order because they depend on themselves
+# codes:        {course_id: code}, for messages
+PrerequisiteGraph = namedtuple('PrerequisiteGraph', 'requirements closure order cycles codes')
+
+
+def get_graph():
+    return cached('prerequisites', [CoursePrerequisite, Course], build_graph)
+
+
+def build_graph():
+    groups = defaultdict(lambda: defaultdict(set))
+    for course_id, group, required_id in CoursePrerequisite.objects.order_by().values_list('course_id', 'group', 'required_id'):
+        groups[course_id][group].add(required_id)
+    requirements = {
+        course_id: tuple(frozenset(alternatives) for group, alternatives in sorted(by_group.items()))
+        for course_id, by_group in groups.items()
+    }
+
+    # Kahn's algorithm over every course, program order kept by code
+    courses = list(Course.objects.order_by('program_id', 'semester', 'code').values_list('id', 'program_id', 'code'))
+    codes = {course_id: code for course_id, _, code in courses}
+    courses = [(course_id, program_id) for course_id, program_id, _ in courses]
+    depends_on = {course_id: set().union(*requirements.get(course_id, ())) for course_id, _ in courses}
+    dependants = defaultdict(list)
+    for course_id, required in depends_on.items():
+        for required_id in required:
+            dependants[required_id].append(course_id)
+
+    waiting = {course_id: len(required) for course_id, required in depends_on.items()}
+    ready = deque(course_id for course_id, _ in courses if not waiting[course_id])
+    closure, sorted_ids = {}, []
+    while ready:
+        course_id = ready.popleft()
+        sorted_ids.append(course_id)
+        closure[course_id] = frozenset(depends_on[course_id]).union(
+            *(closure[required_id] for required_id in depends_on[course_id])
+        )
+        for dependant in dependants[course_id]:
+            waiting[dependant] -= 1
+            if not waiting[dependant]:
+                ready.append(dependant)
+
+    program_of = dict(courses)
+    order = defaultdict(list)
+    for course_id in sorted_ids:
+        order[program_of[course_id]].append(course_id)
+
+    return PrerequisiteGraph(
+        requirements=requirements,
+        closure=closure,
+        order={program_id: tuple(ids) for program_id, ids in order.items()},
+        cycles=frozenset(program_of) - frozenset(sorted_ids),
+        codes=codes,
+    )
+
+
+def passed_courses(student_ids):
+    """{student_id: ids of every course the student has passed}"""
+    from grades.models import GradeEntry
+
+    passed = defaultdict(set)
+    enrollments = (
+        CourseEnrollment.objects.filter(student_id__in=student_ids)
+        .filter(Q(is_passed=True) | Q(status='completed'))
+        .order_by().values_list('student_id', 'course_id')
+    )
+    grades = (
+        GradeEntry.objects.filter(student_id__in=student_ids, gpa_points__gt=0)
+        .order_by().values_list('student_id', 'course_id')
+    )
+    for student_id, course_id in [*enrollments, *grades]:
+        passed[student_id].add(course_id)
+    return passed
+
+
+def missing_requirements(course_id, passed, graph=None):
+    """Groups of course_id with no passed alternative"""
+    graph = graph or get_graph()
+    return [alternatives for alternatives in graph.requirements.get(course_id, ()) if not alternatives & passed]
+
+
+def can_take(course_id, passed, graph=None):
+    return not missing_requirements(course_id, passed, graph)
+
+
+def describe_missing(course, missing, graph=None):
+    """'CS301 requires CS201, CS101 or CS102.'"""
+    graph = graph or get_graph()
+    return f'{course.code} requires ' + ', '.join(
+        ' or '.join(sorted(graph.codes[course_id] for course_id in alternatives)) for alternatives in missing
+    ) + '.'
@@ -0,0 +1,105 @@
+"""
+Registration-day enrollment queue.
+
+With ENROLLMENT_QUEUE_ENABLED, the enroll view only appends an
+EnrollmentRequest row and answers at once; students then poll the
+request for its outcome. A single worker (manage.py
+process_enrollment_queue) drains pending requests in batches: each batch
+loads its courses, existing enrollments and passed courses in a few
+queries, applies the same rules as courses.enrollment in memory, oldest
+request first, and writes the results with bulk_create/bulk_update in one
+transaction.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .enrollment import ACTIVE_STATUSES
+from .prerequisites import describe_missing, get_graph, missing_requirements, passed_courses
+from .models import Course, CourseEnrollment, EnrollmentRequest
+
+# Sent after a batch has been applied; payload: enrollments, the
+# CourseEnrollment rows created or changed by it.
+enrollments_processed = Signal()
+
+
+def submit(student, course):
+    """Queue an enrollment request; returns the pending EnrollmentRequest"""
+    return EnrollmentRequest.objects.create(student=student, course=course)
+
+
+def process_batch(batch_size=500):
+    """Apply up to batch_size pending requests; returns a Counter of outcomes"""
+    with transaction.atomic():
+        requests = list(
+            EnrollmentRequest.objects.select_for_update()
+            .filter(status='pending')
+            .order_by('id')[:batch_size]
+        )
+        if not requests:
+            return Counter()
+
+        course_ids = {request.course_id for request in requests}
+        student_ids = {request.student_id for request in requests}
+        courses = Course.objects.select_for_update().in_bulk(course_ids)
+        seats = {course.id: course.max_students - course.enrolled_count for course in courses.values()}
+        existing = {
+            (enrollment.student_id, enrollment.course_id): enrollment
+            for enrollment in CourseEnrollment.objects.filter(student_id__in=student_ids, course_id__in=course_ids)
+        }
+        passed = passed_courses(student_ids)
+        graph = get_graph()
+
+        created, reused, taken = [], [], Counter()
+        now = timezone.now()
+        for request in requests:
+            course = courses[request.course_id]
+            key = (request.student_id, request.course_id)
+            enrollment = existing.get(key)
+
+            missing = missing_requirements(course.id, passed[request.student_id], graph)
+
+            request.processed_at = now
+            request.status = 'rejected'
+            if course.status != 'active':
+                request.message = f'{course.code} is not open for enrollment.'
+            elif enrollment is not None and enrollment.status in ACTIVE_STATUSES:
+                request.message = f'You are already {enrollment.status} in {course.code}.'
+            elif enrollment is not None and enrollment.status == 'completed':
+                request.message = f'You have already completed {course.code}.'
+            elif missing:
+                request.message = describe_missing(course, missing, graph)
+            else:
+                request.status = 'enrolled' if seats[course.id] > 0 else 'waitlisted'
+                if request.status == 'enrolled':
+                    seats[course.id] -= 1
+                    taken[course.id] += 1
+                if enrollment is None:
+                    enrollment = CourseEnrollment(student_id=request.student_id, course_id=course.id)
+                    created.append(enrollment)
+                else:
+                    # Queue from this request, not from the dropped one
+                    enrollment.enrollment_date = now
+                    reused.append(enrollment)
+                enrollment.status = request.status
+                existing[key] = enrollment
+                request.message = (
+                    f'Enrolled in {course.code}.' if request.status == 'enrolled'
+                    else f'{course.code} is full; you have been added to the waitlist.'
+                )
+
+        CourseEnrollment.objects.bulk_create(created)
+        CourseEnrollment.objects.bulk_update(reused, ['status', 'enrollment_date'])
+        for course_id, count in taken.items():
+            Course.objects.filter(pk=course_id).update(enrolled_count=F('enrolled_count') + count)
+        EnrollmentRequest.objects.bulk_update(requests, ['status', 'message', 'processed_at'])
+
+        changed = created + reused
+        if changed:
+            enrollments_processed.send(sender=CourseEnrollment, enrollments=changed)
+
+    return Counter(request.status for request in requests)
@@ -0,0 +1,138 @@
+"""
+Timetable clash detection.
+
+A room and a teacher can each hold one class at a time. A single new or
+edited row (Timetable.clean) is checked with one query for the rows of
+its room or teacher that overlap it on the same day (slot_clashes).
+
+ScheduleIndex checks slots in memory as they are added one at a time: it
+keeps the slots of every (day, room) and (day, teacher) in a list sorted
+by start time, together with the running maximum end time, so each check
+is one bisect per index and a walk back over just the slots still
+running when the new one starts. Rows that already overlap each other
+(older data saved before validation) cannot hide a clash behind a
+shorter neighbour.
+
+find_clashes() checks a whole set of slots at once (e.g. check_timetable
+or a registrar import) with a sweep line per index instead of comparing
+every pair.
+"""
+
+import heapq
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+
+from django.db.models import Q
+
+from .models import Timetable
+
+Slot = namedtuple('Slot', 'id day start end room building teacher_id course_id code')
+
+Clash = namedtuple('Clash', 'kind first second')
+
+SLOT_FIELDS = (
+    'id', 'day', 'start_time', 'end_time', 'room', 'building',
+    'course__teacher_id', 'course_id', 'course__code',
+)
+
+
+def slot_label(slot):
+    return f'{slot.code} {slot.day} {slot.start:%H:%M}-{slot.end:%H:%M}'
+
+
+def describe(clash):
+    if clash.kind == 'room':
+        where = f'{clash.first.room}, {clash.first.building}'
+    else:
+        where = 'the same teacher'
+    return f'{slot_label(clash.first)} overlaps {slot_label(clash.second)} ({where})'
+
+
+def load_slots(queryset=None):
+    """Slots for the given Timetable queryset (default: every row)"""
+    if queryset is None:
+        queryset = Timetable.objects.all()
+    return [Slot(*row) for row in queryset.values_list(*SLOT_FIELDS)]
+
+
+def slot_clashes(slot):
+    """Clashes of one slot with the saved rows, in one overlap query"""
+    same_place = Q(building__iexact=slot.building.strip(), room__iexact=slot.room.strip())
+    if slot.teacher_id:
+        same_place |= Q(course__teacher_id=slot.teacher_id)
+    rows = Timetable.objects.filter(same_place, day=slot.day, start_time__lt=slot.end, end_time__gt=slot.start)
+    if slot.id:
+        rows = rows.exclude(pk=slot.id)
+
+    keys = _keys(slot)
+    return [
+        Clash(kind, slot, other)
+        for other in load_slots(rows.order_by('start_time'))
+        for kind, key in _keys(other)
+        if (kind, key) in keys
+    ]
+
+
+def _keys(slot):
+    """Index keys a slot occupies, by clash kind"""
+    keys = [('room', (slot.day, slot.building.strip().lower(), slot.room.strip().lower()))]
+    if slot.teacher_id:
+        keys.append(('teacher', (slot.day, slot.teacher_id)))
+    return keys
+
+
+class ScheduleIndex:
+    """Sorted interval lists per (day, room) and (day, teacher)"""
+
+    def __init__(self, slots=()):
+        self._starts = defaultdict(list)
+        self._slots = defaultdict(list)
+        self._max_ends = defaultdict(list)  # latest end among slots[:i + 1]
+        for slot in slots:
+            self.add(slot)
+
+    def add(self, slot):
+        for kind, key in _keys(slot):
+            starts, slots, max_ends = self._starts[kind, key], self._slots[kind, key], self._max_ends[kind, key]
+            position = bisect_left(starts, slot.start)
+            starts.insert(position, slot.start)
+            slots.insert(position, slot)
+            max_ends.insert(position, slot.end)
+            for i in range(position, len(slots)):
+                latest = max(slots[i].end, max_ends[i - 1]) if i else slots[i].end
+                if i > position and max_ends[i] == latest:
+                    break
+                max_ends[i] = latest
+
+    def clashes(self, slot):
+        """Slots already in the index that overlap this one (not yet added)"""
+        found = []
+        for kind, key in _keys(slot):
+            starts, slots, max_ends = self._starts[kind, key], self._slots[kind, key], self._max_ends[kind, key]
+            # Walk back from the last slot starting before this one ends
+            # for as long as some slot up to there still runs past its start
+            position = bisect_left(starts, slot.end) - 1
+            while position >= 0 and max_ends[position] > slot.start:
+                if slots[position].end > slot.start:
+                    found.append(Clash(kind, slot, slots[position]))
+                position -= 1
+        return found
+
+
+def find_clashes(slots):
+    """Every overlapping pair among slots, by sweeping each index once"""
+    lanes = defaultdict(list)
+    for slot in slots:
+        for kind, key in _keys(slot):
+            lanes[kind, key].append(slot)
+
+    clashes = []
+    for (kind, key), lane in lanes.items():
+        lane.sort(key=lambda slot: slot.start)
+        active = []  # heap of (end, slot) still running at the sweep position
+        for order, slot in enumerate(lane):
+            while active and active[0][0] <= slot.start:
+                heapq.heappop(active)
+            clashes.extend(Clash(kind, other, slot) for end, _, other in active)
+            heapq.heappush(active, (slot.end, order, slot))
+    return clashes
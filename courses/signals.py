@@ -0,0 +1,93 @@
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from superiorErp.cache import after_commit, bump_version
+from .models import Program, Course, CoursePrerequisite, Timetable, CourseEnrollment, CourseMaterial, Announcement
+from .enrollment import promote_waitlist, release_seat
+from .queue import enrollments_processed
+from .solver import timetable_generated
+from .timetables import invalidate_courses, invalidate_students, invalidate_teachers
+
+
+# Cached reads of these models are keyed by their version counter
+@receiver([post_save, post_delete], sender=Program)
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=CoursePrerequisite)
+@receiver([post_save, post_delete], sender=Timetable)
+@receiver([post_save, post_delete], sender=CourseMaterial)
+@receiver([post_save, post_delete], sender=Announcement)
+def cached_model_changed(sender, **kwargs):
+    bump_version(sender)
+
+
+# Weekly timetables: only the people a change touches are rebuilt, and
+# their grids are dropped again on commit (see superiorErp.cache)
+@receiver(pre_save, sender=Timetable)
+@receiver(pre_save, sender=Course)
+def remember_previous_owner(sender, instance, **kwargs):
+    instance._previous_owner = None
+    if not instance._state.adding and instance.pk:
+        field = 'course_id' if sender is Timetable else 'teacher_id'
+        instance._previous_owner = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Timetable)
+def timetable_changed(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_owner', None)
+    after_commit(invalidate_courses, {instance.course_id, previous} - {None})
+
+
+@receiver([post_save, post_delete], sender=Course)
+def course_timetable_changed(sender, instance, **kwargs):
+    after_commit(invalidate_courses, [instance.pk])
+    after_commit(invalidate_teachers, [instance.teacher_id, getattr(instance, '_previous_owner', None)])
+
+
+@receiver([post_save, post_delete], sender=CourseEnrollment)
+def enrollment_changed(sender, instance, **kwargs):
+    after_commit(invalidate_students, [instance.student_id])
+
+
+@receiver(enrollments_processed)
+def enrollment_batch_processed(sender, enrollments, **kwargs):
+    after_commit(invalidate_students, {enrollment.student_id for enrollment in enrollments})
+
+
+@receiver(timetable_generated)
+def timetable_bulk_generated(sender, course_ids, **kwargs):
+    bump_version(Timetable)
+    after_commit(invalidate_courses, course_ids)
+
+
+# Seat counter: courses.enrollment updates it itself and flags the instance;
+# any other enrollment write is counted here.
+@receiver(pre_save, sender=CourseEnrollment)
+def remember_previous_status(sender, instance, **kwargs):
+    instance._previous_status = None
+    if not instance._state.adding and instance.pk:
+        instance._previous_status = (
+            CourseEnrollment.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=CourseEnrollment)
+def enrollment_saved(sender, instance, raw=False, **kwargs):
+    if raw or instance.__dict__.pop('_seat_counted', False):
+        return
+    change = (instance.status == 'enrolled') - (getattr(instance, '_previous_status', None) == 'enrolled')
+    if change > 0:
+        Course.objects.filter(pk=instance.course_id).update(enrolled_count=F('enrolled_count') + 1)
+    elif change < 0:
+        release_seat(instance.course_id)
+        # Only a dropped place goes to the waitlist; completing or deferring
+        # a course does not open it to new students
+        if instance.status == 'dropped':
+            promote_waitlist(instance.course_id)
+
+
+@receiver(post_delete, sender=CourseEnrollment)
+def enrollment_deleted(sender, instance, **kwargs):
+    if instance.status == 'enrolled':
+        release_seat(instance.course_id)
+        promote_waitlist(instance.course_id)
@@ -0,0 +1,229 @@
+"""
+Automatic timetable generation.
+
+Each course needs enough fixed-length periods a week to cover its credit
+hours, every period in a room that seats max_students, with no room,
+teacher or cohort (program + semester) booked twice at once and no two
+sessions of a course on the same day. Sections are placed greedily, most
+constrained first (fewest rooms big enough, then most sessions), each
+session going to the feasible period that leaves the cohort's week and
+the room pool most balanced, in the smallest room that fits. Free rooms
+per period are kept sorted by capacity, so a fit is one bisect.
+
+Sections that cannot be placed are reported rather than forced in. When
+rebuilding (replace), nothing is written unless every section is placed,
+so no course loses the slots it had.
+"""
+
+import csv
+import math
+from bisect import bisect_left, insort
+from collections import defaultdict, namedtuple
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.dispatch import Signal
+
+from .models import Timetable
+
+# Sent after generate() has written its rows; payload: course_ids, the
+# courses whose sections were placed.
+timetable_generated = Signal()
+
+DAYS = [day for day, label in Timetable.DAY_CHOICES]
+DEFAULT_PERIODS = [time(8), time(9, 30), time(11), time(12, 30), time(14), time(15, 30)]
+PERIOD_MINUTES = 90
+
+Room = namedtuple('Room', 'building room capacity')
+Section = namedtuple('Section', 'course_id code teacher_id cohort size sessions')
+Placement = namedtuple('Placement', 'section day start end room')
+
+
+def load_rooms(path):
+    """Room inventory from a CSV file with building, room and capacity columns"""
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        missing = {'building', 'room', 'capacity'} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f'Room file is missing columns: {", ".join(sorted(missing))}')
+        rooms = [Room(row['building'].strip(), row['room'].strip(), int(row['capacity'])) for row in reader]
+
+    if len({(room.building.lower(), room.room.lower()) for room in rooms}) != len(rooms):
+        raise ValueError('Room file lists the same room twice')
+    return rooms
+
+
+def sections_for(courses, period_minutes=PERIOD_MINUTES):
+    return [
+        Section(
+            course.id, course.code, course.teacher_id, (course.program_id, course.semester),
+            course.max_students, max(1, math.ceil(course.credits * 60 / period_minutes)),
+        )
+        for course in courses
+    ]
+
+
+def _end_of(start, minutes):
+    return (datetime.combine(datetime.min, start) + timedelta(minutes=minutes)).time()
+
+
+def _room_key(building, room):
+    return building.strip().lower(), room.strip().lower()
+
+
+class TimetableSolver:
+    def __init__(self, rooms, periods=DEFAULT_PERIODS, period_minutes=PERIOD_MINUTES, days=DAYS):
+        periods = sorted(periods)
+        for start, next_start in zip(periods, periods[1:]):
+            if _end_of(start, period_minutes) > next_start:
+                raise ValueError(
+                    f'{period_minutes}-minute periods starting at {start:%H:%M} and {next_start:%H:%M} overlap'
+                )
+        self.rooms = {_room_key(room.building, room.room): room for room in rooms}
+        self.capacities = sorted(room.capacity for room in rooms)
+        self.days = list(days)
+        self.periods = [(start, _end_of(start, period_minutes)) for start in periods]
+        self.slots = [(day, period) for day in self.days for period in range(len(self.periods))]
+
+        # Free rooms per (day, period) as a capacity-sorted list
+        ordered = sorted((room.capacity, key) for key, room in self.rooms.items())
+        self.free = {slot: list(ordered) for slot in self.slots}
+        self.teacher_busy = defaultdict(set)
+        self.cohort_busy = defaultdict(set)
+        self.cohort_load = defaultdict(int)
+
+    def block(self, day, start, end, building='', room='', teacher_id=None, cohort=None):
+        """Mark an existing booking as taken in every period it overlaps"""
+        key = _room_key(building, room)
+        for period, (period_start, period_end) in enumerate(self.periods):
+            slot = (day, period)
+            if slot not in self.free or not (start < period_end and period_start < end):
+                continue
+            if key in self.rooms:
+                entry = (self.rooms[key].capacity, key)
+                if entry in self.free[slot]:
+                    self.free[slot].remove(entry)
+            if teacher_id:
+                self.teacher_busy[teacher_id].add(slot)
+            if cohort:
+                self.cohort_busy[cohort].add(slot)
+                self.cohort_load[cohort, day] += 1
+
+    def _fit(self, slot, size):
+        """Index of the smallest free room in slot seating size, or None"""
+        free = self.free[slot]
+        position = bisect_left(free, (size,))
+        return position if position < len(free) else None
+
+    def _place(self, section):
+        placed, used_days = [], set()
+        for _ in range(section.sessions):
+            best = None
+            for slot in self.slots:
+                day = slot[0]
+                if day in used_days or slot in self.teacher_busy[section.teacher_id] or slot in self.cohort_busy[section.cohort]:
+                    continue
+                position = self._fit(slot, section.size)
+                if position is None:
+                    continue
+                score = (self.cohort_load[section.cohort, day], -len(self.free[slot]))
+                if best is None or score < best[0]:
+                    best = (score, slot, position)
+            if best is None:
+                break
+
+            _, slot, position = best
+            _, key = self.free[slot].pop(position)
+            used_days.add(slot[0])
+            placed.append((slot, key))
+            if section.teacher_id:
+                self.teacher_busy[section.teacher_id].add(slot)
+            self.cohort_busy[section.cohort].add(slot)
+            self.cohort_load[section.cohort, slot[0]] += 1
+
+        if len(placed) < section.sessions:
+            self._release(section, placed)
+            return None
+        return [
+            Placement(section, day, *self.periods[period], self.rooms[key])
+            for (day, period), key in placed
+        ]
+
+    def _release(self, section, placed):
+        for slot, key in placed:
+            insort(self.free[slot], (self.rooms[key].capacity, key))
+            self.teacher_busy[section.teacher_id].discard(slot)
+            self.cohort_busy[section.cohort].discard(slot)
+            self.cohort_load[section.cohort, slot[0]] -= 1
+
+    def solve(self, sections):
+        """(placements, unplaced sections)"""
+        def constraint(section):
+            rooms_that_fit = len(self.capacities) - bisect_left(self.capacities, section.size)
+            return (rooms_that_fit, -section.sessions, section.code)
+
+        placements, unplaced = [], []
+        for section in sorted(sections, key=constraint):
+            placed = self._place(section)
+            if placed is None:
+                unplaced.append(section)
+            else:
+                placements.extend(placed)
+        return placements, unplaced
+
+    def utilization(self, placements):
+        """Share of room-periods used, and of booked seats actually filled"""
+        room_periods = len(self.rooms) * len(self.slots)
+        seats = sum(placement.room.capacity for placement in placements)
+        return (
+            len(placements) / room_periods if room_periods else 0,
+            sum(placement.section.size for placement in placements) / seats if seats else 0,
+        )
+
+
+def generate(courses, rooms, periods=DEFAULT_PERIODS, period_minutes=PERIOD_MINUTES, replace=False, commit=True):
+    """Timetable the given courses around every booking already in place.
+
+    Courses that already have slots are skipped unless replace is set, in
+    which case their slots are deleted and rebuilt; if any of them cannot
+    be placed nothing is written. Returns the solver, the placements and
+    the unplaced sections. Raises ValueError if the periods overlap.
+    """
+    courses = list(courses)
+    course_ids = [course.id for course in courses]
+    existing = Timetable.objects.select_related('course')
+    if replace:
+        existing = existing.exclude(course_id__in=course_ids)
+    else:
+        scheduled = set(existing.filter(course_id__in=course_ids).values_list('course_id', flat=True))
+        courses = [course for course in courses if course.id not in scheduled]
+
+    solver = TimetableSolver(rooms, periods, period_minutes)
+    for entry in existing:
+        solver.block(
+            entry.day, entry.start_time, entry.end_time, entry.building, entry.room,
+            entry.course.teacher_id, (entry.course.program_id, entry.course.semester),
+        )
+
+    placements, unplaced = solver.solve(sections_for(courses, period_minutes))
+
+    if commit and not (replace and unplaced):
+        semesters = {course.id: course.semester for course in courses}
+        with transaction.atomic():
+            if replace:
+                Timetable.objects.filter(course_id__in=course_ids).delete()
+            Timetable.objects.bulk_create(
+                Timetable(
+                    course_id=placement.section.course_id,
+                    day=placement.day,
+                    start_time=placement.start,
+                    end_time=placement.end,
+                    room=placement.room.room,
+                    building=placement.room.building,
+                    semester=semesters[placement.section.course_id],
+                )
+                for placement in placements
+            )
+        timetable_generated.send(sender=Timetable, course_ids={p.section.course_id for p in placements})
+
+    return solver, placements, unplaced
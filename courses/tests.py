@@ -1,3 +1,603 @@
-from django.test import TestCase
+import os
+import random
+import tempfile
+from io import StringIO
+from datetime import datetime, time
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from accounts.models import User, StudentProfile, TeacherProfile
+from grades.models import GradeEntry
+from superiorErp.cache import cached_queryset
+from .models import Program, Course, CoursePrerequisite, Announcement, Timetable, CourseEnrollment, EnrollmentRequest
+from .enrollment import EnrollmentError, enroll, drop, recount_seats
+from .prerequisites import build_graph, can_take, get_graph, passed_courses
+from .queue import process_batch, submit
+from .scheduling import ScheduleIndex, Slot, describe, find_clashes, load_slots, slot_clashes
+from .solver import Room, Section, TimetableSolver
+from .timetables import student_timetable, teacher_timetable, next_classes
+
+
+class CachedQuerysetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.program = Program.objects.create(code='BSCS', name='BS Computer Science', department='Computer Science')
+        cls.course = Course.objects.create(code='CS101', title='Programming Fundamentals', program=cls.program, semester=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def announcements(self):
+        return cached_queryset('announcements', Announcement.objects.order_by('pk'))
+
+    def test_second_read_is_a_cache_hit(self):
+        Announcement.objects.create(course=self.course, title='Welcome', content='Hello')
+        self.assertEqual(len(self.announcements()), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.announcements()), 1)
+
+    def test_save_and_delete_invalidate(self):
+        self.announcements()
+        announcement = Announcement.objects.create(course=self.course, title='Welcome', content='Hello')
+        self.assertEqual([a.title for a in self.announcements()], ['Welcome'])
+
+        announcement.title = 'Updated'
+        announcement.save()
+        self.assertEqual([a.title for a in self.announcements()], ['Updated'])
+
+        announcement.delete()
+        self.assertEqual(self.announcements(), [])
+
+    def test_dependency_invalidates(self):
+        def courses():
+            return cached_queryset('announcement-courses', Announcement.objects.select_related('course'), depends_on=[Course])
+
+        Announcement.objects.create(course=self.course, title='Welcome', content='Hello')
+        self.assertEqual(courses()[0].course.title, 'Programming Fundamentals')
+
+        self.course.title = 'Programming I'
+        self.course.save()
+        self.assertEqual(courses()[0].course.title, 'Programming I')
+
+    def test_lost_version_counter_does_not_revive_old_entries(self):
+        Announcement.objects.create(course=self.course, title='Welcome', content='Hello')
+        self.announcements()
+        cache.delete('version:courses.announcement')
+        Announcement.objects.create(course=self.course, title='Second', content='Hello')
+        self.assertEqual(len(self.announcements()), 2)
+
+
+def create_teacher(n=0):
+    user = User.objects.create_user(username=f'teacher{n}', email=f'teacher{n}@example.com', password='x', role='teacher')
+    return TeacherProfile.objects.create(
+        user=user, official_email=f'teacher{n}@superior.edu.pk', personal_email=f'teacher{n}@example.com',
+        cnic=f'00000-0000001-{n}', department='CS', designation='Lecturer', qualification='MS',
+    )
+
+
+def create_student(n):
+    return StudentProfile.objects.create(
+        user=User.objects.create_user(username=f'student{n}', email=f'student{n}@example.com', password='x'),
+        roll_number=f'SU-{n}', father_name='Father', cnic=f'00000-0000000-{n + 1}',
+        date_of_birth='2004-01-01', gender='M', personal_email=f'student{n}@example.com',
+        university_email=f'student{n}@superior.edu.pk', whatsapp_number='03000000000',
+        intake='fall', program='BSCS',
+    )
+
+
+class WeeklyTimetableTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        program = Program.objects.create(code='BSCS', name='BS Computer Science', department='Computer Science')
+        cls.teacher = create_teacher()
+        cls.course = Course.objects.create(
+            code='CS101', title='Programming Fundamentals', program=program, semester=1, teacher=cls.teacher,
+        )
+        cls.students = [create_student(n) for n in range(2)]
+        CourseEnrollment.objects.create(student=cls.students[0], course=cls.course)
+
+    def setUp(self):
+        cache.clear()
+
+    def add_class(self, day='Monday', start=time(9), end=time(10, 30)):
+        return Timetable.objects.create(
+            course=self.course, day=day, start_time=start, end_time=end, room='A-1', building='Main', semester=1,
+        )
+
+    def test_grid_is_built_once(self):
+        self.add_class()
+        with self.assertNumQueries(1):
+            grid = student_timetable(self.students[0].id)
+        self.assertEqual([(c['code'], c['start'], c['end']) for c in grid['Monday']], [('CS101', '09:00', '10:30')])
+        with self.assertNumQueries(0):
+            self.assertEqual(student_timetable(self.students[0].id), grid)
+        self.assertEqual(teacher_timetable(self.teacher.id), grid)
+
+    def test_timetable_change_rebuilds_affected_people_only(self):
+        student_timetable(self.students[0].id)
+        student_timetable(self.students[1].id)
+        teacher_timetable(self.teacher.id)
+
+        self.add_class(day='Tuesday')
+        self.assertIn('Tuesday', student_timetable(self.students[0].id))
+        self.assertIn('Tuesday', teacher_timetable(self.teacher.id))
+        with self.assertNumQueries(0):
+            self.assertEqual(student_timetable(self.students[1].id), {})
+
+    def test_grids_dropped_again_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_class(day='Tuesday')
+            # A concurrent request caching the grid before the commit
+            cache.set(f'timetable:teacher:{self.teacher.id}', {}, None)
+        self.assertIn('Tuesday', teacher_timetable(self.teacher.id))
+
+    def test_enrollment_change_rebuilds_student(self):
+        self.add_class()
+        self.assertEqual(student_timetable(self.students[1].id), {})
+        enrollment = CourseEnrollment.objects.create(student=self.students[1], course=self.course)
+        self.assertIn('Monday', student_timetable(self.students[1].id))
+        enrollment.status = 'dropped'
+        enrollment.save()
+        self.assertEqual(student_timetable(self.students[1].id), {})
+
+    def test_next_classes(self):
+        grid = {
+            'Monday': [{'start': '09:00', 'end': '10:30'}, {'start': '14:00', 'end': '15:30'}],
+            'Wednesday': [{'start': '11:00', 'end': '12:30'}],
+        }
+        # Monday 12:00: the morning class is over
+        monday_noon = timezone.make_aware(datetime(2025, 1, 6, 12))
+        self.assertEqual(
+            [(c['day'], c['start']) for c in next_classes(grid, monday_noon)],
+            [('Monday', '14:00'), ('Wednesday', '11:00')],
+        )
+        self.assertEqual(len(next_classes(grid, monday_noon, limit=1)), 1)
+
+
+def slot(id, start, end, room='Room 1', teacher_id=1, day='Monday'):
+    return Slot(id, day, time(*start), time(*end), room, 'Building A', teacher_id, id, f'C{id}')
+
+
+class ScheduleIndexTests(SimpleTestCase):
+    def test_clashes(self):
+        index = ScheduleIndex([slot(1, (8,), (9, 30)), slot(2, (11,), (12, 30), room='Room 2', teacher_id=2)])
+        # back to back is fine
+        self.assertEqual(index.clashes(slot(3, (9, 30), (11,), teacher_id=3)), [])
+        self.assertEqual(
+            [(c.kind, c.second.id) for c in index.clashes(slot(3, (9,), (10,), room='Room 3'))],
+            [('teacher', 1)],
+        )
+        self.assertEqual(
+            [(c.kind, c.second.id) for c in index.clashes(slot(3, (12,), (13,), teacher_id=2))],
+            [('teacher', 2)],
+        )
+        self.assertEqual(index.clashes(slot(3, (9,), (10,), day='Tuesday')), [])
+
+    def test_overlapping_rows_do_not_hide_a_clash(self):
+        # Rows 1 and 2 already overlap; 2 ends first but 1 is still running
+        index = ScheduleIndex([slot(1, (8,), (12,)), slot(2, (9,), (10,), teacher_id=2), slot(3, (13,), (14,))])
+        self.assertEqual(
+            [(c.kind, c.second.id) for c in index.clashes(slot(4, (10, 30), (11,), teacher_id=4))],
+            [('room', 1)],
+        )
+        self.assertEqual(index.clashes(slot(4, (12,), (13,), teacher_id=4)), [])
+
+    def test_index_matches_sweep(self):
+        rng = random.Random(11)
+        slots = []
+        for n in range(200):
+            start = rng.randrange(8 * 60, 17 * 60, 30)
+            slots.append(slot(n, divmod(start, 60), divmod(start + rng.choice([60, 90, 180]), 60), room=f'Room {rng.randrange(4)}'))
+        # adding one slot at a time finds every pair the batch sweep finds
+        index = ScheduleIndex()
+        found = set()
+        for new in slots:
+            found |= {(c.kind, frozenset((c.first.id, c.second.id))) for c in index.clashes(new)}
+            index.add(new)
+        self.assertEqual(found, {(c.kind, frozenset((c.first.id, c.second.id))) for c in find_clashes(slots)})
+
+    def test_sweep_matches_pairwise(self):
+        rng = random.Random(7)
+        slots = []
+        for n in range(300):
+            start = rng.randrange(8 * 60, 17 * 60, 30)
+            slots.append(slot(
+                n, divmod(start, 60), divmod(start + rng.choice([60, 90]), 60),
+                room=f'Room {rng.randrange(10)}', teacher_id=rng.randrange(1, 20), day=rng.choice(['Monday', 'Tuesday']),
+            ))
+
+        expected = set()
+        for a in slots:
+            for b in slots:
+                if a.id < b.id and a.day == b.day and a.start < b.end and b.start < a.end:
+                    if a.room == b.room:
+                        expected.add(('room', a.id, b.id))
+                    if a.teacher_id == b.teacher_id:
+                        expected.add(('teacher', a.id, b.id))
+
+        found = {(c.kind, *sorted((c.first.id, c.second.id))) for c in find_clashes(slots)}
+        self.assertEqual(found, expected)
+
+
+class TimetableValidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        program = Program.objects.create(code='BSCS', name='BS Computer Science', department='Computer Science')
+        teacher = create_teacher()
+        cls.course = Course.objects.create(code='CS101', title='Programming', program=program, semester=1, teacher=teacher)
+        cls.other = Course.objects.create(code='CS102', title='Calculus', program=program, semester=1, teacher=create_teacher(1))
+        cls.slot = Timetable.objects.create(
+            course=cls.course, day='Monday', start_time=time(9), end_time=time(10, 30),
+            room='A-1', building='Main', semester=1,
+        )
+
+    def entry(self, course, start, end, room='A-1'):
+        return Timetable(course=course, day='Monday', start_time=start, end_time=end, room=room, building='Main', semester=1)
+
+    def test_room_clash(self):
+        with self.assertRaises(ValidationError):
+            self.entry(self.other, time(10), time(11)).full_clean()
+        self.entry(self.other, time(10, 30), time(12)).full_clean()
+
+    def test_teacher_clash(self):
+        with self.assertRaises(ValidationError):
+            self.entry(self.course, time(10), time(11), room='B-2').full_clean()
+
+    def test_one_overlap_query(self):
+        Timetable.objects.create(
+            course=self.other, day='Monday', start_time=time(10, 30), end_time=time(12), room='B-2', building='Main', semester=1,
+        )
+        new = Slot(None, 'Monday', time(10), time(11), ' a-1', 'main', self.other.teacher_id, self.other.id, 'CS102')
+        with self.assertNumQueries(1):
+            clashes = slot_clashes(new)
+        self.assertEqual([describe(clash) for clash in clashes], [
+            'CS102 Monday 10:00-11:00 overlaps CS101 Monday 09:00-10:30 ( a-1, main)',
+            'CS102 Monday 10:00-11:00 overlaps CS102 Monday 10:30-12:00 (the same teacher)',
+        ])
+
+    def test_editing_a_slot_does_not_clash_with_itself(self):
+        self.slot.end_time = time(11)
+        self.slot.full_clean()
+
+    def test_end_before_start(self):
+        with self.assertRaises(ValidationError):
+            self.entry(self.other, time(11), time(10), room='B-2').full_clean()
+
+    def test_check_timetable(self):
+        call_command('check_timetable', stdout=StringIO())
+        Timetable.objects.bulk_create([self.entry(self.other, time(10), time(11))])
+        with self.assertRaises(CommandError):
+            call_command('check_timetable', stdout=StringIO())
+
+
+class TimetableSolverTests(SimpleTestCase):
+    def test_solution_is_clash_free(self):
+        rng = random.Random(3)
+        rooms = [Room('Main', f'R{n}', rng.choice([40, 60, 120])) for n in range(6)]
+        sections = [
+            Section(n, f'C{n}', rng.randrange(8), (rng.randrange(3), 1), rng.choice([30, 50, 100]), rng.choice([1, 2, 3]))
+            for n in range(40)
+        ]
+        placements, unplaced = TimetableSolver(rooms).solve(sections)
+
+        slots = [
+            Slot(n, p.day, p.start, p.end, p.room.room, p.room.building, p.section.teacher_id, p.section.course_id, p.section.code)
+            for n, p in enumerate(placements)
+        ]
+        self.assertEqual(find_clashes(slots), [])
+        for placement in placements:
+            self.assertGreaterEqual(placement.room.capacity, placement.section.size)
+
+        placed = {p.section.course_id for p in placements}
+        self.assertEqual(placed | {section.course_id for section in unplaced}, {section.course_id for section in sections})
+        for section in sections:
+            if section.course_id in placed:
+                days = [p.day for p in placements if p.section.course_id == section.course_id]
+                self.assertEqual(len(days), section.sessions)
+                self.assertEqual(len(set(days)), len(days))
+
+    def test_section_without_a_big_enough_room_is_unplaced(self):
+        solver = TimetableSolver([Room('Main', 'R1', 40)])
+        placements, unplaced = solver.solve([Section(1, 'C1', None, (1, 1), 50, 2)])
+        self.assertEqual((placements, unplaced), ([], [Section(1, 'C1', None, (1, 1), 50, 2)]))
+        self.assertEqual(solver.free[('Monday', 0)], [(40, ('main', 'r1'))])
+
+
+class GenerateTimetableTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        program = Program.objects.create(code='BSCS', name='BS Computer Science', department='Computer Science')
+        teacher = create_teacher()
+        cls.courses = [
+            Course.objects.create(code=f'CS10{n}', title=f'Course {n}', program=program, semester=1, teacher=teacher, max_students=40)
+            for n in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def rooms_file(self, rows):
+        rooms = self.enterContext(tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False))
+        rooms.write('building,room,capacity\n' + rows)
+        rooms.close()
+        self.addCleanup(os.unlink, rooms.name)
+        return rooms
+
+    def test_generate_timetable(self):
+        rooms = self.rooms_file('Main,A-1,50\nMain,A-2,30\n')
+
+        teacher_id = self.courses[0].teacher_id
+        self.assertEqual(teacher_timetable(teacher_id), {})
+
+        call_command('generate_timetable', '1', rooms=rooms.name, stdout=StringIO())
+        self.assertEqual(Timetable.objects.count(), 6)
+        self.assertEqual(set(Timetable.objects.values_list('room', flat=True)), {'A-1'})
+        self.assertEqual(find_clashes(load_slots()), [])
+        # bulk-created rows still reach the cached weekly grid
+        self.assertEqual(sum(len(day) for day in teacher_timetable(teacher_id).values()), 6)
+
+        # already scheduled courses are left alone unless replaced
+        call_command('generate_timetable', '1', rooms=rooms.name, stdout=StringIO())
+        self.assertEqual(Timetable.objects.count(), 6)
+        call_command('generate_timetable', '1', rooms=rooms.name, replace=True, stdout=StringIO())
+        self.assertEqual(Timetable.objects.count(), 6)
+
+    def test_overlapping_periods_are_rejected(self):
+        rooms = self.rooms_file('Main,A-1,50\n')
+        with self.assertRaisesMessage(CommandError, 'starting at 08:00 and 09:00 overlap'):
+            call_command('generate_timetable', '1', rooms=rooms.name, periods='08:00,09:00', stdout=StringIO())
+        self.assertFalse(Timetable.objects.exists())
+
+    def test_replace_keeps_the_timetable_when_a_section_is_unplaced(self):
+        call_command('generate_timetable', '1', rooms=self.rooms_file('Main,A-1,50\n').name, stdout=StringIO())
+        before = set(Timetable.objects.values_list('pk', flat=True))
+
+        Course.objects.filter(pk=self.courses[0].pk).update(max_students=80)
+        with self.assertRaisesMessage(CommandError, '1 sections could not be placed'):
+            call_command('generate_timetable', '1', rooms=self.rooms_file('Main,B-1,60\n').name, replace=True, stdout=StringIO())
+        self.assertEqual(set(Timetable.objects.values_list('pk', flat=True)), before)
+
+
+class EnrollmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        program = Program.objects.create(code='BSCS', name='BS Computer Science', department='Computer Science')
+        cls.intro = Course.objects.create(code='CS101', title='Programming', program=program, semester=1, max_students=2)
+        bridge = Course.objects.create(code='CS100', title='Computing Basics', program=program, semester=1)
+        cls.advanced = Course.objects.create(code='CS201', title='Data Structures', program=program, semester=2)
+        CoursePrerequisite.objects.create(course=cls.advanced, required=cls.intro)
+        CoursePrerequisite.objects.create(course=cls.advanced, required=bridge)
+        cls.students = [create_student(n) for n in range(4)]
+
+    def setUp(self):
+        cache.clear()
+
+    def seats(self, course):
+        course.refresh_from_db()
+        return course.enrolled_count
+
+    def test_capacity_and_waitlist(self):
+        statuses = [enroll(student, self.intro).status for student in self.students[:3]]
+        self.assertEqual(statuses, ['enrolled', 'enrolled', 'waitlisted'])
+        self.assertEqual(self.seats(self.intro), 2)
+
+        with self.assertRaises(EnrollmentError):
+            enroll(self.students[3], self.intro, waitlist=False)
+        with self.assertRaises(EnrollmentError):
+            enroll(self.students[0], self.intro)
+
+    def test_drop_promotes_the_waitlist(self):
+        first = enroll(self.students[0], self.intro)
+        enroll(self.students[1], self.intro)
+        enroll(self.students[2], self.intro)
+        enroll(self.students[3], self.intro)
+
+        drop(first)
+        self.assertEqual(
+            dict(CourseEnrollment.objects.filter(course=self.intro).values_list('student_id', 'status')),
+            {
+                self.students[0].id: 'dropped',
+                self.students[1].id: 'enrolled',
+                self.students[2].id: 'enrolled',
+                self.students[3].id: 'waitlisted',
+            },
+        )
+        self.assertEqual(self.seats(self.intro), 2)
+
+        # re-enrolling after a drop reuses the row and queues behind the waitlist
+        self.assertEqual(enroll(self.students[0], self.intro).status, 'waitlisted')
+        drop(CourseEnrollment.objects.get(student=self.students[1], course=self.intro))
+        self.assertEqual(
+            CourseEnrollment.objects.get(student=self.students[3], course=self.intro).status, 'enrolled',
+        )
+        self.assertEqual(
+            CourseEnrollment.objects.get(student=self.students[0], course=self.intro).status, 'waitlisted',
+        )
+
+    def test_completion_promotes_nobody(self):
+        enrollment = enroll(self.students[0], self.intro)
+        enroll(self.students[1], self.intro)
+        waiting = enroll(self.students[2], self.intro)
+
+        enrollment.status = 'completed'
+        enrollment.save()
+        waiting.refresh_from_db()
+        self.assertEqual(waiting.status, 'waitlisted')
+        self.assertEqual(self.seats(self.intro), 1)
+
+    def test_writes_outside_the_service_keep_the_counter(self):
+        enrollment = CourseEnrollment.objects.create(student=self.students[0], course=self.intro)
+        self.assertEqual(self.seats(self.intro), 1)
+        waiting = CourseEnrollment.objects.create(student=self.students[1], course=self.intro, status='waitlisted')
+        self.assertEqual(self.seats(self.intro), 1)
+
+        enrollment.delete()
+        waiting.refresh_from_db()
+        self.assertEqual(waiting.status, 'enrolled')
+        self.assertEqual(self.seats(self.intro), 1)
+
+        Course.objects.filter(pk=self.intro.pk).update(enrolled_count=0)
+        recount_seats()
+        self.assertEqual(self.seats(self.intro), 1)
+
+    def test_prerequisites(self):
+        with self.assertRaisesMessage(EnrollmentError, 'CS201 requires CS100 or CS101.'):
+            enroll(self.students[0], self.advanced)
+        CourseEnrollment.objects.create(student=self.students[0], course=self.intro, status='completed', is_passed=True)
+        self.assertEqual(enroll(self.students[0], self.advanced).status, 'enrolled')
+
+    def test_closed_course(self):
+        self.intro.status = 'inactive'
+        with self.assertRaises(EnrollmentError):
+            enroll(self.students[0], self.intro)
+
+
+class EnrollmentQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        program = Program.objects.create(code='BSCS', name='BS Computer Science', department='Computer Science')
+        cls.intro = Course.objects.create(code='CS101', title='Programming', program=program, semester=1, max_students=3)
+        cls.advanced = Course.objects.create(code='CS201', title='Data Structures', program=program, semester=2)
+        CoursePrerequisite.objects.create(course=cls.advanced, required=cls.intro)
+        cls.students = [create_student(n) for n in range(5)]
+
+    def setUp(self):
+        cache.clear()
+
+    def outcomes(self):
+        return list(EnrollmentRequest.objects.order_by('id').values_list('student_id', 'course_id', 'status'))
+
+    def test_batch_applies_capacity_in_order(self):
+        CourseEnrollment.objects.create(student=self.students[0], course=self.intro, status='dropped')
+        for student in self.students:
+            submit(student, self.intro)
+        submit(self.students[1], self.intro)
+        submit(self.students[0], self.advanced)
+
+        get_graph()
+        # requests, courses, enrollments, passed courses and grades, insert,
+        # update, seat counter, request update, snapshots (plus savepoints)
+        with self.assertNumQueries(12):
+            outcomes = process_batch()
+        self.assertEqual(outcomes, {'enrolled': 3, 'waitlisted': 2, 'rejected': 2})
+
+        s = [student.id for student in self.students]
+        self.assertEqual(self.outcomes(), [
+            (s[0], self.intro.id, 'enrolled'),
+            (s[1], self.intro.id, 'enrolled'),
+            (s[2], self.intro.id, 'enrolled'),
+            (s[3], self.intro.id, 'waitlisted'),
+            (s[4], self.intro.id, 'waitlisted'),
+            (s[1], self.intro.id, 'rejected'),
+            (s[0], self.advanced.id, 'rejected'),
+        ])
+        self.intro.refresh_from_db()
+        self.assertEqual(self.intro.enrolled_count, 3)
+        self.assertEqual(CourseEnrollment.objects.filter(course=self.intro).count(), 5)
+
+        # a freed seat still goes to the waitlist
+        CourseEnrollment.objects.get(student=self.students[0], course=self.intro).delete()
+        self.assertEqual(CourseEnrollment.objects.get(student=self.students[3], course=self.intro).status, 'enrolled')
+
+    def test_batches_and_empty_queue(self):
+        for student in self.students:
+            submit(student, self.intro)
+        self.assertEqual(sum(process_batch(batch_size=2).values()), 2)
+        self.assertEqual(sum(process_batch(batch_size=2).values()), 2)
+        self.assertEqual(sum(process_batch(batch_size=2).values()), 1)
+        with self.assertNumQueries(3):
+            self.assertEqual(process_batch(batch_size=2), {})
+
+    def test_processing_invalidates_timetables(self):
+        Timetable.objects.create(
+            course=self.intro, day='Monday', start_time=time(9), end_time=time(10, 30),
+            room='A-1', building='Main', semester=1,
+        )
+        self.assertEqual(student_timetable(self.students[0].id), {})
+        submit(self.students[0], self.intro)
+        call_command('process_enrollment_queue', stdout=StringIO())
+        self.assertIn('Monday', student_timetable(self.students[0].id))
+
+    def test_timetables_dropped_again_on_commit(self):
+        Timetable.objects.create(
+            course=self.intro, day='Monday', start_time=time(9), end_time=time(10, 30),
+            room='A-1', building='Main', semester=1,
+        )
+        submit(self.students[0], self.intro)
+        with self.captureOnCommitCallbacks(execute=True):
+            process_batch()
+            # A concurrent request caching the grid before the commit
+            cache.set(f'timetable:student:{self.students[0].id}', {}, None)
+        self.assertIn('Monday', student_timetable(self.students[0].id))
+
+
+class PrerequisiteGraphTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        program = Program.objects.create(code='BSCS', name='BS Computer Science', department='Computer Science')
+        cls.course = {
+            code: Course.objects.create(code=code, title=code, program=program, semester=int(code[2]))
+            for code in ['CS101', 'CS102', 'CS201', 'CS202', 'CS301']
+        }
+        # CS201 <- CS101; CS202 <- CS101 or CS102; CS301 <- CS201 and CS202
+        cls.require('CS201', 'CS101')
+        cls.require('CS202', 'CS101')
+        cls.require('CS202', 'CS102')
+        cls.require('CS301', 'CS201', group=1)
+        cls.require('CS301', 'CS202', group=2)
+        cls.student = create_student(0)
+
+    @classmethod
+    def require(cls, code, required, group=1):
+        return CoursePrerequisite.objects.create(course=cls.course[code], required=cls.course[required], group=group)
+
+    def setUp(self):
+        cache.clear()
+
+    def ids(self, *codes):
+        return {self.course[code].id for code in codes}
+
+    def test_closure_and_order(self):
+        graph = build_graph()
+        self.assertEqual(graph.closure[self.course['CS301'].id], self.ids('CS101', 'CS102', 'CS201', 'CS202'))
+        self.assertEqual(graph.closure[self.course['CS101'].id], set())
+        order = graph.order[self.course['CS101'].program_id]
+        self.assertEqual(set(order), self.ids('CS101', 'CS102', 'CS201', 'CS202', 'CS301'))
+        for course_id, required in graph.closure.items():
+            for required_id in required:
+                self.assertLess(order.index(required_id), order.index(course_id))
+        self.assertEqual(graph.cycles, set())
+
+    def test_can_take(self):
+        cs301 = self.course['CS301'].id
+        self.assertFalse(can_take(cs301, self.ids('CS201')))
+        self.assertTrue(can_take(cs301, self.ids('CS201', 'CS202')))
+        self.assertTrue(can_take(self.course['CS202'].id, self.ids('CS102')))
+
+    def test_passed_courses_include_grades(self):
+        GradeEntry.objects.create(student=self.student, course=self.course['CS101'], marks_obtained=80, grade='A-', gpa_points='3.70')
+        GradeEntry.objects.create(student=self.student, course=self.course['CS102'], marks_obtained=20, grade='F', gpa_points='0.00')
+        CourseEnrollment.objects.create(student=self.student, course=self.course['CS201'], status='completed', is_passed=True)
+        self.assertEqual(passed_courses([self.student.id])[self.student.id], self.ids('CS101', 'CS201'))
+
+    def test_graph_is_cached_until_it_changes(self):
+        get_graph()
+        with self.assertNumQueries(0):
+            get_graph()
+        self.require('CS102', 'CS101')
+        self.assertEqual(get_graph().closure[self.course['CS301'].id], self.ids('CS101', 'CS102', 'CS201', 'CS202'))
+        self.assertEqual(get_graph().closure[self.course['CS102'].id], self.ids('CS101'))
+
+    def test_cycles_are_rejected(self):
+        edge = CoursePrerequisite(course=self.course['CS101'], required=self.course['CS301'])
+        with self.assertRaises(ValidationError):
+            edge.full_clean()
+        with self.assertRaises(ValidationError):
+            CoursePrerequisite(course=self.course['CS101'], required=self.course['CS101']).full_clean()
+        CoursePrerequisite(course=self.course['CS301'], required=self.course['CS102']).full_clean()
@@ -0,0 +1,98 @@
+"""
+Materialized weekly timetables.
+
+Each student's and teacher's week is built once from Timetable (joined
+with CourseEnrollment for students) and kept as one cache entry per
+person: {day: [class, ...]} with classes sorted by start time. Signals in
+courses/signals.py drop only the entries of people a change affects; the
+next read rebuilds them. "Today's" and "next" classes are then plain
+lookups in the grid.
+"""
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Timetable, CourseEnrollment, Course
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Grids are dropped on change, so the timeout only bounds memory
+TIMEOUT = 60 * 60 * 24
+
+
+def student_timetable(student_id):
+    """Weekly grid of every course a student is enrolled in"""
+    return _grid(f'timetable:student:{student_id}', Timetable.objects.filter(
+        course__enrollments__student_id=student_id,
+        course__enrollments__status='enrolled',
+    ))
+
+
+def teacher_timetable(teacher_id):
+    """Weekly grid of every active course a teacher teaches"""
+    return _grid(f'timetable:teacher:{teacher_id}', Timetable.objects.filter(
+        course__teacher_id=teacher_id,
+        course__status='active',
+    ))
+
+
+def classes_on(grid, day):
+    return grid.get(day, [])
+
+
+def next_classes(grid, now=None, limit=5):
+    """Classes from now on through the coming week, each tagged with its day"""
+    now = timezone.localtime(now)
+    today = now.weekday()
+    current = now.strftime('%H:%M')
+
+    upcoming = []
+    for offset in range(7):
+        day = WEEKDAYS[(today + offset) % 7]
+        for entry in grid.get(day, []):
+            if offset == 0 and entry['end'] <= current:
+                continue
+            upcoming.append({**entry, 'day': day})
+            if len(upcoming) == limit:
+                return upcoming
+    return upcoming
+
+
+def invalidate_students(student_ids):
+    cache.delete_many([f'timetable:student:{student_id}' for student_id in student_ids])
+
+
+def invalidate_teachers(teacher_ids):
+    cache.delete_many([f'timetable:teacher:{teacher_id}' for teacher_id in teacher_ids if teacher_id])
+
+
+def invalidate_courses(course_ids):
+    """Drop the grids of everyone enrolled in or teaching these courses"""
+    invalidate_students(set(
+        CourseEnrollment.objects.filter(course_id__in=course_ids).values_list('student_id', flat=True)
+    ))
+    invalidate_teachers(set(
+        Course.objects.filter(id__in=course_ids).values_list('teacher_id', flat=True)
+    ))
+
+
+def _grid(key, timetable):
+    grid = cache.get(key)
+    if grid is None:
+        grid = {}
+        rows = timetable.order_by('start_time').values_list(
+            'day', 'start_time', 'end_time', 'room', 'building',
+            'course_id', 'course__code', 'course__title',
+        )
+        for day, start, end, room, building, course_id, code, title in rows:
+            grid.setdefault(day, []).append({
+                'start': start.strftime('%H:%M'),
+                'end': end.strftime('%H:%M'),
+                'room': room,
+                'building': building,
+                'course_id': course_id,
+                'code': code,
+                'title': title,
+            })
+        cache.set(key, grid, TIMEOUT)
+    return grid
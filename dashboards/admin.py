@@ -1,3 +1,11 @@
 from django.contrib import admin
+from .models import StudentDashboardSnapshot
 
-# Register your models here.
+
+@admin.register(StudentDashboardSnapshot)
+class StudentDashboardSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['student', 'total_classes', 'avg_attendance', 'semester_gpa', 'open_alerts', 'is_stale', 'built_at']
+    list_filter = ['is_stale', 'built_at']
+    search_fields = ['student__roll_number', 'student__user__email']
+    list_select_related = ['student__user']
+    readonly_fields = ['built_at']
@@ -0,0 +1,199 @@
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.template import Template
+from django.template.loaders.locmem import Loader as LocmemLoader
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, instrumented_test_render
+from django.urls import reverse
+
+from admission.models import AdmissionApplication
+from courses.models import CourseEnrollment
+from superiorErp.datasets import PASSWORD
+from superiorErp.testing import fallback_templates
+
+
+class Command(BaseCommand):
+    help = 'Benchmark hot request paths in-process and compare them with a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Timed requests per view')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per view before measuring')
+        parser.add_argument('--views', nargs='+', help='Only these views (default: all)')
+        parser.add_argument('--password', default=PASSWORD, help='Password of the generated student accounts')
+        parser.add_argument('--output', help='Write results to this JSON file')
+        parser.add_argument('--baseline', help='Compare with results from an earlier run')
+        parser.add_argument('--threshold', type=float, default=10.0, help='Allowed p95 slowdown against the baseline, in percent')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError('--iterations must be positive and --warmup not negative')
+
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+
+        # Measure without the console query log and outgoing email; all
+        # writes (sessions, snapshots, course selections) are rolled back.
+        # Pages render their real templates; the few not in the tree yet
+        # fall back to stand-ins and are reported as view-only timings.
+        with override_settings(
+            QUERY_INSTRUMENTATION_ENABLED=False,
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+            TEMPLATES=fallback_templates(),
+        ), transaction.atomic():
+            scenarios = self._scenarios(options['password'])
+            if options['views']:
+                unknown = set(options['views']) - set(scenarios)
+                if unknown:
+                    raise CommandError(f'Unknown views: {", ".join(sorted(unknown))}')
+                scenarios = {name: scenarios[name] for name in options['views']}
+
+            results = {
+                name: self._measure(name, client, request, options['iterations'], options['warmup'])
+                for name, (client, request) in scenarios.items()
+            }
+            transaction.set_rollback(True)
+
+        report = {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'views': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f'Results written to {options["output"]}')
+
+        self._print(results)
+        if baseline is not None:
+            self._compare(results, baseline['views'], options['threshold'])
+
+    def _scenarios(self, password):
+        """(client, request) per benchmarked view, each client already logged in"""
+        enrollment = (
+            CourseEnrollment.objects.filter(status='enrolled', course__teacher__isnull=False)
+            .select_related('student__user', 'course__teacher__user')
+            .first()
+        )
+        application = AdmissionApplication.objects.filter(
+            previous_education__isnull=False, course_selection__isnull=False,
+        ).first()
+        if enrollment is None or application is None:
+            raise CommandError('No benchmark data found; run generate_load_dataset first')
+
+        student, course = enrollment.student, enrollment.course
+
+        student_client = Client(HTTP_HOST='localhost')
+        student_client.force_login(student.user)
+        teacher_client = Client(HTTP_HOST='localhost')
+        teacher_client.force_login(course.teacher.user)
+        anonymous = Client(HTTP_HOST='localhost')
+
+        return {
+            'student_dashboard': (student_client, ('get', reverse('student_dashboard'), None)),
+            'teacher_course_students': (
+                teacher_client, ('get', reverse('teacher_course_students', args=[course.id]), None),
+            ),
+            'admission_stage3': (anonymous, (
+                'post', reverse('admission_stage3', args=[application.application_id]),
+                {'program': application.course_selection.program, 'intake': 'fall'},
+            )),
+            'student_login': (anonymous, (
+                'post', '/account/login/', {'email': student.user.email, 'password': password},
+            )),
+        }
+
+    def _measure(self, name, client, request, iterations, warmup):
+        method, url, data = request
+
+        def call():
+            response = getattr(client, method)(url, data)
+            if response.status_code >= 400:
+                raise CommandError(f'{name} returned HTTP {response.status_code}')
+            return response
+
+        for _ in range(warmup):
+            call()
+
+        # One instrumented request records the templates the page renders
+        render = Template._render
+        Template._render = instrumented_test_render
+        try:
+            templates = call().templates
+        finally:
+            Template._render = render
+        stand_ins = sorted({
+            template.name for template in templates
+            if isinstance(template.origin.loader, LocmemLoader)
+        })
+
+        with CaptureQueriesContext(connection) as queries:
+            call()
+        query_count = len(queries)
+
+        tracemalloc.start()
+        call()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        if len(timings) > 1:
+            cuts = statistics.quantiles(timings, n=100, method='inclusive')
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = timings[0]
+
+        return {
+            'p50_ms': round(p50, 2),
+            'p95_ms': round(p95, 2),
+            'p99_ms': round(p99, 2),
+            'queries': query_count,
+            'peak_kib': round(peak / 1024, 1),
+            'stand_in_templates': stand_ins,
+        }
+
+    def _print(self, results):
+        self.stdout.write(f'{"view":<26}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"queries":>9}{"peak KiB":>10}  page')
+        for name, r in results.items():
+            self.stdout.write(
+                f'{name:<26}{r["p50_ms"]:>9.2f}{r["p95_ms"]:>9.2f}{r["p99_ms"]:>9.2f}{r["queries"]:>9}{r["peak_kib"]:>10.1f}'
+                f'  {"view only" if r["stand_in_templates"] else "full"}'
+            )
+        stand_ins = sorted({template for r in results.values() for template in r['stand_in_templates']})
+        if stand_ins:
+            self.stdout.write(
+                'view only: rendered with a minimal stand-in for a template not in the tree '
+                f'({", ".join(stand_ins)}), so the timing leaves out real page rendering'
+            )
+
+    def _compare(self, results, baseline, threshold):
+        regressions = []
+        for name, r in results.items():
+            base = baseline.get(name)
+            if base is None:
+                self.stdout.write(f'{name}: not in baseline')
+                continue
+
+            change = (r['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100 if base['p95_ms'] else 0
+            line = f'{name}: p95 {base["p95_ms"]:.2f} -> {r["p95_ms"]:.2f} ms ({change:+.1f}%), queries {base["queries"]} -> {r["queries"]}'
+            if change > threshold or r['queries'] > base['queries']:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+
+        if regressions:
+            raise CommandError(f'Regression against baseline ({threshold:g}% p95 threshold): {", ".join(regressions)}')
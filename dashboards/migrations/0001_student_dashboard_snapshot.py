@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:10
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentDashboardSnapshot',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='dashboard_snapshot', serialize=False, to='accounts.studentprofile')),
+                ('enrollments', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('attendance', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('grades', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('announcements', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('alerts', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('total_classes', models.IntegerField(default=0)),
+                ('present_classes', models.IntegerField(default=0)),
+                ('avg_attendance', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('open_alerts', models.IntegerField(default=0)),
+                ('semester_gpa', models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+                ('is_stale', models.BooleanField(default=True)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Student Dashboard Snapshot',
+                'verbose_name_plural': 'Student Dashboard Snapshots',
+            },
+        ),
+    ]
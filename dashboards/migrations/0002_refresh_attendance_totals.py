@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def mark_snapshots_stale(apps, schema_editor):
+    # Attendance totals are now summed and class-weighted; rebuild on next view
+    StudentDashboardSnapshot = apps.get_model('dashboards', 'StudentDashboardSnapshot')
+    StudentDashboardSnapshot.objects.update(is_stale=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboards', '0001_student_dashboard_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_snapshots_stale, migrations.RunPython.noop),
+    ]
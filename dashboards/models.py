@@ -1,3 +1,46 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_datetime
+from accounts.models import StudentProfile
 
-# Create your models here.
+# Student Dashboard Snapshot (materialized per-student dashboard data)
+class StudentDashboardSnapshot(models.Model):
+    student = models.OneToOneField(StudentProfile, on_delete=models.CASCADE, primary_key=True, related_name='dashboard_snapshot')
+
+    # Denormalized lists (stored as JSON)
+    enrollments = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    attendance = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    grades = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    announcements = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    alerts = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+
+    # Totals
+    total_classes = models.IntegerField(default=0)
+    present_classes = models.IntegerField(default=0)
+    avg_attendance = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    open_alerts = models.IntegerField(default=0)
+    semester_gpa = models.DecimalField(max_digits=3, decimal_places=2, blank=True, null=True)
+
+    # Set by change signals, cleared when the snapshot is rebuilt
+    is_stale = models.BooleanField(default=True)
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Student Dashboard Snapshot'
+        verbose_name_plural = 'Student Dashboard Snapshots'
+
+    def get_courses(self):
+        return [enrollment['course'] for enrollment in self.enrollments]
+
+    def get_announcements(self):
+        """Announcements with posted_date parsed back into datetimes"""
+        announcements = []
+        for announcement in self.announcements:
+            posted_date = announcement['posted_date']
+            if isinstance(posted_date, str):
+                posted_date = parse_datetime(posted_date)
+            announcements.append(dict(announcement, posted_date=posted_date))
+        return announcements
+
+    def __str__(self):
+        return f"Dashboard Snapshot - {self.student_id}"
@@ -0,0 +1,50 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from courses.models import Course, CourseEnrollment, Announcement
+from attendance.models import AttendanceRecord, AttendanceSummary, AttendanceAlert
+from attendance.marking import session_marked
+from grades.models import GradeEntry, SemesterGPA, grades_assigned
+from courses.queue import enrollments_processed
+from .snapshots import mark_students_stale, mark_course_stale, mark_all_stale
+
+
+# Student-level changes: only that student's snapshot goes stale
+@receiver([post_save, post_delete], sender=AttendanceRecord)
+@receiver([post_save, post_delete], sender=AttendanceSummary)
+@receiver([post_save, post_delete], sender=AttendanceAlert)
+@receiver([post_save, post_delete], sender=GradeEntry)
+@receiver([post_save, post_delete], sender=SemesterGPA)
+@receiver([post_save, post_delete], sender=CourseEnrollment)
+def student_data_changed(sender, instance, **kwargs):
+    mark_students_stale([instance.student_id])
+
+
+@receiver(session_marked)
+def attendance_session_marked(sender, student_ids, **kwargs):
+    mark_students_stale(student_ids)
+
+
+@receiver(grades_assigned)
+def grades_bulk_assigned(sender, entries, **kwargs):
+    mark_students_stale({entry.student_id for entry in entries})
+
+
+@receiver(enrollments_processed)
+def enrollments_bulk_processed(sender, enrollments, **kwargs):
+    mark_students_stale({enrollment.student_id for enrollment in enrollments})
+
+
+# Snapshots copy the course title, credits and teacher of every enrollment
+@receiver([post_save, post_delete], sender=Course)
+def course_changed(sender, instance, **kwargs):
+    mark_course_stale(instance.pk)
+
+
+# Announcements fan out to everyone who can see them
+@receiver([post_save, post_delete], sender=Announcement)
+def announcement_changed(sender, instance, **kwargs):
+    if instance.course_id:
+        mark_course_stale(instance.course_id)
+    else:
+        mark_all_stale()
@@ -0,0 +1,125 @@
+from django.db.models import Q
+
+from courses.models import CourseEnrollment, Announcement
+from attendance.models import AttendanceSummary, AttendanceAlert
+from grades.models import GradeEntry, SemesterGPA
+from .models import StudentDashboardSnapshot
+
+
+def get_student_snapshot(user):
+    """Return the dashboard snapshot for a student user, rebuilding it if stale.
+
+    A fresh snapshot costs a single query (the snapshot joined with its
+    StudentProfile). Returns None when the user has no student profile.
+    """
+    snapshot = StudentDashboardSnapshot.objects.select_related('student').filter(student__user=user).first()
+    if snapshot is not None and not snapshot.is_stale:
+        return snapshot
+
+    from accounts.models import StudentProfile
+    student = snapshot.student if snapshot else StudentProfile.objects.filter(user=user).first()
+    if student is None:
+        return None
+    return rebuild_student_snapshot(student)
+
+
+def rebuild_student_snapshot(student):
+    """Recompute every snapshot field for one student"""
+    # Clear the stale flag before reading, so a change that lands while we
+    # are rebuilding marks the snapshot stale again instead of being lost.
+    snapshot, created = StudentDashboardSnapshot.objects.update_or_create(
+        student=student,
+        defaults={'is_stale': False},
+    )
+
+    enrollments = list(
+        CourseEnrollment.objects.filter(student=student, status='enrolled')
+        .select_related('course__teacher__user')
+    )
+    course_ids = [e.course_id for e in enrollments]
+
+    summaries = AttendanceSummary.objects.for_student(student)
+    totals = summaries.totals()
+
+    announcements = Announcement.objects.filter(
+        Q(course_id__in=course_ids) | Q(course__isnull=True),
+        is_visible=True
+    ).order_by('-posted_date')[:5]
+
+    alerts = AttendanceAlert.objects.filter(student=student, is_resolved=False).select_related('course')
+
+    semester_gpa = SemesterGPA.objects.filter(
+        student=student,
+        semester=student.current_semester
+    ).values_list('gpa', flat=True).first()
+
+    snapshot.enrollments = [_enrollment_data(e) for e in enrollments]
+    snapshot.attendance = list(summaries.values(
+        'course_id', 'course__code', 'total_classes', 'present_count',
+        'attendance_percentage', 'is_eligible',
+    ))
+    snapshot.grades = list(GradeEntry.objects.filter(student=student).values(
+        'course_id', 'course__code', 'marks_obtained', 'grade', 'gpa_points',
+    ))
+    snapshot.announcements = list(announcements.values(
+        'id', 'title', 'content', 'priority', 'posted_date',
+    ))
+    snapshot.alerts = list(alerts.order_by('-created_at')[:5].values(
+        'id', 'course__code', 'alert_type', 'message', 'created_at',
+    ))
+    snapshot.open_alerts = alerts.count()
+    snapshot.total_classes = totals['total_classes']
+    snapshot.present_classes = totals['present_count']
+    snapshot.avg_attendance = totals['attendance_percentage']
+    snapshot.semester_gpa = semester_gpa
+
+    snapshot.save(update_fields=[
+        'enrollments', 'attendance', 'grades', 'announcements', 'alerts',
+        'open_alerts', 'total_classes', 'present_classes', 'avg_attendance',
+        'semester_gpa', 'built_at',
+    ])
+    snapshot.student = student
+    return snapshot
+
+
+def mark_students_stale(student_ids):
+    """Flag the snapshots of the given students for rebuild on next view"""
+    StudentDashboardSnapshot.objects.filter(student_id__in=student_ids).update(is_stale=True)
+
+
+def mark_course_stale(course_id):
+    """Flag the snapshots of every student enrolled in a course"""
+    StudentDashboardSnapshot.objects.filter(
+        student__enrollments__course_id=course_id
+    ).update(is_stale=True)
+
+
+def mark_all_stale():
+    StudentDashboardSnapshot.objects.update(is_stale=True)
+
+
+def _enrollment_data(enrollment):
+    course = enrollment.course
+    teacher = None
+    if course.teacher:
+        user = course.teacher.user
+        teacher = {
+            'user': {
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+                'get_full_name': user.get_full_name(),
+            }
+        }
+
+    return {
+        'id': enrollment.id,
+        'status': enrollment.status,
+        'course': {
+            'id': course.id,
+            'code': course.code,
+            'title': course.title,
+            'semester': course.semester,
+            'credits': course.credits,
+            'teacher': teacher,
+        },
+    }
@@ -1,3 +1,232 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from datetime import date
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import StudentProfile, TeacherProfile
+from attendance.models import AttendanceRecord
+from courses.models import CourseEnrollment, CourseMaterial, EnrollmentRequest
+from courses.prerequisites import get_graph
+from courses.queue import process_batch
+from superiorErp.datasets import build_dataset
+from superiorErp.testing import QueryCountTestCase, fallback_templates
+from .snapshots import get_student_snapshot, mark_students_stale
+
+
+@override_settings(TEMPLATES=fallback_templates())
+class DashboardQueryCountTests(QueryCountTestCase):
+    """Query counts per dashboard view; none may grow with the data"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = build_dataset(**cls.dataset)
+        cls.student = StudentProfile.objects.select_related('user').filter(enrollments__isnull=False).first()
+        cls.course = CourseEnrollment.objects.filter(student=cls.student).select_related('course').first().course
+        cls.teacher = TeacherProfile.objects.select_related('user').get(pk=cls.course.teacher_id)
+
+    def login_student(self):
+        self.client.force_login(self.student.user)
+
+    def login_teacher(self):
+        self.client.force_login(self.teacher.user)
+
+    def test_student_dashboard(self):
+        self.login_student()
+        get_student_snapshot(self.student.user)
+        # session, user, snapshot, weekly timetable
+        self.assertViewQueries(4, reverse('student_dashboard'))
+        # the timetable is now read from the cache
+        self.assertViewQueries(3, reverse('student_dashboard'))
+
+    def test_student_dashboard_rebuilds_stale_snapshot(self):
+        self.login_student()
+        get_student_snapshot(self.student.user)
+        mark_students_stale([self.student.id])
+        self.assertViewQueries(17, reverse('student_dashboard'))
+
+    def test_course_change_refreshes_snapshots(self):
+        get_student_snapshot(self.student.user)
+        self.course.title = 'Renamed course'
+        self.course.save()
+        snapshot = get_student_snapshot(self.student.user)
+        self.assertIn('Renamed course', [e['course']['title'] for e in snapshot.enrollments])
+
+    def test_student_courses(self):
+        self.login_student()
+        self.assertViewQueries(4, reverse('student_courses'))
+
+    def test_course_details(self):
+        self.login_student()
+        self.assertViewQueries(11, reverse('course_details', args=[self.course.id]))
+
+    def test_course_details_cached(self):
+        self.login_student()
+        url = reverse('course_details', args=[self.course.id])
+        self.client.get(url)
+        # materials and timetable come from the cache
+        self.assertViewQueries(9, url)
+
+        material = CourseMaterial.objects.filter(course=self.course).first()
+        material.title = 'Revised notes'
+        material.save()
+        self.assertViewQueries(10, url)
+
+    def test_cache_invalidated_again_on_commit(self):
+        self.login_student()
+        url = reverse('course_details', args=[self.course.id])
+        material = CourseMaterial.objects.filter(course=self.course).first()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            material.save()
+            # Stands in for a concurrent request caching pre-commit rows
+            self.client.get(url)
+        self.assertEqual(len(callbacks), 1)
+        self.assertViewQueries(10, url)
+
+    def test_student_attendance(self):
+        self.login_student()
+        self.assertViewQueries(5, reverse('student_attendance'))
+
+    def test_student_grades(self):
+        self.login_student()
+        self.assertViewQueries(5, reverse('student_grades'))
+
+    def test_teacher_dashboard(self):
+        self.login_teacher()
+        self.assertViewQueries(8, reverse('teacher_dashboard'))
+
+    def test_teacher_dashboard_cached(self):
+        self.login_teacher()
+        self.client.get(reverse('teacher_dashboard'))
+        self.assertViewQueries(5, reverse('teacher_dashboard'))
+
+    def test_teacher_course_students(self):
+        self.login_teacher()
+        self.assertViewQueries(8, reverse('teacher_course_students', args=[self.course.id]))
+
+    def test_teacher_assessments(self):
+        self.login_teacher()
+        self.assertViewQueries(6, reverse('teacher_assessments', args=[self.course.id]))
+
+    def test_teacher_attendance(self):
+        self.login_teacher()
+        response = self.assertViewQueries(7, reverse('teacher_attendance', args=[self.course.id]))
+        # the session form posts one status_<student_id> field per enrolled student
+        for student_id in CourseEnrollment.objects.filter(course=self.course, status='enrolled').values_list('student_id', flat=True):
+            self.assertContains(response, f'name="status_{student_id}"')
+
+    def test_teacher_attendance_marks_whole_session(self):
+        self.login_teacher()
+        roster = CourseEnrollment.objects.filter(course=self.course).values_list('student_id', flat=True)
+        data = {'date': date(2020, 1, 6).isoformat()}
+        data.update({f'status_{student_id}': 'present' for student_id in roster})
+
+        self.assertViewQueries(12, reverse('teacher_attendance', args=[self.course.id]), 'post', data)
+        self.assertEqual(
+            AttendanceRecord.objects.filter(course=self.course, date=date(2020, 1, 6)).count(),
+            len(roster),
+        )
+
+    def test_admin_dashboard(self):
+        self.client.force_login(self.data.admin)
+        self.assertViewQueries(12, reverse('admin_dashboard'))
+
+    def test_admin_approvals(self):
+        self.client.force_login(self.data.admin)
+        for user_type in ('students', 'teachers', 'staff'):
+            with self.subTest(user_type=user_type):
+                self.assertViewQueries(3, reverse('admin_approvals', args=[user_type]))
+
+    def test_approve_user(self):
+        self.client.force_login(self.data.admin)
+        pending = StudentProfile.objects.filter(is_approved=False).first()
+        self.assertViewQueries(4, reverse('approve_user', args=['student', pending.id]), 'post')
+        pending.refresh_from_db()
+        self.assertTrue(pending.is_approved)
+
+    def test_drop_and_enroll_course(self):
+        self.login_student()
+        get_graph()
+        self.assertViewQueries(9, reverse('drop_course', args=[self.course.id]), 'post')
+        self.assertViewQueries(11, reverse('enroll_course', args=[self.course.id]), 'post')
+        self.assertEqual(CourseEnrollment.objects.get(student=self.student, course=self.course).status, 'enrolled')
+
+    @override_settings(ENROLLMENT_QUEUE_ENABLED=True)
+    def test_queued_enrollment(self):
+        self.login_student()
+        CourseEnrollment.objects.filter(student=self.student, course=self.course).delete()
+        # acknowledged without touching the enrollment tables
+        self.assertViewQueries(6, reverse('enroll_course', args=[self.course.id]), 'post')
+        pending = EnrollmentRequest.objects.get(student=self.student, course=self.course)
+        status_url = reverse('enrollment_request_status', args=[pending.id])
+        self.assertEqual(self.client.get(status_url).json()['status'], 'pending')
+
+        process_batch()
+        self.assertViewQueries(3, status_url)
+        self.assertEqual(self.client.get(status_url).json()['status'], 'enrolled')
+
+
+class LargerDashboardQueryCountTests(DashboardQueryCountTests):
+    """Dashboards again with a larger dataset; every count must hold"""
+
+    dataset = {'students_per_intake': 60, 'weeks': 16, 'assessments': 6}
+
+
+# bench requests localhost, which DEBUG allows outside tests
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class BenchCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        build_dataset(programs=1, students_per_intake=2, courses_per_semester=1, weeks=1, assessments=1, applications=5)
+
+    def bench(self, **options):
+        handle, path = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        out = StringIO()
+        call_command('bench', iterations=2, warmup=0, output=path, stdout=out, **options)
+        with open(path) as f:
+            return json.load(f), out.getvalue()
+
+    def test_report(self):
+        report, out = self.bench()
+        self.assertEqual(
+            list(report['views']),
+            ['student_dashboard', 'teacher_course_students', 'admission_stage3', 'student_login'],
+        )
+        for result in report['views'].values():
+            self.assertEqual(set(result), {'p50_ms', 'p95_ms', 'p99_ms', 'queries', 'peak_kib', 'stand_in_templates'})
+            self.assertGreater(result['queries'], 0)
+
+        # A page whose template is not in the tree is timed as view-only
+        self.assertEqual(
+            report['views']['teacher_course_students']['stand_in_templates'],
+            ['dashboards/teacher_course_students.html'],
+        )
+        line = next(line for line in out.splitlines() if line.startswith('teacher_course_students'))
+        self.assertTrue(line.endswith('view only'))
+        self.assertIn('view only: rendered with a minimal stand-in', out)
+        # Everything the benchmark wrote was rolled back
+        self.assertFalse(Session.objects.exists())
+
+    def test_baseline_regression(self):
+        report, out = self.bench(views=['student_login'])
+        handle, baseline = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        self.addCleanup(os.remove, baseline)
+        report['views']['student_login']['queries'] -= 1
+        with open(baseline, 'w') as f:
+            json.dump(report, f)
+
+        with self.assertRaisesMessage(CommandError, 'Regression against baseline'):
+            self.bench(views=['student_login'], baseline=baseline, threshold=1000)
+
+    def test_unknown_view(self):
+        with self.assertRaisesMessage(CommandError, 'Unknown views: nope'):
+            self.bench(views=['nope'])
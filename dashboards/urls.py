@@ -6,6 +6,9 @@ urlpatterns = [
     path('student/', views.student_dashboard, name='student_dashboard'),
     path('student/courses/', views.student_courses, name='student_courses'),
     path('student/course/<int:course_id>/', views.course_details, name='course_details'),
+    path('student/course/<int:course_id>/enroll/', views.enroll_course, name='enroll_course'),
+    path('student/course/<int:course_id>/drop/', views.drop_course, name='drop_course'),
+    path('student/enrollment-requests/<int:request_id>/', views.enrollment_request_status, name='enrollment_request_status'),
     path('student/attendance/', views.student_attendance, name='student_attendance'),
     path('student/grades/', views.student_grades, name='student_grades'),
 
@@ -1,14 +1,23 @@
+from django.conf import settings
+from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Avg, Count
+from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta, date
 
 from accounts.models import StudentProfile, TeacherProfile, User
-from courses.models import Course, CourseEnrollment, Timetable, Announcement, CourseMaterial
+from courses.models import Course, CourseEnrollment, EnrollmentRequest, Timetable, Announcement, CourseMaterial
 from attendance.models import AttendanceRecord, AttendanceSummary, AttendanceAlert
 from grades.models import GradeEntry, SemesterGPA, AssessmentComponent, AssessmentSubmission
+from attendance.marking import mark_session
+from courses.enrollment import EnrollmentError, enroll, drop
+from courses.queue import submit
+from courses.timetables import student_timetable, teacher_timetable, next_classes
+from superiorErp.cache import cached_queryset
+from .snapshots import get_student_snapshot
 
 
 # ===== STUDENT DASHBOARD =====
@@ -19,67 +28,38 @@ def student_dashboard(request):
     if request.user.role != 'student':
         return redirect('login')
 
-    try:
-        student = StudentProfile.objects.get(user=request.user)
-    except StudentProfile.DoesNotExist:
+    # Precomputed dashboard data (rebuilt only after a relevant change)
+    snapshot = get_student_snapshot(request.user)
+    if snapshot is None:
         messages.error(request, 'Student profile not found')
         return redirect('login')
 
-    # Get enrolled courses
-    enrollments = CourseEnrollment.objects.filter(student=student, status='enrolled')
-    courses = [e.course for e in enrollments]
+    student = snapshot.student
+    courses = snapshot.get_courses()
 
-    # Get attendance summary
-    attendance_summary = AttendanceSummary.objects.filter(student=student)
+    # Templates reach the profile through request.user as well
+    request.user.student_profile = student
 
-    # Get grades
-    grades = GradeEntry.objects.filter(student=student)
-
-    # Get upcoming classes (next 7 days)
-    today = date.today()
-    next_week = today + timedelta(days=7)
-    upcoming_classes = Timetable.objects.filter(
-        course__in=courses,
-        created_at__lte=timezone.now(),
-        created_at__gte=timezone.now() - timedelta(days=30)
-    ).order_by('day', 'start_time')[:10]
-
-    # Get announcements
-    announcements = Announcement.objects.filter(
-        Q(course__in=courses) | Q(course__isnull=True),
-        is_visible=True
-    ).order_by('-posted_date')[:5]
-
-    # Get alerts
-    alerts = AttendanceAlert.objects.filter(
-        student=student,
-        is_resolved=False
-    ).order_by('-created_at')[:5]
-
-    # Calculate statistics
-    total_classes = attendance_summary.aggregate(total=Count('total_classes'))['total'] or 0
-    present_classes = attendance_summary.aggregate(total=Count('present_count'))['total'] or 0
-    avg_attendance = attendance_summary.aggregate(avg=Avg('attendance_percentage'))['avg'] or 0
-
-    # Get current semester GPA
-    semester_gpa = SemesterGPA.objects.filter(
-        student=student,
-        semester=student.current_semester
-    ).first()
+    # Next classes from the materialized weekly timetable
+    now = timezone.localtime()
+    upcoming_classes = next_classes(student_timetable(student.id), now, limit=10)
+    today_classes = [entry for entry in upcoming_classes if entry['day'] == now.strftime('%A')]
 
     context = {
         'student': student,
-        'enrollments': enrollments,
+        'enrollments': snapshot.enrollments,
         'courses': courses,
-        'attendance_summary': attendance_summary,
-        'grades': grades,
+        'attendance_summary': snapshot.attendance,
+        'grades': snapshot.grades,
         'upcoming_classes': upcoming_classes,
-        'announcements': announcements,
-        'alerts': alerts,
-        'total_classes': total_classes,
-        'present_classes': present_classes,
-        'avg_attendance': avg_attendance,
-        'semester_gpa': semester_gpa,
+        'today_classes': today_classes,
+        'announcements': snapshot.get_announcements(),
+        'alerts': snapshot.alerts,
+        'open_alerts': snapshot.open_alerts,
+        'total_classes': snapshot.total_classes,
+        'present_classes': snapshot.present_classes,
+        'avg_attendance': snapshot.avg_attendance,
+        'semester_gpa': snapshot.semester_gpa,
     }
 
     return render(request, 'accounts/student_dashboard.html', context)
@@ -96,7 +76,7 @@ def student_courses(request):
     except StudentProfile.DoesNotExist:
         return redirect('login')
 
-    enrollments = CourseEnrollment.objects.filter(student=student).select_related('course')
+    enrollments = CourseEnrollment.objects.filter(student=student).select_related('course__teacher__user')
 
     context = {
         'student': student,
@@ -106,6 +86,76 @@ def student_courses(request):
     return render(request, 'dashboards/student_courses.html', context)
 
 
+@login_required(login_url='login')
+def enroll_course(request, course_id):
+    """Enroll in a course, or join its waitlist when it is full"""
+    if request.user.role != 'student' or request.method != 'POST':
+        return redirect('student_courses')
+
+    try:
+        student = StudentProfile.objects.get(user=request.user)
+    except StudentProfile.DoesNotExist:
+        return redirect('login')
+
+    course = get_object_or_404(Course, id=course_id)
+
+    # Registration day: store the request and let the queue worker apply it
+    if settings.ENROLLMENT_QUEUE_ENABLED:
+        pending = EnrollmentRequest.objects.filter(student=student, course=course, status='pending').first()
+        if pending is None:
+            pending = submit(student, course)
+        messages.info(request, f'Your request for {course.code} has been received and will be processed shortly.')
+        return redirect(f"{reverse('student_courses')}?request={pending.id}")
+
+    try:
+        enrollment = enroll(student, course)
+    except EnrollmentError as e:
+        messages.error(request, str(e))
+    else:
+        if enrollment.status == 'enrolled':
+            messages.success(request, f'Enrolled in {course.code}.')
+        else:
+            messages.info(request, f'{course.code} is full; you have been added to the waitlist.')
+    return redirect('student_courses')
+
+
+@login_required(login_url='login')
+def enrollment_request_status(request, request_id):
+    """Poll the outcome of a queued enrollment request"""
+    if request.user.role != 'student':
+        return JsonResponse({'error': 'Not allowed'}, status=403)
+
+    enrollment_request = get_object_or_404(
+        EnrollmentRequest.objects.select_related('course'), id=request_id, student__user=request.user,
+    )
+    return JsonResponse({
+        'course': enrollment_request.course.code,
+        'status': enrollment_request.status,
+        'message': enrollment_request.message,
+    })
+
+
+@login_required(login_url='login')
+def drop_course(request, course_id):
+    """Drop a course or leave its waitlist"""
+    if request.user.role != 'student' or request.method != 'POST':
+        return redirect('student_courses')
+
+    try:
+        student = StudentProfile.objects.get(user=request.user)
+    except StudentProfile.DoesNotExist:
+        return redirect('login')
+
+    enrollment = get_object_or_404(CourseEnrollment.objects.select_related('course'), student=student, course_id=course_id)
+
+    try:
+        drop(enrollment)
+        messages.success(request, f'Dropped {enrollment.course.code}.')
+    except EnrollmentError as e:
+        messages.error(request, str(e))
+    return redirect('student_courses')
+
+
 @login_required(login_url='login')
 def course_details(request, course_id):
     """View course details including materials and assignments"""
@@ -117,19 +167,22 @@ def course_details(request, course_id):
     except StudentProfile.DoesNotExist:
         return redirect('login')
 
-    course = get_object_or_404(Course, id=course_id)
+    course = get_object_or_404(Course.objects.select_related('teacher__user'), id=course_id)
 
     # Verify student is enrolled
     enrollment = get_object_or_404(CourseEnrollment, student=student, course=course)
 
     # Get course materials
-    materials = CourseMaterial.objects.filter(course=course, is_visible=True).order_by('-uploaded_date')
+    materials = cached_queryset(
+        f'course:{course.id}:materials',
+        CourseMaterial.objects.filter(course=course, is_visible=True).order_by('-uploaded_date').select_related('uploaded_by__user'),
+    )
 
     # Get assessments
     assessments = AssessmentComponent.objects.filter(course=course)
 
     # Get student's submissions
-    submissions = AssessmentSubmission.objects.filter(student=student, assessment__course=course)
+    submissions = AssessmentSubmission.objects.filter(student=student, assessment__course=course).select_related('assessment')
 
     # Get grade
     grade = GradeEntry.objects.filter(student=student, course=course).first()
@@ -138,7 +191,7 @@ def course_details(request, course_id):
     attendance = AttendanceSummary.objects.filter(student=student, course=course).first()
 
     # Get timetable
-    timetable = Timetable.objects.filter(course=course)
+    timetable = cached_queryset(f'course:{course.id}:timetable', Timetable.objects.filter(course=course))
 
     context = {
         'student': student,
@@ -166,17 +219,13 @@ def student_attendance(request):
     except StudentProfile.DoesNotExist:
         return redirect('login')
 
-    # Get enrollment courses
-    enrollments = CourseEnrollment.objects.filter(student=student, status='enrolled')
-    courses = [e.course for e in enrollments]
-
     # Get attendance records
     attendance_records = AttendanceRecord.objects.filter(
         student=student
     ).order_by('-date').select_related('course')
 
     # Get attendance summary
-    summary = AttendanceSummary.objects.filter(student=student)
+    summary = AttendanceSummary.objects.for_student(student).select_related('course')
 
     context = {
         'student': student,
@@ -199,25 +248,17 @@ def student_grades(request):
         return redirect('login')
 
     # Get grades
-    grades = GradeEntry.objects.filter(student=student).order_by('-graded_date')
+    grades = GradeEntry.objects.filter(student=student).order_by('-graded_date').select_related('course')
 
-    # Get semester GPAs
-    semester_gpas = SemesterGPA.objects.filter(student=student).order_by('-semester')
-
-    # Calculate current CGPA
-    if semester_gpas.exists():
-        total_credits = semester_gpas.aggregate(total=Count('total_credits'))['total'] or 0
-        avg_gpa = semester_gpas.aggregate(avg=Avg('gpa'))['avg'] or 0
-    else:
-        total_credits = 0
-        avg_gpa = 0
+    # Get semester GPAs (kept current by grades.gpa as grades change)
+    semester_gpas = list(SemesterGPA.objects.filter(student=student).order_by('-semester'))
 
     context = {
         'student': student,
         'grades': grades,
         'semester_gpas': semester_gpas,
-        'total_credits': total_credits,
-        'cgpa': avg_gpa,
+        'total_credits': sum(semester.total_credits for semester in semester_gpas),
+        'cgpa': student.cgpa,
     }
 
     return render(request, 'dashboards/student_grades.html', context)
@@ -238,7 +279,7 @@ def teacher_dashboard(request):
         return redirect('login')
 
     # Get taught courses
-    courses = Course.objects.filter(teacher=teacher, status='active')
+    courses = cached_queryset(f'teacher:{teacher.id}:courses', Course.objects.filter(teacher=teacher, status='active'))
 
     # Get total students
     total_students = CourseEnrollment.objects.filter(
@@ -253,9 +294,14 @@ def teacher_dashboard(request):
     ).count()
 
     # Get recent announcements
-    announcements = Announcement.objects.filter(
-        course__in=courses
-    ).order_by('-posted_date')[:5]
+    announcements = cached_queryset(
+        f'teacher:{teacher.id}:announcements',
+        Announcement.objects.filter(course__in=courses).select_related('course').order_by('-posted_date')[:5],
+        depends_on=[Course],
+    )
+
+    now = timezone.localtime()
+    upcoming_classes = next_classes(teacher_timetable(teacher.id), now, limit=10)
 
     context = {
         'teacher': teacher,
@@ -263,6 +309,8 @@ def teacher_dashboard(request):
         'total_students': total_students,
         'pending_submissions': pending_submissions,
         'announcements': announcements,
+        'upcoming_classes': upcoming_classes,
+        'today_classes': [entry for entry in upcoming_classes if entry['day'] == now.strftime('%A')],
     }
 
     return render(request, 'dashboards/teacher_dashboard.html', context)
@@ -285,19 +333,20 @@ def teacher_course_students(request, course_id):
     enrollments = CourseEnrollment.objects.filter(
         course=course,
         status='enrolled'
-    ).select_related('student')
+    ).select_related('student__user')
 
     # Get attendance summary for students
-    attendance_summary = AttendanceSummary.objects.filter(course=course)
+    attendance_summary = AttendanceSummary.objects.for_course(course).select_related('student__user')
 
     # Get grades
-    grades = GradeEntry.objects.filter(course=course).select_related('student')
+    grades = GradeEntry.objects.filter(course=course).select_related('student__user')
 
     context = {
         'teacher': teacher,
         'course': course,
         'enrollments': enrollments,
         'attendance_summary': attendance_summary,
+        'attendance_totals': attendance_summary.totals(),
         'grades': grades,
     }
 
@@ -323,7 +372,7 @@ def teacher_assessments(request, course_id):
     # Get submissions
     submissions = AssessmentSubmission.objects.filter(
         assessment__course=course
-    ).order_by('-submission_date')
+    ).select_related('student__user', 'assessment').order_by('-submission_date')
 
     context = {
         'teacher': teacher,
@@ -348,15 +397,38 @@ def teacher_attendance(request, course_id):
 
     course = get_object_or_404(Course, id=course_id, teacher=teacher)
 
+    # Mark a whole session: one status_<student_id> field per student
+    if request.method == 'POST':
+        try:
+            session_date = date.fromisoformat(request.POST.get('date') or date.today().isoformat())
+            roster = [
+                (int(key[len('status_'):]), value)
+                for key, value in request.POST.items()
+                if key.startswith('status_') and value
+            ]
+            marked = mark_session(course, session_date, roster, recorded_by=teacher)
+            messages.success(request, f'Attendance saved for {marked} students on {session_date}.')
+        except ValueError as e:
+            messages.error(request, f'Error saving attendance: {str(e)}')
+        return redirect('teacher_attendance', course_id=course.id)
+
+    # Get roster for marking
+    enrollments = CourseEnrollment.objects.filter(
+        course=course,
+        status='enrolled'
+    ).select_related('student__user')
+
     # Get attendance records
-    attendance_records = AttendanceRecord.objects.filter(course=course).order_by('-date')
+    attendance_records = AttendanceRecord.objects.filter(course=course).order_by('-date').select_related('student__user')
 
     # Get summary
-    summary = AttendanceSummary.objects.filter(course=course)
+    summary = AttendanceSummary.objects.for_course(course).select_related('student__user')
 
     context = {
         'teacher': teacher,
         'course': course,
+        'enrollments': enrollments,
+        'status_choices': AttendanceRecord.STATUS_CHOICES,
         'attendance_records': attendance_records,
         'summary': summary,
     }
@@ -385,9 +457,12 @@ def admin_dashboard(request):
     # Total courses
     total_courses = Course.objects.count()
 
+    # Institution-wide attendance
+    attendance_totals = AttendanceSummary.objects.totals()
+
     # Recent registrations
-    recent_students = StudentProfile.objects.filter(is_approved=False).order_by('-created_at')[:5]
-    recent_teachers = TeacherProfile.objects.filter(is_approved=False).order_by('-created_at')[:5]
+    recent_students = StudentProfile.objects.filter(is_approved=False).select_related('user').order_by('-created_at')[:5]
+    recent_teachers = TeacherProfile.objects.filter(is_approved=False).select_related('user').order_by('-created_at')[:5]
 
     context = {
         'total_students': total_students,
@@ -397,6 +472,7 @@ def admin_dashboard(request):
         'pending_teachers': pending_teachers,
         'pending_staff': pending_staff,
         'total_courses': total_courses,
+        'attendance_totals': attendance_totals,
         'recent_students': recent_students,
         'recent_teachers': recent_teachers,
     }
@@ -411,12 +487,12 @@ def admin_approvals(request, user_type):
         return redirect('login')
 
     if user_type == 'students':
-        pending_users = StudentProfile.objects.filter(is_approved=False).order_by('-created_at')
+        pending_users = StudentProfile.objects.filter(is_approved=False).select_related('user').order_by('-created_at')
     elif user_type == 'teachers':
-        pending_users = TeacherProfile.objects.filter(is_approved=False).order_by('-created_at')
+        pending_users = TeacherProfile.objects.filter(is_approved=False).select_related('user').order_by('-created_at')
     elif user_type == 'staff':
         from accounts.models import StaffProfile
-        pending_users = StaffProfile.objects.filter(is_approved=False).order_by('-created_at')
+        pending_users = StaffProfile.objects.filter(is_approved=False).select_related('user').order_by('-created_at')
     else:
         return redirect('admin_dashboard')
 
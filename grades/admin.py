@@ -1,5 +1,10 @@
 from django.contrib import admin
-from .models import GradeScale, GradeEntry, AssessmentComponent, AssessmentSubmission, SemesterGPA, GPAPrediction, GradeAppeal
+from .models import GradeScale, GradeBoundary, GradeEntry, AssessmentComponent, AssessmentSubmission, SemesterGPA, GPAPrediction, GradeAppeal
+
+
+class GradeBoundaryInline(admin.TabularInline):
+    model = GradeBoundary
+    extra = 0
 
 
 @admin.register(GradeScale)
@@ -8,11 +13,13 @@ class GradeScaleAdmin(admin.ModelAdmin):
     list_filter = ['is_default', 'created_at']
     search_fields = ['name']
     readonly_fields = ['created_at']
+    inlines = [GradeBoundaryInline]
 
 
 @admin.register(GradeEntry)
 class GradeEntryAdmin(admin.ModelAdmin):
     list_display = ['get_student_name', 'course', 'marks_obtained', 'grade', 'gpa_points', 'graded_date']
+    list_select_related = ['student__user', 'course']
     list_filter = ['grade', 'course__program', 'graded_date']
     search_fields = ['student__user__email', 'course__code']
     readonly_fields = ['graded_date', 'updated_date']
@@ -57,6 +64,7 @@ class AssessmentComponentAdmin(admin.ModelAdmin):
 @admin.register(AssessmentSubmission)
 class AssessmentSubmissionAdmin(admin.ModelAdmin):
     list_display = ['get_student_name', 'assessment', 'marks_obtained', 'status', 'submission_date', 'is_late']
+    list_select_related = ['student__user', 'assessment__course']
     list_filter = ['status', 'is_late', 'submission_date']
     search_fields = ['student__user__email', 'assessment__name']
     readonly_fields = ['created_at', 'updated_at']
@@ -83,6 +91,7 @@ class AssessmentSubmissionAdmin(admin.ModelAdmin):
 @admin.register(SemesterGPA)
 class SemesterGPAAdmin(admin.ModelAdmin):
     list_display = ['get_student_name', 'semester', 'gpa', 'total_credits', 'academic_standing', 'calculated_date']
+    list_select_related = ['student__user']
     list_filter = ['semester', 'academic_standing', 'calculated_date']
     search_fields = ['student__user__email']
     readonly_fields = ['calculated_date']
@@ -105,6 +114,7 @@ class SemesterGPAAdmin(admin.ModelAdmin):
 @admin.register(GPAPrediction)
 class GPAPredictionAdmin(admin.ModelAdmin):
     list_display = ['get_student_name', 'current_cgpa', 'predicted_cgpa', 'confidence_level', 'calculated_at']
+    list_select_related = ['student__user']
     list_filter = ['calculated_at']
     search_fields = ['student__user__email']
     readonly_fields = ['calculated_at']
@@ -129,6 +139,7 @@ class GradeAppealAdmin(admin.ModelAdmin):
     list_filter = ['status', 'appealed_date', 'reviewed_date']
     search_fields = ['student__user__email', 'grade_entry__course__code']
     readonly_fields = ['appealed_date', 'reviewed_date']
+    actions = ['approve_appeals']
     date_hierarchy = 'appealed_date'
 
     fieldsets = (
@@ -149,3 +160,10 @@ class GradeAppealAdmin(admin.ModelAdmin):
         return obj.grade_entry.course.code
     get_course.short_description = 'Course'
 
+    @admin.action(description='Approve selected appeals and regrade')
+    def approve_appeals(self, request, queryset):
+        reviewer = getattr(request.user, 'teacher_profile', None)
+        for appeal in queryset.select_related('grade_entry__course'):
+            appeal.approve(reviewer=reviewer)
+        self.message_user(request, f'{queryset.count()} appeals approved.')
+
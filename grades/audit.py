@@ -0,0 +1,158 @@
+"""
+Degree audit.
+
+Compares each student's passed courses (passing GradeEntry rows and
+CourseEnrollment.is_passed/completed) with their program's SemesterRoadmap
+and Program.credits_required, and projects the semester they can graduate
+in. Audits are computed for a whole batch of students with a fixed number
+of queries and cached per student; grade, enrollment and profile changes
+drop that student's entry (see grades/signals.py), roadmap, program and
+course changes make every entry unreachable through the versioned cache.
+"""
+
+import math
+from collections import defaultdict, namedtuple
+
+from django.core.cache import cache
+
+from accounts.models import StudentProfile
+from admission.models import SemesterRoadmap
+from courses.models import Course, CourseEnrollment, CoursePrerequisite, Program
+from courses.prerequisites import get_graph, passed_courses
+from superiorErp.cache import DEFAULT_TIMEOUT, get_versions
+
+# Students per grouped query
+CHUNK_SIZE = 1000
+
+DegreeAudit = namedtuple('DegreeAudit', [
+    'student_id',
+    'program',
+    'current_semester',
+    'credits_required',
+    'credits_earned',
+    'credits_in_progress',
+    'remaining_credits',
+    'completed',          # roadmap course codes passed
+    'in_progress',        # course codes currently enrolled
+    'remaining',          # (semester, code, title, credits) roadmap courses still to take
+    'projected_semester',
+    'on_track',           # projected to finish within the program's semesters
+])
+
+# Models every audit is built from, besides the student's own rows
+AUDIT_DEPENDENCIES = [Program, Course, CoursePrerequisite, SemesterRoadmap]
+
+
+def _keys(student_ids):
+    versions = '.'.join(str(version) for version in get_versions(AUDIT_DEPENDENCIES))
+    return {student_id: f'audit:{student_id}:{versions}' for student_id in student_ids}
+
+
+def invalidate_audits(student_ids):
+    cache.delete_many(list(_keys(student_ids).values()))
+
+
+def audit_students(student_ids):
+    """{student_id: DegreeAudit}, from the cache where possible"""
+    student_ids = list(student_ids)
+    keys = _keys(student_ids)
+    cached = cache.get_many(list(keys.values()))
+    audits = {student_id: cached[key] for student_id, key in keys.items() if key in cached}
+
+    missing = [student_id for student_id in student_ids if student_id not in audits]
+    for start in range(0, len(missing), CHUNK_SIZE):
+        computed = compute_audits(missing[start:start + CHUNK_SIZE])
+        cache.set_many({keys[student_id]: audit for student_id, audit in computed.items()}, DEFAULT_TIMEOUT)
+        audits.update(computed)
+    return audits
+
+
+def compute_audits(student_ids):
+    """Audit a batch of students with one query per table, whatever the batch size"""
+    students = list(StudentProfile.objects.filter(pk__in=student_ids).values_list('pk', 'program', 'current_semester'))
+    codes = {program for _, program, _ in students}
+
+    programs = {
+        program.code: program
+        for program in Program.objects.filter(code__in=codes)
+    }
+    roadmaps = defaultdict(list)
+    for row in (
+        SemesterRoadmap.objects.filter(program__in=codes)
+        .order_by('semester', 'course_code')
+        .values_list('program', 'semester', 'course_code', 'course_title', 'credits')
+    ):
+        roadmaps[row[0]].append(row[1:])
+
+    courses = {course_id: (code, credits) for course_id, code, credits in Course.objects.values_list('id', 'code', 'credits')}
+    course_ids = {code: course_id for course_id, (code, credits) in courses.items()}
+
+    passed = passed_courses(student_ids)
+    in_progress = defaultdict(set)
+    for student_id, course_id in (
+        CourseEnrollment.objects.filter(student_id__in=student_ids, status='enrolled', is_passed=False)
+        .order_by().values_list('student_id', 'course_id')
+    ):
+        in_progress[student_id].add(course_id)
+
+    graph = get_graph()
+    return {
+        student_id: _audit(
+            student_id, program, current_semester, programs.get(program), roadmaps[program],
+            passed[student_id], in_progress[student_id] - passed[student_id], courses, course_ids, graph,
+        )
+        for student_id, program, current_semester in students
+    }
+
+
+def _audit(student_id, program_code, current_semester, program, roadmap, passed, in_progress, courses, course_ids, graph):
+    roadmap_credits = sum(credits for semester, code, title, credits in roadmap)
+    credits_required = program.credits_required if program else roadmap_credits
+    total_semesters = program.total_semesters if program else max((row[0] for row in roadmap), default=8)
+
+    passed_codes = {courses[course_id][0] for course_id in passed if course_id in courses}
+    current_codes = {courses[course_id][0] for course_id in in_progress if course_id in courses}
+    credits_earned = sum(courses[course_id][1] for course_id in passed if course_id in courses)
+    credits_in_progress = sum(courses[course_id][1] for course_id in in_progress if course_id in courses)
+
+    remaining = tuple(row for row in roadmap if row[1] not in passed_codes)
+    remaining_credits = max(credits_required - credits_earned, 0)
+
+    # Everything not finished this semester comes after it: at the program's
+    # planned load, no earlier than the roadmap schedules it, and no faster
+    # than the remaining prerequisite chains allow.
+    later = [row for row in remaining if row[1] not in current_codes]
+    load = max(credits_required / total_semesters, 1)
+    by_load = current_semester + math.ceil(max(remaining_credits - credits_in_progress, 0) / load)
+    by_roadmap = max((row[0] for row in later), default=current_semester)
+    by_chain = current_semester + _longest_chain({course_ids[row[1]] for row in later if row[1] in course_ids}, graph)
+    projected = max(by_load, by_roadmap, by_chain)
+
+    return DegreeAudit(
+        student_id=student_id,
+        program=program_code,
+        current_semester=current_semester,
+        credits_required=credits_required,
+        credits_earned=credits_earned,
+        credits_in_progress=credits_in_progress,
+        remaining_credits=remaining_credits,
+        completed=tuple(sorted(passed_codes & {row[1] for row in roadmap})),
+        in_progress=tuple(sorted(current_codes)),
+        remaining=remaining,
+        projected_semester=projected,
+        on_track=projected <= total_semesters,
+    )
+
+
+def _longest_chain(course_ids, graph):
+    """Semesters needed for the longest prerequisite chain within course_ids"""
+    depth = {}
+
+    def chain(course_id):
+        if course_id not in depth:
+            depth[course_id] = 1  # guards against cycles
+            required = set().union(*graph.requirements.get(course_id, ())) & course_ids
+            depth[course_id] = 1 + max((chain(required_id) for required_id in required), default=0)
+        return depth[course_id]
+
+    return max((chain(course_id) for course_id in course_ids), default=0)
@@ -0,0 +1,105 @@
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import F, Sum, DecimalField
+from django.utils import timezone
+
+from accounts.models import StudentProfile
+from .models import GradeEntry, SemesterGPA
+
+# Minimum semester GPA for good academic standing
+GOOD_STANDING_GPA = Decimal('2.00')
+
+
+def credit_weighted(quality_points, credits):
+    """GPA = sum(points x credits) / sum(credits), rounded to two places"""
+    if not credits:
+        return Decimal('0.00')
+    return (Decimal(quality_points) / credits).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def academic_standing(gpa):
+    return 'Good Standing' if gpa >= GOOD_STANDING_GPA else 'Academic Warning'
+
+
+def compute_gpas(student_ids):
+    """Credit-weighted semester GPAs and CGPA for a batch of students.
+
+    One grouped query returns quality points and credits per
+    (student, semester). Returns {student_id: (cgpa, {semester: (gpa, credits)})};
+    students without grades get a CGPA of zero.
+    """
+    rows = (
+        GradeEntry.objects.filter(student_id__in=student_ids)
+        .order_by()
+        .values('student_id', 'course__semester')
+        .annotate(
+            quality_points=Sum(F('gpa_points') * F('course__credits'), output_field=DecimalField()),
+            credits=Sum('course__credits'),
+        )
+    )
+
+    semesters = defaultdict(dict)
+    totals = defaultdict(lambda: [Decimal('0'), 0])
+    for row in rows:
+        student_id, credits = row['student_id'], row['credits'] or 0
+        quality_points = Decimal(row['quality_points'] or 0)
+        semesters[student_id][row['course__semester']] = (credit_weighted(quality_points, credits), credits)
+        totals[student_id][0] += quality_points
+        totals[student_id][1] += credits
+
+    return {
+        student_id: (credit_weighted(*totals[student_id]), semesters.get(student_id, {}))
+        for student_id in student_ids
+    }
+
+
+def recompute_gpas(student_ids):
+    """Recompute and persist SemesterGPA rows and StudentProfile.cgpa.
+
+    Writes are batched: one upsert for all semester GPAs, one delete for
+    semesters that no longer have grades and one bulk update of CGPAs.
+    Returns the number of students processed.
+    """
+    student_ids = list(student_ids)
+    if not student_ids:
+        return 0
+
+    results = compute_gpas(student_ids)
+    now = timezone.now()
+
+    semester_gpas = [
+        SemesterGPA(
+            student_id=student_id,
+            semester=semester,
+            gpa=gpa,
+            total_credits=credits,
+            academic_standing=academic_standing(gpa),
+            calculated_date=now,
+        )
+        for student_id, (cgpa, semesters) in results.items()
+        for semester, (gpa, credits) in semesters.items()
+    ]
+    if semester_gpas:
+        SemesterGPA.objects.bulk_create(
+            semester_gpas,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['student', 'semester'],
+            update_fields=['gpa', 'total_credits', 'academic_standing', 'calculated_date'],
+        )
+
+    stale = [
+        pk for pk, student_id, semester in
+        SemesterGPA.objects.filter(student_id__in=student_ids).values_list('pk', 'student_id', 'semester')
+        if semester not in results[student_id][1]
+    ]
+    if stale:
+        SemesterGPA.objects.filter(pk__in=stale).delete()
+
+    StudentProfile.objects.bulk_update(
+        [StudentProfile(pk=student_id, cgpa=cgpa) for student_id, (cgpa, semesters) in results.items()],
+        ['cgpa'],
+        batch_size=500,
+    )
+    return len(student_ids)
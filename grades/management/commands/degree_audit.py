@@ -0,0 +1,57 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import StudentProfile
+from grades.audit import audit_students
+
+
+class Command(BaseCommand):
+    help = 'Audit students against their program roadmap and credit requirement'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--program', help='Only students of this program code (e.g. BSCS)')
+        parser.add_argument('--student', nargs='+', help='Only these roll numbers')
+        parser.add_argument('--output', help='Write one CSV row per student to this file')
+
+    def handle(self, *args, **options):
+        students = StudentProfile.objects.order_by('pk')
+        if options['program']:
+            students = students.filter(program=options['program'])
+        if options['student']:
+            students = students.filter(roll_number__in=options['student'])
+        rolls = dict(students.values_list('pk', 'roll_number'))
+        if not rolls:
+            raise CommandError('No students match')
+
+        started = time.perf_counter()
+        audits = audit_students(rolls)
+        elapsed = time.perf_counter() - started
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow([
+                    'roll_number', 'program', 'semester', 'credits_earned', 'credits_in_progress',
+                    'credits_required', 'remaining_courses', 'projected_semester', 'on_track',
+                ])
+                for student_id, audit in audits.items():
+                    writer.writerow([
+                        rolls[student_id], audit.program, audit.current_semester, audit.credits_earned,
+                        audit.credits_in_progress, audit.credits_required,
+                        ' '.join(row[1] for row in audit.remaining), audit.projected_semester, audit.on_track,
+                    ])
+            self.stdout.write(f'Audits written to {options["output"]}')
+        elif len(audits) <= 20:
+            for student_id, audit in audits.items():
+                self.stdout.write(
+                    f'{rolls[student_id]}: {audit.credits_earned}/{audit.credits_required} credits, '
+                    f'{len(audit.remaining)} roadmap courses left, graduates in semester {audit.projected_semester}'
+                    + ('' if audit.on_track else ' (behind plan)')
+                )
+
+        behind = sum(not audit.on_track for audit in audits.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Audited {len(audits)} students in {elapsed:.2f}s; {behind} behind plan'
+        ))
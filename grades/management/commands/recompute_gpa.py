@@ -0,0 +1,83 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from accounts.models import StudentProfile
+from grades.gpa import recompute_gpas
+from grades.workers import recompute_chunk
+from superiorErp.workers import process_pool
+
+
+class Command(BaseCommand):
+    help = 'Recompute semester GPAs and CGPA for a cohort of students'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--program', help='Only students of this program code (e.g. BSCS)')
+        parser.add_argument('--intake', choices=['fall', 'spring'], help='Only students of this intake')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Students per grouped query / write batch')
+        parser.add_argument('--workers', type=int, default=1, help='Worker processes (needs a database with concurrent writers)')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        chunk_size = options['chunk_size']
+        workers = options['workers']
+        if chunk_size < 1 or workers < 1:
+            raise CommandError('--chunk-size and --workers must be positive')
+        if workers > 1 and connection.vendor == 'sqlite':
+            raise CommandError('SQLite serializes writers; run with --workers 1')
+
+        students = StudentProfile.objects.order_by('pk')
+        if options['program']:
+            students = students.filter(program=options['program'])
+        if options['intake']:
+            students = students.filter(intake=options['intake'])
+
+        chunks = self._chunks(students.values_list('pk', flat=True).iterator(chunk_size=chunk_size), chunk_size)
+
+        started = time.perf_counter()
+        if workers == 1:
+            processed = 0
+            for chunk in chunks:
+                processed += recompute_gpas(chunk)
+                self._progress(processed, started)
+        else:
+            processed = self._run_pool(chunks, workers, started)
+
+        elapsed = time.perf_counter() - started
+        rate = processed / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed GPAs for {processed} students in {elapsed:.2f}s ({rate:.0f} students/sec)'
+        ))
+
+    def _run_pool(self, chunks, workers, started):
+        processed = 0
+        pending = set()
+        with process_pool(workers) as pool:
+            for chunk in chunks:
+                # Bound in-flight chunks so memory stays flat
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        processed += future.result()
+                        self._progress(processed, started)
+                pending.add(pool.submit(recompute_chunk, chunk))
+            for future in wait(pending).done:
+                processed += future.result()
+        return processed
+
+    def _chunks(self, iterable, size):
+        chunk = []
+        for item in iterable:
+            chunk.append(item)
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _progress(self, processed, started):
+        if self.verbosity > 1:
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'  {processed} students ({processed / elapsed if elapsed else 0:.0f}/sec)')
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:13
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The default scale as first seeded: (minimum marks, grade, GPA points)
+DEFAULT_BOUNDARIES = [
+    (0, 'F', '0.0'),
+    (40, 'D', '1.0'),
+    (45, 'D+', '1.3'),
+    (50, 'C-', '1.7'),
+    (55, 'C', '2.0'),
+    (60, 'C+', '2.3'),
+    (65, 'B-', '2.7'),
+    (70, 'B', '3.0'),
+    (75, 'B+', '3.3'),
+    (80, 'A-', '3.7'),
+    (85, 'A', '4.0'),
+    (90, 'A+', '4.0'),
+]
+
+
+def create_default_scale(apps, schema_editor):
+    GradeScale = apps.get_model('grades', 'GradeScale')
+    GradeBoundary = apps.get_model('grades', 'GradeBoundary')
+
+    scale = GradeScale.objects.filter(is_default=True).first()
+    if scale is None:
+        scale = GradeScale.objects.create(name='Standard', description='Absolute grading scale', is_default=True)
+    if not GradeBoundary.objects.filter(scale=scale).exists():
+        GradeBoundary.objects.bulk_create([
+            GradeBoundary(scale=scale, min_marks=min_marks, grade=grade, gpa_points=points)
+            for min_marks, grade, points in DEFAULT_BOUNDARIES
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeBoundary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_marks', models.DecimalField(decimal_places=2, max_digits=5, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('grade', models.CharField(max_length=2)),
+                ('gpa_points', models.DecimalField(decimal_places=2, max_digits=3, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(4)])),
+                ('scale', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='boundaries', to='grades.gradescale')),
+            ],
+            options={
+                'verbose_name': 'Grade Boundary',
+                'verbose_name_plural': 'Grade Boundaries',
+                'ordering': ['scale', '-min_marks'],
+                'unique_together': {('scale', 'min_marks')},
+            },
+        ),
+        migrations.RunPython(create_default_scale, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,10 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.dispatch import Signal
+from django.utils import timezone
 from accounts.models import StudentProfile, TeacherProfile
 from courses.models import Course
+from .scales import get_grade_table, get_scale_table
 
 # Grade Scale/Rubric
 class GradeScale(models.Model):
@@ -14,10 +17,73 @@ class GradeScale(models.Model):
         verbose_name = 'Grade Scale'
         verbose_name_plural = 'Grade Scales'
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Only one scale can be the default
+        if self.is_default:
+            GradeScale.objects.filter(is_default=True).exclude(pk=self.pk).update(is_default=False)
+
+    def get_table(self):
+        """Compiled (cached) boundary table for this scale"""
+        return get_scale_table(self.pk)
+
     def __str__(self):
         return self.name
 
 
+# Grade Boundary (minimum marks for a letter grade within a scale)
+class GradeBoundary(models.Model):
+    scale = models.ForeignKey(GradeScale, on_delete=models.CASCADE, related_name='boundaries')
+    min_marks = models.DecimalField(max_digits=5, decimal_places=2, validators=[MinValueValidator(0), MaxValueValidator(100)])
+    grade = models.CharField(max_length=2)
+    gpa_points = models.DecimalField(max_digits=3, decimal_places=2, validators=[MinValueValidator(0), MaxValueValidator(4)])
+
+    class Meta:
+        verbose_name = 'Grade Boundary'
+        verbose_name_plural = 'Grade Boundaries'
+        unique_together = ('scale', 'min_marks')
+        ordering = ['scale', '-min_marks']
+
+    def __str__(self):
+        return f"{self.scale.name}: {self.grade} >= {self.min_marks}"
+
+
+# Sent after assign_grades(); payload: entries, the GradeEntry objects
+# whose grade changed.
+grades_assigned = Signal()
+
+
+class GradeEntryQuerySet(models.QuerySet):
+    def assign_grades(self, table=None):
+        """Grade every entry in the queryset with one bulk UPDATE per batch.
+
+        Marks are mapped through a precomputed GradeTable; only entries whose
+        grade or points change are written. Returns the number updated.
+        """
+        now = timezone.now()
+        changed = []
+        tables = {}
+        for entry in self.select_related('course'):
+            entry_table = table
+            if entry_table is None:
+                if entry.course_id not in tables:
+                    tables[entry.course_id] = get_grade_table(entry.course)
+                entry_table = tables[entry.course_id]
+            grade, points = entry_table.lookup(entry.marks_obtained)
+            if entry.grade != grade or entry.gpa_points != points:
+                entry.grade, entry.gpa_points, entry.updated_date = grade, points, now
+                changed.append(entry)
+
+        if changed:
+            self.model.objects.bulk_update(changed, ['grade', 'gpa_points', 'updated_date'], batch_size=500)
+            grades_assigned.send(sender=self.model, entries=changed)
+        return len(changed)
+
+    def grade_course(self, course, table=None):
+        """Finalize grades for every entry of a course"""
+        return self.filter(course=course).assign_grades(table)
+
+
 # Grade Entry
 class GradeEntry(models.Model):
     student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='grade_entries')
@@ -30,6 +96,8 @@ class GradeEntry(models.Model):
     updated_date = models.DateTimeField(auto_now=True)
     remarks = models.TextField(blank=True)
 
+    objects = GradeEntryQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Grade Entry'
         verbose_name_plural = 'Grade Entries'
@@ -38,44 +106,7 @@ class GradeEntry(models.Model):
 
     def calculate_grade(self):
         """Calculate letter grade from marks"""
-        marks = self.marks_obtained
-        if marks >= 90:
-            self.grade = 'A+'
-            self.gpa_points = 4.0
-        elif marks >= 85:
-            self.grade = 'A'
-            self.gpa_points = 4.0
-        elif marks >= 80:
-            self.grade = 'A-'
-            self.gpa_points = 3.7
-        elif marks >= 75:
-            self.grade = 'B+'
-            self.gpa_points = 3.3
-        elif marks >= 70:
-            self.grade = 'B'
-            self.gpa_points = 3.0
-        elif marks >= 65:
-            self.grade = 'B-'
-            self.gpa_points = 2.7
-        elif marks >= 60:
-            self.grade = 'C+'
-            self.gpa_points = 2.3
-        elif marks >= 55:
-            self.grade = 'C'
-            self.gpa_points = 2.0
-        elif marks >= 50:
-            self.grade = 'C-'
-            self.gpa_points = 1.7
-        elif marks >= 45:
-            self.grade = 'D+'
-            self.gpa_points = 1.3
-        elif marks >= 40:
-            self.grade = 'D'
-            self.gpa_points = 1.0
-        else:
-            self.grade = 'F'
-            self.gpa_points = 0.0
-
+        self.grade, self.gpa_points = get_grade_table(self.course).lookup(self.marks_obtained)
         self.save()
         return self.grade
 
@@ -208,6 +239,19 @@ class GradeAppeal(models.Model):
         verbose_name_plural = 'Grade Appeals'
         ordering = ['-appealed_date']
 
+    def approve(self, reviewer=None, new_marks=None):
+        """Approve the appeal and regrade the entry with the revised marks"""
+        if new_marks is not None:
+            self.new_marks = new_marks
+        if self.new_marks is not None:
+            self.grade_entry.marks_obtained = self.new_marks
+            self.grade_entry.calculate_grade()
+
+        self.status = 'approved'
+        self.reviewed_by = reviewer
+        self.reviewed_date = timezone.now()
+        self.save()
+
     def __str__(self):
         return f"Appeal - {self.student.user.get_full_name()} - {self.status}"
 
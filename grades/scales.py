@@ -0,0 +1,90 @@
+from bisect import bisect_right
+from decimal import Decimal
+
+from superiorErp.cache import get_versions
+
+# Default letter grade boundaries: (minimum marks, grade, GPA points)
+DEFAULT_BOUNDARIES = [
+    (0, 'F', '0.0'),
+    (40, 'D', '1.0'),
+    (45, 'D+', '1.3'),
+    (50, 'C-', '1.7'),
+    (55, 'C', '2.0'),
+    (60, 'C+', '2.3'),
+    (65, 'B-', '2.7'),
+    (70, 'B', '3.0'),
+    (75, 'B+', '3.3'),
+    (80, 'A-', '3.7'),
+    (85, 'A', '4.0'),
+    (90, 'A+', '4.0'),
+]
+
+
+class GradeTable:
+    """Immutable marks -> (grade, points) lookup over sorted boundaries.
+
+    lookup() is a binary search over the minimum marks, so mapping a mark
+    costs O(log n) in the number of boundaries with no branching ladder.
+    """
+    __slots__ = ('_minimums', '_results')
+
+    def __init__(self, boundaries):
+        rows = sorted((Decimal(str(minimum)), grade, Decimal(str(points))) for minimum, grade, points in boundaries)
+        if not rows:
+            raise ValueError('A grade table needs at least one boundary')
+        self._minimums = tuple(row[0] for row in rows)
+        self._results = tuple((row[1], row[2]) for row in rows)
+
+    def lookup(self, marks):
+        """Return (grade, gpa_points) for a mark; marks below every boundary get the lowest grade"""
+        index = bisect_right(self._minimums, Decimal(str(marks))) - 1
+        return self._results[max(index, 0)]
+
+    def __len__(self):
+        return len(self._minimums)
+
+
+DEFAULT_TABLE = GradeTable(DEFAULT_BOUNDARIES)
+
+# Compiled tables per GradeScale id (None = the default scale), with the
+# GradeScale and GradeBoundary versions they were compiled at. A scale or
+# boundary change in any process bumps a version (see grades/signals.py)
+# and the next lookup in every process compiles afresh.
+_snapshot = (None, {})
+
+
+def get_scale_table(scale_id=None):
+    """Compiled table for a GradeScale; only the first call per scale and version queries"""
+    global _snapshot
+    from .models import GradeScale, GradeBoundary
+
+    versions = get_versions([GradeScale, GradeBoundary])
+    snapshot_versions, tables = _snapshot
+    if snapshot_versions != versions:
+        tables = {}
+        _snapshot = (versions, tables)
+    table = tables.get(scale_id)
+    if table is None:
+        table = tables[scale_id] = _compile(scale_id)
+    return table
+
+
+def get_grade_table(course=None):
+    """Grade table used for a course (its own scale or the default one)"""
+    return get_scale_table(getattr(course, 'grade_scale_id', None))
+
+
+def _compile(scale_id):
+    from .models import GradeBoundary
+
+    boundaries = GradeBoundary.objects.all()
+    if scale_id is None:
+        boundaries = boundaries.filter(scale__is_default=True)
+    else:
+        boundaries = boundaries.filter(scale_id=scale_id)
+
+    rows = list(boundaries.values_list('min_marks', 'grade', 'gpa_points'))
+    if not rows:
+        # A scale without boundaries grades like the default scale
+        return DEFAULT_TABLE if scale_id is None else get_scale_table(None)
+    return GradeTable(rows)
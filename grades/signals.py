@@ -0,0 +1,54 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.models import StudentProfile
+from courses.models import CourseEnrollment
+from courses.queue import enrollments_processed
+from .models import GradeScale, GradeBoundary, GradeEntry, grades_assigned
+from .gpa import recompute_gpas
+from .audit import invalidate_audits
+from superiorErp.cache import after_commit, bump_version
+
+
+# Compiled grade tables are keyed by these versions (see grades/scales.py)
+@receiver([post_save, post_delete], sender=GradeScale)
+@receiver([post_save, post_delete], sender=GradeBoundary)
+def grade_scale_changed(sender, **kwargs):
+    bump_version(sender)
+
+
+# Keep SemesterGPA and CGPA current as grades change
+@receiver([post_save, post_delete], sender=GradeEntry)
+def grade_entry_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        recompute_gpas([instance.student_id])
+
+
+@receiver(grades_assigned)
+def grades_bulk_assigned(sender, entries, **kwargs):
+    recompute_gpas({entry.student_id for entry in entries})
+
+
+# Degree audits: a student's own grades, enrollments and profile (program,
+# current semester) drop their audit, now and again on commit so a reader
+# cannot cache the pre-commit rows in between; a roadmap change makes every
+# audit unreachable
+@receiver([post_save, post_delete], sender=GradeEntry)
+@receiver([post_save, post_delete], sender=CourseEnrollment)
+def audited_record_changed(sender, instance, **kwargs):
+    after_commit(invalidate_audits, [instance.student_id])
+
+
+@receiver([post_save, post_delete], sender=StudentProfile)
+def audited_student_changed(sender, instance, **kwargs):
+    after_commit(invalidate_audits, [instance.pk])
+
+
+@receiver(grades_assigned)
+def audited_grades_assigned(sender, entries, **kwargs):
+    after_commit(invalidate_audits, {entry.student_id for entry in entries})
+
+
+@receiver(enrollments_processed)
+def audited_enrollments_processed(sender, enrollments, **kwargs):
+    after_commit(invalidate_audits, {enrollment.student_id for enrollment in enrollments})
@@ -1,3 +1,296 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User, StudentProfile
+from admission.models import SemesterRoadmap
+from courses.models import Program, Course, CourseEnrollment, CoursePrerequisite
+from .audit import audit_students
+from .gpa import compute_gpas, recompute_gpas
+from superiorErp.cache import bump_version
+from superiorErp.workers import process_pool
+from .models import GradeBoundary, GradeEntry, GradeScale, SemesterGPA
+from .scales import get_scale_table
+from .workers import recompute_chunk
+
+
+def create_student(n, semester):
+    return StudentProfile.objects.create(
+        user=User.objects.create_user(username=f'student{n}', email=f'student{n}@example.com', password='x'),
+        roll_number=f'SU-{n}', father_name='Father', cnic=f'00000-0000000-{n}',
+        date_of_birth='2004-01-01', gender='M', personal_email=f'student{n}@example.com',
+        university_email=f'student{n}@superior.edu.pk', whatsapp_number='03000000000',
+        intake='fall', program='BSCS', current_semester=semester,
+    )
+
+
+class GradeTableTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.scale = GradeScale.objects.create(name='Pass/Fail')
+        GradeBoundary.objects.create(scale=cls.scale, min_marks=0, grade='F', gpa_points='0.00')
+        cls.boundary = GradeBoundary.objects.create(scale=cls.scale, min_marks=50, grade='P', gpa_points='4.00')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_compiled_once(self):
+        self.assertEqual(get_scale_table(self.scale.pk).lookup(55), ('P', 4))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.scale.get_table().lookup(45), ('F', 0))
+
+    def test_recompiled_after_a_change_in_another_process(self):
+        get_scale_table(self.scale.pk)
+        # update() sends no signal; the version bump is what another process' save leaves behind
+        GradeBoundary.objects.filter(pk=self.boundary.pk).update(min_marks=60)
+        bump_version(GradeBoundary)
+        self.assertEqual(get_scale_table(self.scale.pk).lookup(55), ('F', 0))
+
+
+
+class GradingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        program = Program.objects.create(code='BSCS', name='BS Computer Science', department='Computer Science')
+        cls.course = Course.objects.create(code='CS101', title='CS101', program=program, semester=1)
+        cls.empty = Course.objects.create(code='CS102', title='CS102', program=program, semester=1)
+        # Either side of the default scale's edges (grades.migrations.0002)
+        cls.expected = [
+            (0, 'F', '0.00'), ('39.99', 'F', '0.00'), (40, 'D', '1.00'), ('74.99', 'B', '3.00'),
+            (75, 'B+', '3.30'), ('89.99', 'A', '4.00'), (90, 'A+', '4.00'), (100, 'A+', '4.00'),
+        ]
+        for n, (marks, grade, points) in enumerate(cls.expected):
+            GradeEntry.objects.create(student=create_student(n, semester=1), course=cls.course, marks_obtained=marks, grade='', gpa_points=0)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_grade_course(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(GradeEntry.objects.grade_course(self.course), len(self.expected))
+        entry_updates = [q for q in queries if q['sql'].startswith('UPDATE "grades_gradeentry"')]
+        self.assertEqual(len(entry_updates), 1)
+
+        self.assertEqual(
+            list(GradeEntry.objects.order_by('marks_obtained').values_list('marks_obtained', 'grade', 'gpa_points')),
+            [(Decimal(str(marks)), grade, Decimal(points)) for marks, grade, points in self.expected],
+        )
+        # Nothing changed: nothing is written
+        with self.assertNumQueries(1):
+            self.assertEqual(GradeEntry.objects.grade_course(self.course), 0)
+
+    def test_course_without_entries(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(GradeEntry.objects.grade_course(self.empty), 0)
+
+    def test_course_scale(self):
+        scale = GradeScale.objects.create(name='Pass/Fail')
+        GradeBoundary.objects.create(scale=scale, min_marks=0, grade='F', gpa_points='0.00')
+        GradeBoundary.objects.create(scale=scale, min_marks=50, grade='P', gpa_points='4.00')
+        self.course.grade_scale = scale
+        self.course.save()
+
+        GradeEntry.objects.grade_course(self.course)
+        self.assertEqual(
+            list(GradeEntry.objects.order_by('marks_obtained').values_list('grade', flat=True)),
+            ['F', 'F', 'F', 'P', 'P', 'P', 'P', 'P'],
+        )
+
+class DegreeAuditTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        program = Program.objects.create(
+            code='BSCS', name='BS Computer Science', department='Computer Science',
+            total_semesters=4, credits_required=24,
+        )
+        # Two 3-credit courses a semester; each course needs the one before it
+        cls.course = {}
+        for semester in range(1, 5):
+            for n in range(2):
+                code = f'CS{semester}0{n}'
+                cls.course[code] = Course.objects.create(code=code, title=code, program=program, semester=semester, credits=3)
+                SemesterRoadmap.objects.create(program='BSCS', semester=semester, course_code=code, course_title=code, credits=3)
+                if semester > 1:
+                    CoursePrerequisite.objects.create(course=cls.course[code], required=cls.course[f'CS{semester - 1}0{n}'])
+
+        cls.student = create_student(1, semester=2)
+        GradeEntry.objects.create(student=cls.student, course=cls.course['CS100'], marks_obtained=80, grade='A-', gpa_points='3.70')
+        CourseEnrollment.objects.create(student=cls.student, course=cls.course['CS101'], status='completed', is_passed=True)
+        CourseEnrollment.objects.create(student=cls.student, course=cls.course['CS200'])
+        CourseEnrollment.objects.create(student=cls.student, course=cls.course['CS201'])
+
+        cls.behind = create_student(2, semester=3)
+        GradeEntry.objects.create(student=cls.behind, course=cls.course['CS100'], marks_obtained=30, grade='F', gpa_points='0.00')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_audit(self):
+        audit = audit_students([self.student.id])[self.student.id]
+        self.assertEqual((audit.credits_earned, audit.credits_in_progress, audit.remaining_credits), (6, 6, 18))
+        self.assertEqual(audit.completed, ('CS100', 'CS101'))
+        self.assertEqual(audit.in_progress, ('CS200', 'CS201'))
+        self.assertEqual([row[1] for row in audit.remaining], ['CS200', 'CS201', 'CS300', 'CS301', 'CS400', 'CS401'])
+        self.assertEqual((audit.projected_semester, audit.on_track), (4, True))
+
+    def test_prerequisite_chain_pushes_graduation_back(self):
+        audit = audit_students([self.behind.id])[self.behind.id]
+        self.assertEqual(audit.credits_earned, 0)
+        # all four semesters of the chain still lie ahead of semester 3
+        self.assertEqual((audit.projected_semester, audit.on_track), (7, False))
+
+    def test_batch_query_count_is_flat(self):
+        for n in range(3, 23):
+            create_student(n, semester=1)
+        student_ids = list(StudentProfile.objects.filter(program='BSCS').values_list('pk', flat=True))
+        audit_students(student_ids)
+        cache.clear()
+        # students, programs, roadmap, courses, passed enrollments and
+        # grades, current enrollments, prerequisite graph (2)
+        with self.assertNumQueries(9):
+            audits = audit_students(student_ids)
+        self.assertEqual(len(audits), 22)
+
+    def test_cached_until_the_student_changes(self):
+        audit_students([self.student.id])
+        with self.assertNumQueries(0):
+            audit_students([self.student.id])
+
+        GradeEntry.objects.create(student=self.student, course=self.course['CS200'], marks_obtained=70, grade='B', gpa_points='3.00')
+        self.assertEqual(audit_students([self.student.id])[self.student.id].credits_earned, 9)
+
+        SemesterRoadmap.objects.filter(course_code='CS401').delete()
+        self.assertNotIn('CS401', [row[1] for row in audit_students([self.student.id])[self.student.id].remaining])
+
+    def test_dropped_when_the_student_moves_semester(self):
+        self.assertEqual(audit_students([self.student.id])[self.student.id].current_semester, 2)
+        self.student.current_semester = 3
+        self.student.save()
+        self.assertEqual(audit_students([self.student.id])[self.student.id].current_semester, 3)
+
+    def test_dropped_again_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            GradeEntry.objects.create(student=self.student, course=self.course['CS200'], marks_obtained=70, grade='B', gpa_points='3.00')
+            # a reader between the save and the commit caches what it sees
+            audit_students([self.student.id])
+        self.assertTrue(callbacks)
+        # rebuilt: the prerequisite graph is still cached
+        with self.assertNumQueries(7):
+            audit_students([self.student.id])
+
+    def test_degree_audit_command(self):
+        out = StringIO()
+        call_command('degree_audit', program='BSCS', stdout=out)
+        self.assertIn('Audited 2 students', out.getvalue())
+        self.assertIn('SU-2: 0/24 credits', out.getvalue())
+
+
+
+class GPATests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        program = Program.objects.create(code='BSCS', name='BS Computer Science', department='Computer Science')
+        cls.courses = [
+            Course.objects.create(code=f'CS{n}', title=f'CS{n}', program=program, semester=semester, credits=credits)
+            for n, (semester, credits) in enumerate([(1, 3), (1, 4), (2, 3)])
+        ]
+        cls.student = create_student(1, semester=2)
+        cls.ungraded = create_student(2, semester=1)
+
+    def grade(self, course, points, marks=70):
+        return GradeEntry.objects.create(student=self.student, course=course, marks_obtained=marks, grade='X', gpa_points=points)
+
+    def stored(self):
+        self.student.refresh_from_db()
+        semesters = SemesterGPA.objects.filter(student=self.student).order_by('semester')
+        return self.student.cgpa, list(semesters.values_list('semester', 'gpa', 'total_credits', 'academic_standing'))
+
+    def test_compute_gpas(self):
+        for course, points in zip(self.courses, ['4.00', '2.00', '3.00']):
+            self.grade(course, points)
+        results = compute_gpas([self.student.id, self.ungraded.id])
+        # Semester 1: (4.00 x 3 + 2.00 x 4) / 7; overall: (12 + 8 + 9) / 10
+        self.assertEqual(results[self.student.id], (
+            Decimal('2.90'), {1: (Decimal('2.86'), 7), 2: (Decimal('3.00'), 3)},
+        ))
+        self.assertEqual(results[self.ungraded.id], (Decimal('0.00'), {}))
+
+    def test_kept_current_as_grades_change(self):
+        failed = self.grade(self.courses[0], '0.00', marks=30)
+        self.grade(self.courses[2], '3.00')
+        self.assertEqual(self.stored(), (Decimal('1.50'), [
+            (1, Decimal('0.00'), 3, 'Academic Warning'),
+            (2, Decimal('3.00'), 3, 'Good Standing'),
+        ]))
+
+        # A repeated course replaces the failed grade rather than adding to it
+        failed.marks_obtained, failed.gpa_points = 80, '3.70'
+        failed.save()
+        self.assertEqual(self.stored(), (Decimal('3.35'), [
+            (1, Decimal('3.70'), 3, 'Good Standing'),
+            (2, Decimal('3.00'), 3, 'Good Standing'),
+        ]))
+
+        # Bulk grading goes through grades_assigned
+        GradeEntry.objects.grade_course(self.courses[0])
+        self.assertEqual(self.stored()[1][0], (1, Decimal('3.70'), 3, 'Good Standing'))
+        GradeEntry.objects.filter(pk=failed.pk).update(marks_obtained=35)
+        GradeEntry.objects.grade_course(self.courses[0])
+        self.assertEqual(self.stored()[1][0], (1, Decimal('0.00'), 3, 'Academic Warning'))
+
+        # A semester without grades loses its GPA
+        failed.delete()
+        self.assertEqual(self.stored(), (Decimal('3.00'), [(2, Decimal('3.00'), 3, 'Good Standing')]))
+
+    def test_student_without_grades(self):
+        self.assertEqual(recompute_gpas([self.ungraded.id]), 1)
+        self.ungraded.refresh_from_db()
+        self.assertEqual(self.ungraded.cgpa, Decimal('0.00'))
+        self.assertFalse(SemesterGPA.objects.filter(student=self.ungraded).exists())
+
+class RecomputeGPACommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        program = Program.objects.create(code='BSCS', name='BS Computer Science', department='Computer Science')
+        first = Course.objects.create(code='CS101', title='CS101', program=program, semester=1, credits=3)
+        second = Course.objects.create(code='CS201', title='CS201', program=program, semester=2, credits=4)
+        cls.students = [create_student(n, semester=2) for n in range(1, 4)]
+        for student, points in zip(cls.students, ['4.00', '3.00', '2.00']):
+            GradeEntry.objects.create(student=student, course=first, marks_obtained=80, grade='A', gpa_points=points)
+            GradeEntry.objects.create(student=student, course=second, marks_obtained=60, grade='C', gpa_points='2.00')
+        # update() sends no signal: every stored GPA is now stale
+        SemesterGPA.objects.all().delete()
+        StudentProfile.objects.update(cgpa=0)
+
+    def test_recompute_in_chunks(self):
+        out = StringIO()
+        call_command('recompute_gpa', program='BSCS', chunk_size=2, stdout=out)
+        self.assertIn('Recomputed GPAs for 3 students', out.getvalue())
+
+        self.assertEqual(
+            list(StudentProfile.objects.order_by('pk').values_list('cgpa', flat=True)),
+            [Decimal('2.86'), Decimal('2.43'), Decimal('2.00')],
+        )
+        self.assertEqual(
+            list(SemesterGPA.objects.filter(student=self.students[1]).order_by('semester').values_list('semester', 'gpa', 'total_credits')),
+            [(1, Decimal('3.00'), 3), (2, Decimal('2.00'), 4)],
+        )
+
+    def test_other_cohorts_are_left_alone(self):
+        call_command('recompute_gpa', program='BSSE', stdout=StringIO())
+        self.assertFalse(SemesterGPA.objects.exists())
+
+    def test_workers_need_concurrent_writers(self):
+        with self.assertRaisesMessage(CommandError, 'run with --workers 1'):
+            call_command('recompute_gpa', workers=2, stdout=StringIO())
 
-# Create your tests here.
+    def test_pool_workers_set_up_django(self):
+        # Spawned workers import the task before Django is set up in them
+        with process_pool(2) as pool:
+            self.assertEqual(list(pool.map(recompute_chunk, [[], []])), [0, 0])
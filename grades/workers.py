@@ -0,0 +1,12 @@
+"""
+recompute_gpa pool tasks.
+
+Imported by spawned workers before Django is set up (see
+superiorErp/workers.py), so models are imported inside the task.
+"""
+
+
+def recompute_chunk(student_ids):
+    from .gpa import recompute_gpas
+
+    return recompute_gpas(student_ids)
@@ -0,0 +1,85 @@
+"""
+Versioned caching for read-heavy querysets.
+
+Every tracked model has a version counter in the cache, bumped on each
+save or delete of one of its rows (see courses/signals.py). Cached values
+carry the versions of the models they were built from in their key, so a
+single write makes every dependent entry unreachable and the next read
+rebuilds it. Old entries are never deleted; they simply expire.
+
+Invalidations run twice: at once, so the writing transaction never reads
+an entry built before its own change, and again when it commits, because
+a concurrent request may have cached the pre-commit rows in between.
+"""
+
+import time
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+# Seconds a cached value lives if no write makes it unreachable first
+DEFAULT_TIMEOUT = 60 * 15
+
+_missing = object()
+
+
+def _version_key(model):
+    return f'version:{model._meta.label_lower}'
+
+
+def _initial_version():
+    # A lost counter restarts from the clock, never from a number an older
+    # (still cached) entry may already have been keyed with.
+    return time.time_ns() // 1000
+
+
+def get_versions(models):
+    """Current version of each model, in the given order"""
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def after_commit(func, *args):
+    """Call func(*args) now and, inside a transaction, again on commit"""
+    func(*args)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(partial(func, *args))
+
+
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), None)
+
+
+def bump_version(model):
+    """Invalidate every cached value that depends on this model"""
+    after_commit(_incr, _version_key(model))
+
+
+def cached(key, models, build, timeout=DEFAULT_TIMEOUT):
+    """Return build() from the cache, keyed by key and the versions of models"""
+    models = sorted(set(models), key=lambda model: model._meta.label_lower)
+    versioned_key = f'{key}:' + '.'.join(str(version) for version in get_versions(models))
+
+    value = cache.get(versioned_key, _missing)
+    if value is _missing:
+        value = build()
+        cache.set(versioned_key, value, timeout)
+    return value
+
+
+def cached_queryset(key, queryset, depends_on=(), timeout=DEFAULT_TIMEOUT):
+    """Evaluate a queryset through the cache.
+
+    The queryset's own model is always a dependency; list any model reached
+    through select_related() or filters in depends_on.
+    """
+    return cached(key, [queryset.model, *depends_on], lambda: list(queryset), timeout)
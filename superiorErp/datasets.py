@@ -0,0 +1,411 @@
+"""
+Synthetic campus data for query-count tests and load testing.
+
+build_dataset() creates programs, teachers, courses, students, enrollments,
+months of attendance, grades, assessments, timetables, announcements and
+admission applications with bulk inserts, then rebuilds the derived
+attendance summaries and GPAs the way the live signals would. The
+query-count test support built on it lives in superiorErp/testing.py.
+"""
+
+import math
+import random
+from datetime import date, timedelta
+from itertools import cycle, islice
+from types import SimpleNamespace
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from accounts.models import User, StudentProfile, TeacherProfile
+from courses.models import Program, Course, CourseEnrollment, Announcement, CourseMaterial
+from courses.enrollment import recount_seats
+from courses.solver import DAYS, DEFAULT_PERIODS, Room, generate as generate_timetable, sections_for
+from admission.rollnumbers import sync_sequences
+from attendance.models import AttendanceRecord, AttendanceAlert
+from attendance.summaries import rebuild_summaries
+from grades.models import GradeEntry, AssessmentComponent, AssessmentSubmission
+from grades.scales import DEFAULT_TABLE
+from grades.gpa import recompute_gpas
+from admission.models import (
+    AdmissionApplication,
+    PersonalInformation,
+    PreviousEducation,
+    CourseSelection,
+    SemesterRoadmap,
+    AdmissionCriteria,
+)
+from .bulk import insert_rows
+
+PROGRAMS = [
+    ('BSCS', 'BS Computer Science'),
+    ('BSDS', 'BS Data Science'),
+    ('BSAI', 'BS Artificial Intelligence'),
+    ('BSCYBERSEC', 'BS Cyber Security'),
+    ('BSSE', 'BS Software Engineering'),
+]
+INTAKES = ['fall', 'spring']
+SEMESTERS = 8
+ASSESSMENT_TYPES = [('quiz', 10), ('assignment', 20), ('midterm', 50), ('final', 100), ('project', 30)]
+# Cumulative attendance status weights (present 80%, late 8%, absent 10%, excused 2%)
+STATUS_THRESHOLDS = [(0.80, 'present'), (0.88, 'late'), (0.98, 'absent'), (1.0, 'excused')]
+PASSWORD = 'Password@123'
+
+
+def build_dataset(programs=5, students_per_intake=30, courses_per_semester=5, weeks=12,
+                  assessments=4, applications=100, seed=42, end_date=None, batch_size=1000, log=None):
+    """Create a reproducible dataset and return its main objects.
+
+    Each program gets courses_per_semester courses in every semester, and
+    students_per_intake students per intake spread over the semesters. A
+    student is enrolled in every course of their current semester with two
+    attendance sessions per course each week, ending at end_date (default
+    today). The same arguments always produce the same rows.
+
+    Rows are generated lazily and written in batches (bulk_create, or
+    superiorErp.bulk.insert_rows for attendance records and submissions), so
+    memory stays flat however many attendance records are requested.
+    """
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    password = make_password(PASSWORD)
+    end_date = end_date or date.today()
+    year = end_date.year % 100
+
+    program_rows = Program.objects.bulk_create([
+        Program(code=code, name=name, department='Computer Science', total_semesters=SEMESTERS)
+        for code, name in PROGRAMS[:programs]
+    ])
+
+    course_count = len(program_rows) * SEMESTERS * courses_per_semester
+    teacher_count = max(1, course_count // 3)
+    teacher_users = User.objects.bulk_create((
+        User(
+            email=f'teacher{i}@superior.edu.pk',
+            username=f'teacher{i}',
+            first_name='Teacher',
+            last_name=str(i),
+            role='teacher',
+            password=password,
+            is_verified=True,
+        )
+        for i in range(teacher_count)
+    ), batch_size=batch_size)
+    teachers = TeacherProfile.objects.bulk_create((
+        TeacherProfile(
+            user=user,
+            official_email=user.email,
+            personal_email=f'teacher{i}@gmail.com',
+            cnic=f'35202-{i:07d}-1',
+            department='CS',
+            designation='Lecturer',
+            qualification='MS',
+            is_approved=i % 4 != 0,
+        )
+        for i, user in enumerate(teacher_users)
+    ), batch_size=batch_size)
+    log(f'{len(program_rows)} programs, {len(teachers)} teachers')
+
+    courses = Course.objects.bulk_create((
+        Course(
+            code=f'{program.code}-{semester}{n:02d}',
+            title=f'{program.name} {semester}.{n + 1}',
+            program=program,
+            semester=semester,
+            credits=rng.choice([2, 3, 3, 4]),
+            teacher=teachers[i % teacher_count],
+            max_students=students_per_intake * len(INTAKES),
+        )
+        for i, (program, semester, n) in enumerate(
+            (program, semester, n)
+            for program in program_rows
+            for semester in range(1, SEMESTERS + 1)
+            for n in range(courses_per_semester)
+        )
+    ), batch_size=batch_size)
+    courses_by_semester = {}
+    for course in courses:
+        courses_by_semester.setdefault((course.program_id, course.semester), []).append(course)
+    log(f'{len(courses)} courses')
+
+    cohorts = [
+        (program, intake, n)
+        for program in program_rows
+        for intake in INTAKES
+        for n in range(students_per_intake)
+    ]
+    student_users = User.objects.bulk_create((
+        User(
+            email=f'student{i}@superior.edu.pk',
+            username=f'student{i}',
+            first_name='Student',
+            last_name=str(i),
+            role='student',
+            password=password,
+            is_verified=True,
+        )
+        for i in range(len(cohorts))
+    ), batch_size=batch_size)
+    students = StudentProfile.objects.bulk_create((
+        StudentProfile(
+            user=user,
+            roll_number=f'su{year}-{program.code.lower()}-{intake[0]}{year}-{n:05d}',
+            father_name=f'Father {i}',
+            cnic=f'35201-{i:07d}-1',
+            date_of_birth=date(2004, 1, 1) + timedelta(days=i % 700),
+            gender='M' if i % 2 else 'F',
+            personal_email=f'student{i}@gmail.com',
+            university_email=user.email,
+            whatsapp_number='03001234567',
+            intake=intake,
+            program=program.code,
+            current_semester=n % SEMESTERS + 1,
+            is_approved=i % 10 != 0,
+        )
+        for i, (user, (program, intake, n)) in enumerate(zip(student_users, cohorts))
+    ), batch_size=batch_size)
+    sync_sequences()
+    log(f'{len(students)} students')
+
+    # (student_id, course) for every enrollment; the rows below are derived from it
+    enrolled = [
+        (student.id, course)
+        for student, (program, intake, n) in zip(students, cohorts)
+        for course in courses_by_semester.get((program.id, student.current_semester), [])
+    ]
+    _insert(CourseEnrollment, (
+        CourseEnrollment(student_id=student_id, course=course, status='enrolled')
+        for student_id, course in enrolled
+    ), batch_size)
+    recount_seats()
+    log(f'{len(enrolled)} enrollments')
+
+    # Two sessions per course each week, counting back from end_date
+    session_dates = [
+        [end_date - timedelta(days=week * 7 + session * 2 + parity) for week in range(weeks) for session in range(2)]
+        for parity in range(2)
+    ]
+    now = timezone.now()
+    records = insert_rows(
+        AttendanceRecord,
+        ['student', 'course', 'date', 'status', 'remarks', 'recorded_by', 'recorded_at', 'updated_at'],
+        (
+            (student_id, course.id, session_date, _attendance_status(rng.random()), '', course.teacher_id, now, now)
+            for student_id, course in enrolled
+            for session_date in session_dates[course.id % 2]
+        ),
+        batch_size,
+    )
+    log(f'{records} attendance records')
+    rebuild_summaries(batch_size=batch_size)
+
+    def grade_entry(student_id, course):
+        marks = rng.randint(35, 100)
+        grade, points = DEFAULT_TABLE.lookup(marks)
+        return GradeEntry(
+            student_id=student_id,
+            course=course,
+            marks_obtained=marks,
+            grade=grade,
+            gpa_points=points,
+            graded_by_id=course.teacher_id,
+        )
+
+    _insert(GradeEntry, (grade_entry(student_id, course) for student_id, course in enrolled), batch_size)
+    student_ids = [student.id for student in students]
+    for start in range(0, len(student_ids), batch_size):
+        recompute_gpas(student_ids[start:start + batch_size])
+    log(f'{len(enrolled)} grades')
+
+    _insert(AttendanceAlert, (
+        AttendanceAlert(
+            student_id=student_id,
+            course=course,
+            alert_type='low_attendance',
+            message='Attendance below 75%',
+        )
+        for student_id, course in enrolled[::7]
+    ), batch_size)
+
+    components = AssessmentComponent.objects.bulk_create((
+        AssessmentComponent(
+            course=course,
+            component_type=component_type,
+            name=f'{component_type.title()} {n + 1}',
+            total_marks=total,
+            weightage=100 // max(assessments, 1),
+            due_date=end_date + timedelta(days=n * 14),
+            created_by_id=course.teacher_id,
+        )
+        for course in courses
+        for n, (component_type, total) in zip(range(assessments), cycle(ASSESSMENT_TYPES))
+    ), batch_size=batch_size)
+    components_by_course = {}
+    for component in components:
+        components_by_course.setdefault(component.course_id, []).append(component)
+
+    submitted = [now - timedelta(days=days) for days in range(31)]
+    submissions = insert_rows(
+        AssessmentSubmission,
+        ['student', 'assessment', 'marks_obtained', 'submission_file', 'submission_date', 'is_late',
+         'status', 'teacher_comments', 'created_at', 'updated_at'],
+        (
+            (student_id, component.id, rng.randint(0, component.total_marks),
+             f'submissions/{student_id}-{component.id}.pdf', rng.choice(submitted), False,
+             rng.choice(['submitted', 'graded', 'late_submitted']), '', now, now)
+            for student_id, course in enrolled
+            for component in components_by_course.get(course.id, [])
+        ),
+        batch_size,
+    )
+    log(f'{len(components)} assessments, {submissions} submissions')
+
+    # Placed by the timetable solver, so no room, teacher or cohort is
+    # booked twice at once; half again as many rooms as the sessions need
+    sessions = sum(section.sessions for section in sections_for(courses))
+    room_count = math.ceil(sessions * 1.5 / (len(DAYS) * len(DEFAULT_PERIODS)))
+    rooms = [
+        Room(f'Building {"ABC"[n % 3]}', f'Room {100 + n}', students_per_intake * len(INTAKES))
+        for n in range(room_count)
+    ]
+    _, placements, unplaced = generate_timetable(courses, rooms)
+    log(f'{len(placements)} timetable slots in {room_count} rooms, {len(unplaced)} courses unplaced')
+
+    CourseMaterial.objects.bulk_create((
+        CourseMaterial(
+            course=course,
+            title=f'Lecture {n + 1}',
+            material_type='lecture',
+            file=f'course_materials/{course.code}-{n + 1}.pdf',
+            uploaded_by_id=course.teacher_id,
+        )
+        for course in courses
+        for n in range(4)
+    ), batch_size=batch_size)
+
+    Announcement.objects.bulk_create([
+        Announcement(
+            course=course,
+            title=f'{course.code} update {n + 1}',
+            content=f'Update {n + 1} for {course.title}.',
+            posted_by_id=course.teacher_id,
+            priority=rng.choice(['low', 'medium', 'high']),
+        )
+        for course in courses
+        for n in range(3)
+    ] + [
+        Announcement(title='Campus notice', content='Semester schedule published.', priority='high'),
+    ], batch_size=batch_size)
+
+    build_admissions(applications, rng, batch_size)
+    log(f'{applications} admission applications')
+
+    admin = User.objects.create(
+        email='admin@superior.edu.pk',
+        username='admin',
+        first_name='System',
+        last_name='Administrator',
+        role='admin',
+        password=password,
+        is_staff=True,
+        is_superuser=True,
+        is_verified=True,
+    )
+
+    return SimpleNamespace(
+        programs=program_rows,
+        teachers=teachers,
+        courses=courses,
+        students=students,
+        admin=admin,
+    )
+
+
+def build_admissions(count, rng, batch_size=1000):
+    """Admission criteria, semester roadmaps and applications spread over every stage"""
+    AdmissionCriteria.objects.bulk_create([
+        AdmissionCriteria(program=code, min_fsc_percentage=60, min_matric_percentage=50)
+        for code, name in PROGRAMS
+    ])
+    SemesterRoadmap.objects.bulk_create([
+        SemesterRoadmap(
+            program=code,
+            semester=semester,
+            course_code=f'{code}-{semester}{n:02d}',
+            course_title=f'{name} {semester}.{n + 1}',
+            credits=3,
+        )
+        for code, name in PROGRAMS
+        for semester in range(1, 9)
+        for n in range(5)
+    ], batch_size=batch_size)
+
+    stages = ['stage_1', 'stage_2', 'stage_3', 'stage_4', 'stage_5']
+    applications = AdmissionApplication.objects.bulk_create([
+        AdmissionApplication(
+            application_id=f'APP-{i:08X}',
+            email=f'applicant{i}@gmail.com',
+            current_stage=stages[i % len(stages)],
+        )
+        for i in range(count)
+    ], batch_size=batch_size)
+
+    PersonalInformation.objects.bulk_create([
+        PersonalInformation(
+            application=application,
+            full_name=f'Applicant {i}',
+            father_name=f'Father {i}',
+            date_of_birth=date(2005, 1, 1) + timedelta(days=i % 365),
+            gender='M' if i % 2 else 'F',
+            cnic=f'35203-{i:07d}-1',
+            phone='03001234567',
+            whatsapp='03001234567',
+            address='Lahore',
+        )
+        for i, application in enumerate(applications)
+        if application.current_stage != 'stage_1'
+    ], batch_size=batch_size)
+    PreviousEducation.objects.bulk_create([
+        PreviousEducation(
+            application=application,
+            fsc_board='Lahore',
+            fsc_year=2024,
+            fsc_marks=rng.randint(600, 1050),
+            fsc_percentage=rng.randint(55, 95),
+            matric_board='Lahore',
+            matric_year=2022,
+            matric_marks=rng.randint(600, 1000),
+            matric_percentage=rng.randint(55, 95),
+        )
+        for application in applications
+        if application.current_stage not in ('stage_1', 'stage_2')
+    ], batch_size=batch_size)
+    CourseSelection.objects.bulk_create([
+        CourseSelection(
+            application=application,
+            program=PROGRAMS[i % len(PROGRAMS)][0],
+            intake='fall',
+            eligibility_score=75,
+            meets_criteria=True,
+        )
+        for i, application in enumerate(applications)
+        if application.current_stage in ('stage_4', 'stage_5')
+    ], batch_size=batch_size)
+    return applications
+
+
+def _insert(model, objs, batch_size):
+    """bulk_create from an iterator one batch at a time; returns the row count"""
+    count = 0
+    objs = iter(objs)
+    while batch := list(islice(objs, batch_size)):
+        model.objects.bulk_create(batch)
+        count += len(batch)
+    return count
+
+
+def _attendance_status(roll):
+    for threshold, status in STATUS_THRESHOLDS:
+        if roll < threshold:
+            return status
+    return STATUS_THRESHOLDS[-1][1]
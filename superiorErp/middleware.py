@@ -0,0 +1,101 @@
+"""
+Per-request SQL instrumentation.
+
+QueryInstrumentationMiddleware counts the queries a request runs, their
+total database time and how many repeated an SQL statement already run
+in the same request (the usual sign of an N+1 loop). It adds a
+Server-Timing header, logs one line per request at DEBUG on the
+'superiorErp.queries' logger, and enforces the per-view budgets in
+QUERY_BUDGETS (keyed by URL name).
+
+Enable it with QUERY_INSTRUMENTATION_ENABLED = True. Set
+QUERY_BUDGET_RAISE = True (e.g. in tests) to turn an exceeded budget into
+an exception instead of a warning.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('superiorErp.queries')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """Database execute wrapper collecting query statistics"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        return sum(count - 1 for count in self.statements.values() if count > 1)
+
+
+class QueryInstrumentationMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = counter.duration * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.url_name if match and match.url_name else request.path
+
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.1f};desc="{counter.count} queries", app;dur={total_ms:.1f}'
+        )
+        logger.debug(
+            'view=%s method=%s status=%s queries=%d duplicates=%d db_ms=%.1f total_ms=%.1f',
+            view_name, request.method, response.status_code, counter.count,
+            counter.duplicates, db_ms, total_ms,
+            extra={
+                'view': view_name,
+                'queries': counter.count,
+                'duplicate_queries': counter.duplicates,
+                'db_ms': round(db_ms, 1),
+                'total_ms': round(total_ms, 1),
+            },
+        )
+
+        self.check_budget(view_name, counter)
+        return response
+
+    def check_budget(self, view_name, counter):
+        budgets = getattr(settings, 'QUERY_BUDGETS', {})
+        budget = budgets.get(view_name, getattr(settings, 'QUERY_BUDGET_DEFAULT', None))
+        if budget is None or counter.count <= budget:
+            return
+
+        message = f'{view_name} ran {counter.count} queries (budget {budget}, {counter.duplicates} duplicates)'
+        if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -51,6 +51,7 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'accounts.User'
 
 MIDDLEWARE = [
+    "superiorErp.middleware.QueryInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -60,6 +61,42 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Query instrumentation: per-request query count, DB time and duplicate SQL
+# in a Server-Timing header and, at DEBUG, on the 'superiorErp.queries'
+# logger. Off by default; to profile, enable it and set that logger's level
+# below to 'DEBUG'.
+QUERY_INSTRUMENTATION_ENABLED = False
+
+# Maximum queries per view (by URL name); QUERY_BUDGET_DEFAULT applies to the rest.
+# Exceeded budgets are logged, or raise QueryBudgetExceeded when QUERY_BUDGET_RAISE is set.
+QUERY_BUDGETS = {
+    'student_dashboard': 18,  # includes rebuilding a stale snapshot
+}
+QUERY_BUDGET_DEFAULT = None
+QUERY_BUDGET_RAISE = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'superiorErp.queries': {
+            'handlers': ['console'],
+            'level': 'INFO' if DEBUG else 'WARNING',
+            'propagate': False,
+        },
+        'admission': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 ROOT_URLCONF = "superiorErp.urls"
 
 TEMPLATES = [
@@ -92,6 +129,49 @@ DATABASES = {
 }
 
 
+# Cache
+# LocMem is per process; production needs a cache shared by every worker.
+# Cached querysets are versioned per model (see superiorErp/cache.py).
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "superiorErp",
+    }
+}
+
+# For production with a file-based cache (single server):
+# CACHES = {
+#     "default": {
+#         "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+#         "LOCATION": "/var/tmp/superiorErp_cache",
+#     }
+# }
+
+# For production with Redis (several servers):
+# CACHES = {
+#     "default": {
+#         "BACKEND": "django.core.cache.backends.redis.RedisCache",
+#         "LOCATION": "redis://127.0.0.1:6379",
+#     }
+# }
+
+
+# Enrollment
+# With the queue enabled, enroll requests are stored and acknowledged at once;
+# `manage.py process_enrollment_queue` applies them in batches (courses/queue.py).
+
+ENROLLMENT_QUEUE_ENABLED = False
+ENROLLMENT_QUEUE_BATCH_SIZE = 500
+
+
+# Admission merit
+# Weights of the FSc and matric percentages in an applicant's aggregate
+# (admission/merit.py); they are normalised to sum to 1.
+
+ADMISSION_MERIT_WEIGHTS = {'fsc': 0.5, 'matric': 0.5}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -158,6 +238,18 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'admissions@superior.edu.pk'
 SERVER_EMAIL = 'admissions@superior.edu.pk'
 
+# Outbox
+# Admission emails are queued in OutboundEmail and sent by `manage.py send_outbox`
+# (admission/outbox.py). A failed message is retried after
+# OUTBOX_RETRY_DELAY * 2**(attempts - 1) seconds and given up after
+# OUTBOX_MAX_ATTEMPTS; a claimed batch not finished within OUTBOX_LEASE
+# seconds is picked up again.
+
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 60
+OUTBOX_LEASE = 300
+
 # Site URL for admission links in emails
 SITE_URL = 'http://localhost:8000'
 
@@ -0,0 +1,98 @@
+"""
+Test support for the query-count suites.
+
+QueryCountTestCase is the base class for the per-app suites, and
+fallback_templates() fills in pages whose templates do not exist yet.
+"""
+
+from copy import deepcopy
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+# Stand-ins for dashboard templates that are not in the tree yet. Each one
+# touches the related objects its page displays, so an N+1 query in the
+# view still shows up in query counts and benchmarks.
+FALLBACK_TEMPLATES = {
+    'dashboards/student_courses.html': (
+        '{% for e in enrollments %}{{ e.course.code }} {{ e.course.title }} '
+        '{{ e.course.teacher.user.get_full_name }}{% endfor %}'
+    ),
+    'dashboards/course_details.html': (
+        '{{ course.code }} {{ course.teacher.user.get_full_name }} {{ enrollment.status }}'
+        '{% for m in materials %}{{ m.title }} {{ m.uploaded_by.user.get_full_name }}{% endfor %}'
+        '{% for a in assessments %}{{ a.name }}{% endfor %}'
+        '{% for s in submissions %}{{ s.assessment.name }} {{ s.marks_obtained }}{% endfor %}'
+        '{{ grade.grade }} {{ attendance.attendance_percentage }}'
+        '{% for t in timetable %}{{ t.day }} {{ t.room }}{% endfor %}'
+    ),
+    'dashboards/student_attendance.html': (
+        '{% for r in attendance_records %}{{ r.course.code }} {{ r.date }} {{ r.status }}{% endfor %}'
+        '{% for s in summary %}{{ s.course.code }} {{ s.attendance_percentage }}{% endfor %}'
+    ),
+    'dashboards/student_grades.html': (
+        '{% for g in grades %}{{ g.course.code }} {{ g.course.credits }} {{ g.grade }}{% endfor %}'
+        '{% for s in semester_gpas %}{{ s.semester }} {{ s.gpa }}{% endfor %}{{ cgpa }}'
+    ),
+    'dashboards/teacher_dashboard.html': (
+        '{% for c in courses %}{{ c.code }} {{ c.title }}{% endfor %}'
+        '{{ total_students }} {{ pending_submissions }}'
+        '{% for a in announcements %}{{ a.title }} {{ a.course.code }}{% endfor %}'
+    ),
+    'dashboards/teacher_course_students.html': (
+        '{% for e in enrollments %}{{ e.student.roll_number }} {{ e.student.user.get_full_name }}{% endfor %}'
+        '{% for s in attendance_summary %}{{ s.student.user.get_full_name }} {{ s.attendance_percentage }}{% endfor %}'
+        '{% for g in grades %}{{ g.student.user.get_full_name }} {{ g.grade }}{% endfor %}'
+        '{{ attendance_totals.attendance_percentage }}'
+    ),
+    'dashboards/teacher_assessments.html': (
+        '{% for a in assessments %}{{ a.name }}{% endfor %}'
+        '{% for s in submissions %}{{ s.student.user.get_full_name }} {{ s.assessment.name }}{% endfor %}'
+    ),
+    'dashboards/admin_dashboard.html': (
+        '{{ total_students }} {{ pending_students }} {{ attendance_totals.attendance_percentage }}'
+        '{% for s in recent_students %}{{ s.user.get_full_name }} {{ s.roll_number }}{% endfor %}'
+        '{% for t in recent_teachers %}{{ t.user.get_full_name }}{% endfor %}'
+    ),
+    'dashboards/admin_approvals.html': (
+        '{% for p in pending_users %}{{ p.user.get_full_name }} {{ p.user.email }}{% endfor %}'
+    ),
+}
+
+
+def fallback_templates():
+    """TEMPLATES setting that serves FALLBACK_TEMPLATES after the real loaders"""
+    templates = deepcopy(settings.TEMPLATES)
+    templates[0]['APP_DIRS'] = False
+    templates[0]['OPTIONS']['loaders'] = [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+        ('django.template.loaders.locmem.Loader', FALLBACK_TEMPLATES),
+    ]
+    return templates
+
+
+@override_settings(QUERY_INSTRUMENTATION_ENABLED=True, QUERY_BUDGET_RAISE=True)
+class QueryCountTestCase(TestCase):
+    """TestCase asserting a fixed number of queries per request.
+
+    Requests go through QueryInstrumentationMiddleware with budgets raising,
+    so QUERY_BUDGETS in settings is enforced as well. Suites build their
+    data with build_dataset(**dataset); subclassing a suite with a larger
+    dataset re-runs every assertion, so a count that grows with the data
+    fails.
+    """
+
+    dataset = {}
+
+    def setUp(self):
+        super().setUp()
+        # Count the cold-cache path; the database is rolled back per test
+        cache.clear()
+
+    def assertViewQueries(self, num, url, method='get', data=None):
+        with self.assertNumQueries(num), self.assertLogs('superiorErp.queries', 'DEBUG'):
+            response = getattr(self.client, method)(url, data)
+        self.assertLess(response.status_code, 400, url)
+        return response
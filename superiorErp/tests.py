@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from .middleware import QueryBudgetExceeded, QueryInstrumentationMiddleware
+
+
+def three_queries(request):
+    for n in range(3):
+        list(Permission.objects.filter(pk=n))
+    return HttpResponse()
+
+
+class QueryInstrumentationTests(TestCase):
+    def test_off_by_default(self):
+        self.assertFalse(settings.QUERY_INSTRUMENTATION_ENABLED)
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryInstrumentationMiddleware(three_queries)
+        self.assertNotIn('Server-Timing', self.client.get('/'))
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=True)
+    def test_counts_and_logs_at_debug(self):
+        middleware = QueryInstrumentationMiddleware(three_queries)
+        # Counting adds no queries of its own
+        with self.assertNumQueries(3), self.assertLogs('superiorErp.queries', 'DEBUG') as logs:
+            response = middleware(RequestFactory().get('/report/'))
+
+        self.assertIn('desc="3 queries"', response['Server-Timing'])
+        record, = logs.records
+        self.assertEqual(record.levelname, 'DEBUG')
+        # Same SQL, different parameters: the loop shows as two duplicates
+        self.assertEqual((record.view, record.queries, record.duplicate_queries), ('/report/', 3, 2))
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=True, QUERY_BUDGET_DEFAULT=2)
+    def test_budget(self):
+        middleware = QueryInstrumentationMiddleware(three_queries)
+        with self.assertLogs('superiorErp.queries', 'WARNING') as logs:
+            middleware(RequestFactory().get('/report/'))
+        self.assertIn('/report/ ran 3 queries (budget 2', logs.output[0])
+
+        with self.settings(QUERY_BUDGET_RAISE=True), self.assertRaises(QueryBudgetExceeded):
+            middleware(RequestFactory().get('/report/'))
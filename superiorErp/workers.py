@@ -0,0 +1,30 @@
+"""
+Process pools for batch commands.
+
+Workers are always spawned, whatever the platform default (fork on
+older Linux Pythons, forkserver from 3.14, spawn on Windows and macOS),
+so they behave the same everywhere and never inherit the parent's
+database connections. A spawned worker starts with a fresh interpreter:
+init_worker() sets Django up, and the functions submitted to the pool
+must live in modules that import no models at module level, because the
+worker imports them to unpickle the task before any setup has run.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+
+
+def init_worker():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'superiorErp.settings')
+    django.setup()
+
+
+def process_pool(max_workers):
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_worker,
+    )